@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import LazyUser
+
+
+class TokenCache:
+    """Bounded LRU of validated tokens keyed by the raw token bytes"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            token = self._tokens.get(raw_token)
+            if token is not None:
+                self._tokens.move_to_end(raw_token)
+            return token
+
+    def set(self, raw_token, token):
+        with self._lock:
+            self._tokens[raw_token] = token
+            self._tokens.move_to_end(raw_token)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def discard(self, raw_token):
+        with self._lock:
+            self._tokens.pop(raw_token, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+token_cache = TokenCache(settings.JWT_TOKEN_CACHE_SIZE)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not read the user row.
+
+    The token is validated as by ``JWTAuthentication`` (signature and
+    expiry, using the ``SIMPLE_JWT`` settings), and ``request.user`` is a
+    ``LazyUser`` carrying only the token's user id. Views that only filter
+    on the user never query the ``auth_user`` table; reading any other
+    attribute loads the row and applies the "not found"/"inactive" checks
+    then. Requests with unsafe methods load it up front, so a deleted or
+    deactivated user cannot write until the token expires. Validated tokens are kept in a per-process LRU, so repeat requests
+    with the same token skip the signature check; expiry is still checked
+    on every request.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None and request.method not in SAFE_METHODS and isinstance(result[0], LazyUser):
+            # One primary key lookup; writes must not outlive the account
+            result[0].check_active()
+        return result
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is not None:
+            try:
+                token.check_exp()
+                return token
+            except TokenError:
+                token_cache.discard(raw_token)
+
+        token = super().get_validated_token(raw_token)
+        token_cache.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != 'id':
+            # Both need the user row (or a lookup on another column)
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        return LazyUser.for_id(user_id)
@@ -0,0 +1,73 @@
+"""
+Password hashers with cost parameters taken from settings, run in a bounded pool.
+
+``PASSWORD_HASHER`` picks the hasher new passwords use (``scrypt`` by
+default, ``argon2`` with ``argon2-cffi`` installed, or ``pbkdf2``); the
+others stay listed in ``PASSWORD_HASHERS`` so existing hashes still verify.
+Django rehashes a password with the preferred hasher and current parameters
+the next time it is checked, so a policy change is applied on login.
+
+Hashing and verifying run in a per-process pool of ``LOGIN_HASH_WORKERS``
+threads. The hash functions release the GIL, so with threaded workers a
+login storm occupies at most that many cores while other requests keep
+running. A caller that waits more than ``LOGIN_HASH_WAIT`` seconds for a
+slot gets a 503 instead of piling up behind the queue.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework.exceptions import APIException
+
+_local = threading.local()
+_pool = ThreadPoolExecutor(max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix='password-hash')
+_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_WORKERS + settings.LOGIN_HASH_QUEUE)
+
+
+class HashingBusy(APIException):
+    status_code = 503
+    default_detail = 'Too many logins in progress, try again shortly.'
+    default_code = 'hashing_busy'
+
+
+def _call(func, args, kwargs):
+    _local.in_pool = True
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.in_pool = False
+
+
+def run(func, *args, **kwargs):
+    """Run ``func`` on the hashing pool and wait for its result"""
+    if getattr(_local, 'in_pool', False):
+        # verify() calls encode(); don't queue twice
+        return func(*args, **kwargs)
+    if not _slots.acquire(timeout=settings.LOGIN_HASH_WAIT):
+        raise HashingBusy()
+    try:
+        return _pool.submit(_call, func, args, kwargs).result()
+    finally:
+        _slots.release()
+
+
+class PooledHasherMixin:
+    def encode(self, *args, **kwargs):
+        return run(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return run(super().verify, *args, **kwargs)
+
+
+class ScryptPasswordHasher(PooledHasherMixin, hashers.ScryptPasswordHasher):
+    work_factor = settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    time_cost = settings.PASSWORD_ARGON2_TIME_COST
+    memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST
+
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
@@ -1,3 +1,42 @@
-from django.db import models
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 
-# Create your models here.
+
+class LazyUser(User):
+    """
+    ``User`` that starts out holding only its primary key.
+
+    Built by ``StatelessJWTAuthentication`` from the token's user id, so
+    filtering or saving with ``created_by=request.user`` needs no query.
+    The first access to any other field loads the whole row in one query
+    and applies the checks ``JWTAuthentication`` makes up front;
+    ``check_active()`` does so explicitly.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def for_id(cls, user_id):
+        return cls.from_db(None, [cls._meta.pk.attname], [user_id])
+
+    def check_active(self):
+        """Load the row if it isn't yet, failing authentication for a deleted or inactive user"""
+        if self.get_deferred_fields():
+            self.refresh_from_db(fields=['is_active'])
+        elif not self.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.intersection(fields):
+            # Load every deferred column at once rather than one per attribute
+            try:
+                super().refresh_from_db(using=using, fields=list(deferred))
+            except User.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if not self.is_active:
+                raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+            return
+        super().refresh_from_db(using=using, fields=fields)
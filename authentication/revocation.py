@@ -0,0 +1,124 @@
+"""
+Refresh token revocation.
+
+Revoked tokens are stored durably by simplejwt's ``token_blacklist`` app
+(``BlacklistedToken`` -> ``OutstandingToken``, unique on ``jti``). Each
+process mirrors the unexpired rows into ``RevocationSet``, so refresh and
+logout check a token with a set lookup instead of a query.
+
+A revocation bumps a version key in the ``JWT_REVOCATION_CACHE_ALIAS``
+cache; a process that sees a new version pulls the rows blacklisted since
+its last sync. With the default local-memory cache the version is per
+process, so every process also resyncs at least every
+``JWT_REVOCATION_SYNC_INTERVAL`` seconds; set ``CACHE_BACKEND`` to a shared
+cache to make revocations visible to all workers at once.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+VERSION_KEY = 'auth:revocations:version'
+
+# Rows are pulled by ``blacklisted_at``, which is set before the row commits;
+# re-reading this far back picks up revocations from transactions still open
+# at the previous sync.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationSet:
+    """
+    Revoked JTIs grouped into buckets by expiry time.
+
+    A token is looked up in the bucket its ``exp`` claim falls in, and a
+    bucket is dropped whole once every token in it has expired.
+    """
+
+    def __init__(self, bucket_seconds=3600):
+        self.bucket_seconds = bucket_seconds
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._buckets.setdefault(int(exp) // self.bucket_seconds, set()).add(jti)
+
+    def contains(self, jti, exp):
+        bucket = self._buckets.get(int(exp) // self.bucket_seconds)
+        return bucket is not None and jti in bucket
+
+    def purge(self, now):
+        """Drop the buckets whose tokens have all expired by ``now``"""
+        current = int(now) // self.bucket_seconds
+        with self._lock:
+            for key in [key for key in self._buckets if key < current]:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+
+revoked = RevocationSet()
+_sync_lock = threading.Lock()
+_state = {'version': None, 'synced_at': None, 'checked_at': 0.0}
+
+
+def get_cache():
+    return caches[settings.JWT_REVOCATION_CACHE_ALIAS]
+
+
+def _bump_version():
+    get_cache().set(VERSION_KEY, time.time(), None)
+
+
+def sync(force=False):
+    """Pull revocations made by other processes and drop expired ones"""
+    version = get_cache().get(VERSION_KEY)
+    now = time.time()
+    fresh = now - _state['checked_at'] < settings.JWT_REVOCATION_SYNC_INTERVAL
+    if not force and fresh and version == _state['version']:
+        return
+    with _sync_lock:
+        started = timezone.now()
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=started)
+        if _state['synced_at'] is not None:
+            rows = rows.filter(blacklisted_at__gte=_state['synced_at'] - SYNC_OVERLAP)
+        for jti, expires_at in rows.values_list('token__jti', 'token__expires_at').iterator():
+            revoked.add(jti, expires_at.timestamp())
+        revoked.purge(now)
+        _state.update(version=version, synced_at=started, checked_at=now)
+
+
+def is_revoked(token):
+    sync()
+    return revoked.contains(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+def revoke(token):
+    """Blacklist ``token`` in the database and in this process"""
+    jti, exp = token[api_settings.JTI_CLAIM], token['exp']
+    outstanding, _ = OutstandingToken.objects.get_or_create(
+        jti=jti, defaults={'token': str(token), 'expires_at': datetime_from_epoch(exp)}
+    )
+    entry, _ = BlacklistedToken.objects.get_or_create(token=outstanding)
+    revoked.add(jti, exp)
+    transaction.on_commit(_bump_version)
+    return entry
+
+
+def reset():
+    """Forget the mirrored revocations; the next check reloads them all"""
+    with _sync_lock:
+        revoked.clear()
+        _state.update(version=None, synced_at=None, checked_at=0.0)
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt import serializers as jwt_serializers
+from .tokens import RefreshToken
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,8 +18,6 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         fields = ('username', 'email', 'password', 'password_confirm', 'first_name', 'last_name')
 
     def validate(self, attrs):
-        logger.info(f"UserRegistrationSerializer.validate called with attrs: {attrs}")
-        
         try:
             # Check if required fields are present
             if 'password' not in attrs:
@@ -43,7 +43,6 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
                 logger.error(f"Username '{username}' already exists")
                 raise serializers.ValidationError("Username already exists")
             
-            logger.info("UserRegistrationSerializer validation successful")
             return attrs
             
         except serializers.ValidationError as e:
@@ -54,15 +53,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Validation error: {str(e)}")
 
     def create(self, validated_data):
-        logger.info(f"UserRegistrationSerializer.create called with validated_data: {validated_data}")
-        
         try:
             # Remove password_confirm before creating user
             validated_data.pop('password_confirm', None)
-            logger.info(f"Creating user with data: {validated_data}")
-            
             user = User.objects.create_user(**validated_data)
-            logger.info(f"User created successfully: {user.username} (ID: {user.id})")
             return user
             
         except Exception as e:
@@ -97,3 +91,7 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 'is_active')
         read_only_fields = ('id', 'date_joined', 'is_active')
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
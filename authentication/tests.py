@@ -1,3 +1,166 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from patients.tests import create_patient
+
+from . import hashers, revocation
+from .backends import TokenCache, token_cache
+from .revocation import RevocationSet
+from .tokens import RefreshToken
+
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        create_patient(self.user, 1)
+
+    def test_list_does_not_load_the_user(self):
+        with self.assertNumQueries(2):
+            # COUNT(*) and the page; no auth_user lookup
+            response = self.client.get(reverse('patient_list_create'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_loads_the_user_once(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api_user_profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'clinician')
+
+    def test_inactive_user_is_rejected_when_loaded(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('api_user_profile')).status_code, 401)
+
+    def test_deleted_user_is_rejected_when_loaded(self):
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse('api_user_profile')).status_code, 401)
+
+    def test_writes_check_the_user_up_front(self):
+        data = {
+            'first_name': 'Ann', 'last_name': 'Lee', 'email': 'ann@example.com', 'phone_number': '555-0100',
+            'date_of_birth': '1980-02-03', 'gender': 'F', 'address': '1 Elm St', 'city': 'Austin',
+            'state': 'TX', 'zip_code': '73301',
+        }
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(reverse('patient_list_create'), data, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'user_inactive')
+
+        self.user.delete()
+        response = self.client.post(reverse('patient_list_create'), data, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'user_not_found')
+
+    def test_tampered_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}x')
+        self.assertEqual(self.client.get(reverse('patient_list_create')).status_code, 401)
+
+
+class TokenCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_size=2)
+        cache.set(b'a', 1)
+        cache.set(b'b', 2)
+        cache.get(b'a')
+        cache.set(b'c', 3)
+        self.assertIsNone(cache.get(b'b'))
+        self.assertEqual((cache.get(b'a'), cache.get(b'c')), (1, 3))
+
+
+class RefreshTokenRevocationTests(APITestCase):
+    def setUp(self):
+        revocation.reset()
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def refresh_with(self, token):
+        return self.client.post(reverse('api_token_refresh'), {'refresh': str(token)}, format='json')
+
+    def test_logout_revokes_refresh_token(self):
+        response = self.client.post(reverse('api_user_logout'), {'refresh_token': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_rotation_revokes_previous_token(self):
+        response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()['refresh'], str(self.refresh))
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertEqual(self.refresh_with(response.json()['refresh']).status_code, 200)
+
+    def test_check_does_not_query_after_sync(self):
+        revocation.sync(force=True)
+        with self.assertNumQueries(0):
+            RefreshToken(str(self.refresh))
+
+    def test_revocations_from_other_processes_are_loaded(self):
+        revocation.sync(force=True)
+        self.refresh.blacklist()
+        revocation.reset()
+        with self.assertRaises(TokenError):
+            RefreshToken(str(self.refresh))
+
+
+class RevocationSetTests(SimpleTestCase):
+    def test_purge_drops_expired_buckets(self):
+        revoked = RevocationSet(bucket_seconds=60)
+        revoked.add('old', exp=100)
+        revoked.add('new', exp=200)
+        revoked.purge(now=180)
+        self.assertFalse(revoked.contains('old', 100))
+        self.assertTrue(revoked.contains('new', 200))
+        self.assertEqual(len(revoked), 1)
+
+
+class PasswordHasherTests(APITestCase):
+    def login(self):
+        return self.client.post(
+            reverse('api_user_login'), {'username': 'clinician', 'password': 'pass12345'}, format='json'
+        )
+
+    def test_login_upgrades_hash_to_preferred_hasher(self):
+        pbkdf2_first = ['authentication.hashers.PBKDF2PasswordHasher', 'authentication.hashers.ScryptPasswordHasher']
+        with override_settings(PASSWORD_HASHERS=pbkdf2_first):
+            user = User.objects.create_user(username='clinician', password='pass12345')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+        self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_login_is_refused_when_hashing_pool_is_full(self):
+        User.objects.create_user(username='clinician', password='pass12345')
+        with mock.patch.object(hashers, '_slots') as slots:
+            slots.acquire.return_value = False
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+
+
+class RegistrationLoggingTests(APITestCase):
+    def test_registration_does_not_log_secrets(self):
+        data = {
+            'username': 'clinician', 'email': 'clinician@example.com', 'first_name': 'Ann', 'last_name': 'Lee',
+            'password': 'Sup3r-secret-pass', 'password_confirm': 'Sup3r-secret-pass',
+        }
+        with self.assertLogs('authentication', 'DEBUG') as logs:
+            response = self.client.post(
+                reverse('api_user_register'), data, format='json', HTTP_COOKIE='sessionid=abc123def'
+            )
+        self.assertEqual(response.status_code, 201)
+        output = '\n'.join(logs.output)
+        self.assertIn('clinician', output)
+        self.assertNotIn('Sup3r-secret-pass', output)
+        self.assertNotIn('abc123def', output)
+
+    def test_non_object_body_is_rejected(self):
+        response = self.client.post(reverse('api_user_register'), ['clinician'], format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,16 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+
+from . import revocation
+
+
+class RefreshToken(tokens.RefreshToken):
+    """``RefreshToken`` whose blacklist is checked in memory (see ``authentication.revocation``)"""
+
+    def check_blacklist(self):
+        if revocation.is_revoked(self.payload):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        return revocation.revoke(self)
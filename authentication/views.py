@@ -2,12 +2,12 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken, OutstandingToken, BlacklistedToken
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from .tokens import RefreshToken
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,23 +20,15 @@ class UserRegistrationView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
     def create(self, request, *args, **kwargs):
-        logger.info(f"Registration attempt - Request data: {request.data}")
-        logger.info(f"Registration attempt - Request headers: {dict(request.headers)}")
-        logger.info(f"Registration attempt - Content type: {request.content_type}")
-        
         try:
+            # The serializer rejects a body that is not an object; don't fail on it here first
+            username = request.data.get('username', 'unknown') if isinstance(request.data, dict) else 'unknown'
+            logger.info(f"Registration attempt for: {username}")
             serializer = self.get_serializer(data=request.data)
-            logger.info(f"Serializer created successfully")
             
             if serializer.is_valid():
-                logger.info(f"Serializer validation successful")
-                logger.info(f"Validated data: {serializer.validated_data}")
-                
                 user = serializer.save()
-                logger.info(f"User created successfully: {user.username} (ID: {user.id})")
-                
                 refresh = RefreshToken.for_user(user)
-                logger.info(f"JWT tokens generated for user: {user.username}")
                 
                 response_data = {
                     'message': 'User registered successfully',
@@ -46,30 +38,17 @@ class UserRegistrationView(generics.CreateAPIView):
                         'access': str(refresh.access_token),
                     }
                 }
-                logger.info(f"Registration successful for user: {user.username}")
+                logger.info(f"Registration successful for user: {user.username} (ID: {user.id})")
                 
                 response = Response(response_data, status=status.HTTP_201_CREATED)
                 response['Content-Type'] = 'application/json'
                 return response
             else:
-                logger.error(f"Serializer validation failed")
-                logger.error(f"Serializer errors: {serializer.errors}")
-                
-                # Log individual field errors
-                for field, errors in serializer.errors.items():
-                    logger.error(f"Field '{field}' errors: {errors}")
-                
-                # Log non-field errors if they exist
-                if 'non_field_errors' in serializer.errors:
-                    logger.error(f"Non-field errors: {serializer.errors['non_field_errors']}")
-                
+                logger.warning(f"Registration rejected: {serializer.errors}")
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 
         except Exception as e:
-            logger.error(f"Unexpected error during registration: {str(e)}")
-            logger.error(f"Exception type: {type(e).__name__}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception(f"Unexpected error during registration: {str(e)}")
             
             return Response({
                 'error': 'Internal server error during registration',
@@ -0,0 +1,47 @@
+"""
+Latency of ``GET /api/patients/`` at high concurrency: sync gunicorn workers
+(WSGI, sync views) against gunicorn with uvicorn workers (ASGI, async views).
+
+Seeds a temporary SQLite database, starts each server on it in turn and
+keeps ``--connections`` requests in flight until ``--requests`` have
+completed. Every request opens its own connection, since sync gunicorn
+workers do not keep connections alive.
+
+    python -m benchmarks.bench_async_reads --connections 500 --workers 4
+"""
+import argparse
+
+from benchmarks.common import gunicorn, http_get, print_table, run_load, server_database
+
+STACKS = {
+    'wsgi sync': ['healthcare_backend.wsgi'],
+    'asgi async': ['healthcare_backend.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    env, token = server_database('bench-async-', args.rows)
+    request = http_get('/api/patients/', token)
+
+    rows = []
+    for name, target in STACKS.items():
+        with gunicorn([*target, '-w', str(args.workers), '--backlog', '4096'], env) as port:
+            rate, p50, p99, errors = run_load(port, request, args.connections, args.requests)
+        if p50 is None:
+            rows.append((name, '0', '', '', str(errors)))
+            continue
+        rows.append((name, f'{rate:.0f}', f'{p50:.0f}', f'{p99:.0f}', str(errors)))
+
+    print(f'GET /api/patients/ ({args.rows} patients, {args.connections} concurrent, {args.workers} workers)')
+    print_table(('stack', 'req/s', 'p50 ms', 'p99 ms', 'errors'), rows)
+
+
+if __name__ == '__main__':
+    main()
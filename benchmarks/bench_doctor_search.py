@@ -0,0 +1,74 @@
+"""
+Latency of directory searches on ``GET /api/doctors/`` against a large
+doctor table. Run against PostgreSQL (DATABASE_URL) to exercise the GIN
+full-text index. The budget does not cover ``q`` on SQLite: its
+``icontains`` fallback scans the table, so those rows are marked ``n/a``.
+
+The doctor directory cache is replaced by a dummy cache, so every sample
+runs the query rather than returning a cached page.
+
+    python -m benchmarks.bench_doctor_search --rows 1000000 --budget-ms 20
+"""
+import argparse
+import os
+
+from benchmarks.common import (
+    build_doctors, bulk_insert, create_user, measure, print_table, setup_django, test_database,
+)
+
+QUERIES = [
+    ('first page', {}),
+    ('specialization', {'specialization': 'CARDIOLOGY'}),
+    ('city + state', {'city': 'Austin', 'state': 'TX'}),
+    ('zip code', {'zip_code': '10451'}),
+    ('fee range', {'min_fee': '100', 'max_fee': '120', 'ordering': 'consultation_fee'}),
+    ('experience + specialization', {'specialization': 'NEUROLOGY', 'min_experience': '20'}),
+    ('name search', {'q': 'First12345'}),
+    ('clinic search', {'q': 'Clinic 42', 'specialization': 'PEDIATRICS'}),
+    ('cursor page', {'pagination': 'cursor', 'specialization': 'ONCOLOGY'}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    # Every request must reach the database, not the doctors.cache entry of the warmup
+    os.environ['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from doctors.models import Doctor
+
+    with test_database():
+        user = create_user()
+        for start in range(0, args.rows, 20000):
+            bulk_insert(Doctor, build_doctors(user, min(20000, args.rows - start), start))
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE doctors_doctor')
+
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('doctor_list')
+        rows = []
+        for name, params in QUERIES:
+            response = client.get(url, params)
+            assert response.status_code == 200, response.data
+            median, p95 = measure(lambda: client.get(url, params), repeat=args.repeat)
+            if 'q' in params and connection.vendor != 'postgresql':
+                verdict = 'n/a'
+            else:
+                verdict = 'ok' if p95 <= args.budget_ms else 'SLOW'
+            rows.append((name, len(response.data['results']), f'{median:.2f}', f'{p95:.2f}', verdict))
+
+        print(f'{args.rows} doctors on {connection.vendor} (ms per request, budget {args.budget_ms} ms)')
+        print_table(('query', 'rows', 'median', 'p95', ''), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Peak Python memory and time of ``GET /api/exports/patients/`` as the table
+grows, against serializing every row into one response body. The streamed
+export should stay flat; the single body grows with the table.
+
+    python -m benchmarks.bench_export --rows 1000 10000 50000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import build_patients, bulk_insert, create_user, print_table, setup_django, test_database
+
+
+def traced(func):
+    """``(result, peak MB, seconds)`` of ``func()``"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 1024 / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from healthcare_backend.renderers import FastJSONRenderer
+    from patients.models import Patient
+    from patients.serializers import patient_rows
+
+    settings.EXPORT_CHUNK_SIZE = args.chunk_size
+    rows = []
+    with test_database():
+        user = create_user()
+        client = APIClient()
+        client.force_authenticate(user)
+        inserted = 0
+        for count in sorted(args.rows):
+            bulk_insert(Patient, build_patients(user, count - inserted, start=inserted))
+            inserted = count
+
+            def buffered():
+                data = patient_rows.serialize(list(patient_rows.values(Patient.objects.owned_by(user))))
+                return len(FastJSONRenderer().render(data))
+
+            def streamed(query=''):
+                response = client.get(reverse('export', args=['patients']) + query)
+                return sum(len(chunk) for chunk in response.streaming_content)
+
+            for name, func in (
+                ('one JSON body', buffered),
+                ('export ndjson', streamed),
+                ('export csv.gz', lambda: streamed('?file_format=csv&gzip=true')),
+            ):
+                size, peak, elapsed = traced(func)
+                rows.append((f'{count:,}', name, f'{size:,}', f'{peak:.1f}', f'{elapsed * 1000:.0f}'))
+
+    print(f'chunk size {args.chunk_size}')
+    print_table(('patients', 'output', 'bytes', 'peak MB', 'ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
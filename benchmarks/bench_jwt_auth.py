@@ -0,0 +1,51 @@
+"""
+Compare simplejwt's ``JWTAuthentication`` (one ``auth_user`` lookup per
+request) with ``StatelessJWTAuthentication`` on ``GET /api/patients/``
+with a real Bearer token.
+
+    python -m benchmarks.bench_jwt_auth
+"""
+import argparse
+
+from benchmarks.common import build_patients, bulk_insert, create_user, measure, print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+    from authentication.backends import StatelessJWTAuthentication
+    from healthcare_backend.middleware import QueryTimer
+    from patients.models import Patient
+    from patients.views import PatientListCreateView
+
+    with test_database():
+        user = create_user()
+        bulk_insert(Patient, build_patients(user, args.rows))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        url = reverse('patient_list_create')
+
+        rows = []
+        for backend in (JWTAuthentication, StatelessJWTAuthentication):
+            PatientListCreateView.authentication_classes = [backend]
+            queries = QueryTimer()
+            with connection.execute_wrapper(queries):
+                assert client.get(url).status_code == 200
+            median, p95 = measure(lambda: client.get(url), repeat=args.repeat)
+            rows.append((backend.__name__, queries.count, f'{median:.3f}', f'{p95:.3f}'))
+
+        print(f'GET {url} ({args.rows} patients, first page)')
+        print_table(('backend', 'queries', 'median ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
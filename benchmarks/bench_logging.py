@@ -0,0 +1,71 @@
+"""
+Latency of ``POST /api/auth/register/`` with logging off, with the
+handlers called synchronously (``LOG_ASYNC=False``) and behind the queue
+(``LOG_ASYNC=True``, the default).
+
+Passwords are hashed with MD5 here so the hasher does not drown out the
+logging cost. ``--debug`` logs at DEBUG level, which adds the SQL of every
+query from ``django.db.backends`` when ``DEBUG`` is on.
+
+    python -m benchmarks.bench_logging --repeat 200
+"""
+import argparse
+import itertools
+import logging
+import os
+import tempfile
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-logging-')
+    os.environ['LOG_FILE'] = os.path.join(workdir, 'bench.log')
+    setup_django()
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from healthcare_backend import logs
+
+    client = APIClient()
+    url = reverse('api_user_register')
+    counter = itertools.count()
+
+    def register():
+        index = next(counter)
+        response = client.post(url, {
+            'username': f'bench{index}', 'email': f'bench{index}@example.com', 'first_name': 'Bench',
+            'last_name': 'User', 'password': 'Benchmark-pass-123', 'password_confirm': 'Benchmark-pass-123',
+        }, format='json')
+        assert response.status_code == 201, response.content
+
+    config = dict(settings.LOGGING)
+    if args.debug:
+        config['root'] = dict(config['root'], level='DEBUG')
+    # Console output would dominate; time the file handler only
+    config['root'] = dict(config['root'], handlers=['file'])
+
+    rows = []
+    with test_database(), override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+        for name, async_logging, enabled in (('off', False, False), ('sync', False, True), ('queued', True, True)):
+            with override_settings(LOG_ASYNC=async_logging):
+                logs.configure(config)
+                logging.disable(logging.NOTSET if enabled else logging.CRITICAL)
+                median, p95 = measure(register, repeat=args.repeat, warmup=10)
+                logs.stop()
+            rows.append((name, f'{median:.2f}', f'{p95:.2f}'))
+        logging.disable(logging.NOTSET)
+
+    print(f'POST /api/auth/register/ ({args.repeat} requests, log file {os.environ["LOG_FILE"]})')
+    print_table(('logging', 'median ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Time ``POST /api/auth/login/`` under each password hasher policy and report
+logins per second per core (one request at a time, so one core).
+
+    python -m benchmarks.bench_login
+    PASSWORD_SCRYPT_WORK_FACTOR=32768 python -m benchmarks.bench_login
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import get_hasher
+    from django.contrib.auth.models import User
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    url = reverse('api_user_login')
+    rows = []
+    with test_database():
+        for path in settings.PASSWORD_HASHERS:
+            hasher = path.rsplit('.', 1)[1]
+            with override_settings(PASSWORD_HASHERS=[path]):
+                try:
+                    get_hasher().encode('probe', get_hasher().salt())
+                except ValueError:
+                    rows.append((hasher, 'not installed', '', '', ''))
+                    continue
+                username = f'bench-{hasher.lower()}'
+                User.objects.create_user(username=username, password='benchmark-pass-123')
+                credentials = {'username': username, 'password': 'benchmark-pass-123'}
+                assert client.post(url, credentials, format='json').status_code == 200
+                encoded = User.objects.get(username=username).password
+                hash_ms, _ = measure(lambda: get_hasher().verify('benchmark-pass-123', encoded), repeat=args.repeat)
+                median, p95 = measure(lambda: client.post(url, credentials, format='json'), repeat=args.repeat)
+            rows.append((hasher, f'{hash_ms:.1f}', f'{median:.1f}', f'{p95:.1f}', f'{1000 / median:.1f}'))
+
+    print('POST /api/auth/login/')
+    print_table(('hasher', 'verify ms', 'login median ms', 'p95 ms', 'logins/s/core'), rows)
+
+
+if __name__ == '__main__':
+    main()
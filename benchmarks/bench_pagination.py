@@ -0,0 +1,55 @@
+"""
+Compare page-number (OFFSET + COUNT) and keyset pagination latency at
+increasing page depths on ``GET /api/patients/``.
+
+    python -m benchmarks.bench_pagination --rows 100000
+"""
+import argparse
+
+from benchmarks.common import (
+    build_patients, bulk_insert, create_user, measure, print_table, setup_django, test_database,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from healthcare_backend.pagination import CreatedAtKeysetPagination
+    from patients.models import Patient
+
+    with test_database():
+        user = create_user()
+        for start in range(0, args.rows, 10000):
+            bulk_insert(Patient, build_patients(user, min(10000, args.rows - start), start))
+
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('patient_list_create')
+        page_size = CreatedAtKeysetPagination.page_size
+        last_page = args.rows // page_size
+        depths = sorted({1, 10, 100, 1000, last_page // 2, last_page} & set(range(1, last_page + 1)))
+
+        rows = []
+        for page in depths:
+            offset_ms, _ = measure(lambda: client.get(url, {'page': page}), repeat=args.repeat)
+
+            # Position the cursor on the last row of the previous page, as a client walking the list would
+            cursor_params = {'pagination': 'cursor'}
+            if page > 1:
+                boundary = Patient.objects.owned_by(user).order_by('-created_at', '-id')[(page - 1) * page_size - 1]
+                cursor_params = {'cursor': CreatedAtKeysetPagination.cursor_token(boundary)}
+            keyset_ms, _ = measure(lambda: client.get(url, cursor_params), repeat=args.repeat)
+            rows.append((page, f'{offset_ms:.2f}', f'{keyset_ms:.2f}'))
+
+        print(f'{args.rows} patients, {page_size} per page (median ms per request)')
+        print_table(('page', 'offset', 'keyset'), rows)
+
+
+if __name__ == '__main__':
+    main()
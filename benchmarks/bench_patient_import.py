@@ -0,0 +1,73 @@
+"""
+Throughput of the bulk CSV import against one ``POST /api/patients/`` per
+row. The per-request path is timed on a sample and reported as rows/sec.
+
+    python -m benchmarks.bench_patient_import --rows 100000
+"""
+import argparse
+import csv
+import tempfile
+import time
+
+from benchmarks.common import create_user, print_table, setup_django, test_database
+
+COLUMNS = [
+    'first_name', 'last_name', 'email', 'phone_number', 'date_of_birth', 'gender',
+    'address', 'city', 'state', 'zip_code', 'blood_type', 'allergies', 'medical_history',
+]
+
+
+def patient_row(index, prefix):
+    return {
+        'first_name': f'First{index}', 'last_name': f'Last{index}', 'email': f'{prefix}{index}@example.com',
+        'phone_number': f'+1555{index:07d}', 'date_of_birth': '1980-01-15', 'gender': 'F',
+        'address': f'{index} Main St', 'city': 'New York', 'state': 'NY', 'zip_code': '10001',
+        'blood_type': 'O+', 'allergies': 'None', 'medical_history': 'None',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--sample', type=int, default=2000, help='Rows posted one by one for the baseline')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    with test_database():
+        # Authenticate with a real token: every per-row request pays for it in production too
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(create_user())}')
+
+        start = time.perf_counter()
+        for index in range(args.sample):
+            response = client.post(reverse('patient_list_create'), patient_row(index, 'single'), format='json')
+            assert response.status_code == 201, response.data
+        single_rate = args.sample / (time.perf_counter() - start)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', newline='') as export:
+            writer = csv.DictWriter(export, COLUMNS)
+            writer.writeheader()
+            for index in range(args.rows):
+                writer.writerow(patient_row(index, 'bulk'))
+            export.flush()
+
+            with open(export.name, 'rb') as upload:
+                start = time.perf_counter()
+                response = client.post(reverse('patient_import'), {'file': upload}, format='multipart')
+                elapsed = time.perf_counter() - start
+        assert response.data['created'] == args.rows, response.data
+        bulk_rate = args.rows / elapsed
+
+        print_table(('path', 'rows', 'rows/sec'), [
+            ('POST /api/patients/', args.sample, f'{single_rate:,.0f}'),
+            ('POST /api/patients/import/', args.rows, f'{bulk_rate:,.0f}'),
+        ])
+        print(f'speedup: {bulk_rate / single_rate:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Latency of ``GET /api/patients/search/`` as the patient table grows, to show
+lookups stay on the indexes instead of scanning.
+
+    python -m benchmarks.bench_patient_search --sizes 10000 100000 300000
+"""
+import argparse
+
+from benchmarks.common import (
+    build_patients, bulk_insert, create_user, measure, print_table, setup_django, test_database,
+)
+
+QUERIES = [
+    ('name prefix', {'q': 'first4242'}),
+    ('first + last prefix', {'q': 'first4242 last42'}),
+    ('email prefix', {'q': 'patient4242@'}),
+    ('phone prefix', {'q': '+1 555 000 42'}),
+    ('fuzzy name', {'q': 'fisrt4242', 'fuzzy': 'true'}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from patients.models import Patient
+
+    with test_database():
+        user = create_user()
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('patient_search')
+
+        results = {name: [] for name, _ in QUERIES}
+        loaded = 0
+        for size in sorted(args.sizes):
+            while loaded < size:
+                batch = build_patients(user, min(10000, size - loaded), loaded)
+                for patient in batch:
+                    patient.normalize_search_fields()
+                bulk_insert(Patient, batch)
+                loaded += len(batch)
+            for name, params in QUERIES:
+                median, _ = measure(lambda: client.get(url, params), repeat=args.repeat)
+                results[name].append(f'{median:.2f}')
+
+        print(f'patient search on {connection.vendor} (median ms per request)')
+        print_table(('query', *map(str, sorted(args.sizes))), [(name, *values) for name, values in results.items()])
+
+
+if __name__ == '__main__':
+    main()
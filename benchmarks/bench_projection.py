@@ -0,0 +1,54 @@
+"""
+Full patient responses against sparse fieldsets (``?fields=``/``?exclude=``)
+on the list page and the detail endpoint, with ``--text-kb`` of allergies
+and medical history per patient. Reports response size and median latency.
+
+    python -m benchmarks.bench_projection --text-kb 4
+"""
+import argparse
+
+from benchmarks.common import build_patients, bulk_insert, create_user, measure, print_table, setup_django, test_database
+
+QUERIES = (
+    ('all fields', {}),
+    ('picker', {'fields': 'id,full_name'}),
+    ('no text columns', {'exclude': 'address,allergies,medical_history'}),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--text-kb', type=int, default=4)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from patients.models import Patient
+
+    with test_database():
+        user = create_user()
+        patients = build_patients(user, args.rows)
+        text = 'x' * (args.text_kb * 512)
+        for patient in patients:
+            patient.allergies = patient.medical_history = text
+        bulk_insert(Patient, patients)
+        client = APIClient()
+        client.force_authenticate(user)
+        detail = reverse('patient_detail', args=[Patient.objects.values_list('pk', flat=True).first()])
+
+        rows = []
+        for endpoint, url in (('list page', reverse('patient_list_create')), ('detail', detail)):
+            for name, params in QUERIES:
+                size = len(client.get(url, params).content)
+                median, p95 = measure(lambda: client.get(url, params), repeat=args.repeat)
+                rows.append((endpoint, name, f'{size:,}', f'{median:.2f}', f'{p95:.2f}'))
+
+        print(f'{args.rows} patients, {args.text_kb} KB of text columns per patient')
+        print_table(('endpoint', 'projection', 'bytes', 'median ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare DRF's stdlib ``JSONRenderer`` with the orjson-backed
+``FastJSONRenderer`` on ``PatientSerializer`` pages of 20, 100 and 1000 rows.
+
+    python -m benchmarks.bench_render
+"""
+import argparse
+
+from benchmarks.common import build_patients, bulk_insert, create_user, measure, print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from healthcare_backend.renderers import FastJSONRenderer
+    from patients.models import Patient
+    from patients.serializers import PatientSerializer
+
+    with test_database():
+        user = create_user()
+        bulk_insert(Patient, build_patients(user, 1000))
+        patients = list(Patient.objects.owned_by(user).for_serializer())
+
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        rows = []
+        for size in (20, 100, 1000):
+            # A page as the list view renders it
+            data = {
+                'count': len(patients), 'next': None, 'previous': None,
+                'results': PatientSerializer(patients[:size], many=True).data,
+            }
+            assert stdlib.render(data) == fast.render(data)
+            stdlib_ms, _ = measure(lambda: stdlib.render(data), repeat=args.repeat)
+            fast_ms, _ = measure(lambda: fast.render(data), repeat=args.repeat)
+            rows.append((
+                size, f'{stdlib_ms:.3f}', f'{fast_ms:.3f}',
+                f'{size / fast_ms * 1000:,.0f}', f'{stdlib_ms / fast_ms:.1f}x',
+            ))
+
+        print('Render time per page (median ms)')
+        print_table(('rows', 'json', 'orjson', 'orjson rows/s', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
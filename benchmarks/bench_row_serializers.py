@@ -0,0 +1,74 @@
+"""
+Compare the ``ModelSerializer`` path with the compiled ``RowSerializer``
+path for the patient, doctor and mapping list pages at 20, 100 and 1000
+rows: building the output data from already fetched rows ("serialize"),
+and fetching plus building ("page").
+
+    python -m benchmarks.bench_row_serializers
+"""
+import argparse
+
+from benchmarks.common import (
+    build_doctors, build_patients, bulk_insert, create_user, measure, print_table, setup_django, test_database,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from doctors.models import Doctor
+    from doctors.serializers import DoctorListSerializer, doctor_list_rows
+    from mappings.models import PatientDoctorMapping
+    from mappings.serializers import PatientDoctorMappingSerializer, mapping_rows
+    from patients.models import Patient
+    from patients.serializers import PatientSerializer, patient_rows
+
+    with test_database():
+        user = create_user()
+        bulk_insert(Patient, build_patients(user, 1000))
+        bulk_insert(Doctor, build_doctors(user, 1000))
+        patients = list(Patient.objects.all())
+        doctors = list(Doctor.objects.all())
+        bulk_insert(PatientDoctorMapping, [
+            PatientDoctorMapping(patient=patient, doctor=doctor, created_by=user)
+            for patient, doctor in zip(patients, doctors)
+        ])
+
+        endpoints = [
+            ('patients', PatientSerializer, Patient.objects.owned_by(user).for_serializer(),
+             patient_rows, Patient.objects.owned_by(user)),
+            ('doctors', DoctorListSerializer, Doctor.objects.available(),
+             doctor_list_rows, Doctor.objects.available()),
+            ('mappings', PatientDoctorMappingSerializer, PatientDoctorMapping.objects.owned_by(user).for_serializer(),
+             mapping_rows, PatientDoctorMapping.objects.owned_by(user)),
+        ]
+        rows = []
+        for name, serializer_class, instances, row_serializer, queryset in endpoints:
+            for size in (20, 100, 1000):
+                fetched = list(instances[:size])
+                fetched_rows = list(row_serializer.values(queryset)[:size])
+                model_ms, _ = measure(lambda: serializer_class(fetched, many=True).data, repeat=args.repeat)
+                rows_ms, _ = measure(lambda: row_serializer.serialize(fetched_rows), repeat=args.repeat)
+                model_page_ms, _ = measure(
+                    lambda: serializer_class(instances[:size], many=True).data, repeat=args.repeat
+                )
+                rows_page_ms, _ = measure(
+                    lambda: row_serializer.serialize(row_serializer.values(queryset)[:size]), repeat=args.repeat
+                )
+                rows.append((
+                    name, size,
+                    f'{model_ms:.3f}', f'{rows_ms:.3f}', f'{model_ms / rows_ms:.1f}x',
+                    f'{model_page_ms:.3f}', f'{rows_page_ms:.3f}', f'{model_page_ms / rows_page_ms:.1f}x',
+                ))
+
+        print('Median ms: serialize = build output from fetched rows, page = fetch + build')
+        print_table((
+            'endpoint', 'rows', 'serialize model', 'compiled', 'speedup', 'page model', 'compiled', 'speedup',
+        ), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Concurrent writers and readers on one SQLite file, as with several gunicorn
+workers on the default SQLite deployment: Django's stock SQLite backend
+(``SQLITE_TUNED=False``) against the tuned one (WAL, pragmas, IMMEDIATE
+transactions).
+
+Each of ``--processes`` processes runs for ``--seconds``, mixing reads of
+a patient page with update transactions that read a row and then write it,
+as the update views and bulk imports do. Reports operations per second and
+how many failed with "database is locked".
+
+    python -m benchmarks.bench_sqlite --processes 4 --writes 0.3
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import build_patients, bulk_insert, create_user, print_table, setup_django
+
+PROFILES = {'stock': 'False', 'tuned': 'True'}
+
+
+def configure(path, tuned):
+    os.environ.update(DB_NAME=path, SQLITE_TUNED=tuned, SQLITE_IMMEDIATE_TRANSACTIONS=tuned, DEBUG='False')
+    for name in ('DATABASE_URL', 'DB_ENGINE', 'DATABASE_REPLICA_URLS'):
+        os.environ.pop(name, None)
+
+
+def worker(path, tuned, seconds, writes, results):
+    configure(path, tuned)
+    setup_django()
+    from django.db import OperationalError, transaction
+    from patients.models import Patient
+
+    ids = list(Patient.objects.values_list('pk', flat=True))
+    reads = updates = locked = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if random.random() < writes:
+                with transaction.atomic():
+                    patient = Patient.objects.get(pk=random.choice(ids))
+                    patient.city = f'City {random.randrange(1000)}'
+                    patient.save(update_fields=['city', 'updated_at'])
+                updates += 1
+            else:
+                list(Patient.objects.order_by('-created_at')[:20])
+                reads += 1
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked += 1
+    results.put((reads, updates, locked))
+
+
+def populate(path, tuned, rows):
+    configure(path, tuned)
+    setup_django()
+    from django.core.management import call_command
+    from patients.models import Patient
+
+    call_command('migrate', verbosity=0)
+    bulk_insert(Patient, build_patients(create_user(), rows))
+
+
+def run(context, target, *args):
+    process = context.Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--writes', type=float, default=0.3, help='share of operations that are updates')
+    parser.add_argument('--rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    workdir = tempfile.mkdtemp(prefix='bench-sqlite-')
+    rows = []
+    for name, tuned in PROFILES.items():
+        path = os.path.join(workdir, f'{name}.sqlite3')
+        run(context, populate, path, tuned, args.rows).join()
+        results = context.Queue()
+        processes = [
+            run(context, worker, path, tuned, args.seconds, args.writes, results) for _ in range(args.processes)
+        ]
+        totals = [sum(values) for values in zip(*(results.get() for _ in processes))]
+        for process in processes:
+            process.join()
+        reads, updates, locked = totals
+        rows.append((
+            name, f'{reads / args.seconds:.0f}', f'{updates / args.seconds:.0f}', str(locked),
+            f'{locked / max(updates + locked, 1):.1%}',
+        ))
+
+    print(f'{args.processes} processes, {args.writes:.0%} updates, {args.seconds:.0f}s each')
+    print_table(('backend', 'reads/s', 'updates/s', 'locked', 'failed updates'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Throughput of each gunicorn worker class under ``gunicorn_config``.
+
+Starts gunicorn with ``-c python:healthcare_backend.gunicorn_config`` once
+per ``GUNICORN_WORKER_CLASS`` on a seeded temporary SQLite database and
+loads a few read endpoints in turn. Other ``GUNICORN_*`` variables and
+``WEB_CONCURRENCY`` are passed through, so sizing changes can be compared
+run against run. ``--output`` appends the results as JSON lines.
+
+    python -m benchmarks.bench_workers --connections 100
+    GUNICORN_THREADS=8 python -m benchmarks.bench_workers --output workers.jsonl
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import gunicorn, http_get, print_table, run_load, server_database
+
+WORKER_CLASSES = ('sync', 'gthread', 'uvicorn')
+PATHS = ('/api/patients/', '/api/patients/1/', '/api/doctors/')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--worker-class', action='append', choices=WORKER_CLASSES)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    env, token = server_database('bench-workers-', args.rows)
+    from healthcare_backend import gunicorn_config
+
+    rows, records = [], []
+    for kind in args.worker_class or WORKER_CLASSES:
+        workers, threads, worker_connections = gunicorn_config.sizes(kind)
+        server_env = dict(env, GUNICORN_WORKER_CLASS=kind)
+        with gunicorn(['-c', 'python:healthcare_backend.gunicorn_config', '--backlog', '4096'], server_env) as port:
+            for path in PATHS:
+                rate, p50, p99, errors = run_load(port, http_get(path, token), args.connections, args.requests)
+                rows.append((
+                    kind, f'{workers}x{threads}', path, f'{rate:.0f}',
+                    '' if p50 is None else f'{p50:.0f}', '' if p99 is None else f'{p99:.0f}', str(errors),
+                ))
+                records.append({
+                    'time': time.time(), 'worker_class': kind, 'workers': workers, 'threads': threads,
+                    'worker_connections': worker_connections, 'path': path, 'connections': args.connections,
+                    'requests_per_second': round(rate, 1), 'p50_ms': p50, 'p99_ms': p99, 'errors': errors,
+                })
+
+    print(f'{args.rows} patients, {args.connections} concurrent, {gunicorn_config.available_cpus()} CPUs')
+    print_table(('worker', 'workers', 'path', 'req/s', 'p50 ms', 'p99 ms', 'errors'), rows)
+    if args.output:
+        with open(args.output, 'a') as output:
+            for record in records:
+                output.write(json.dumps(record) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway test database created the same way
+``manage.py test`` does, so they never touch real data::
+
+    python -m benchmarks.bench_pagination --rows 100000
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare_backend.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity=0):
+    """Create a fresh test database for the duration of the block"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Run ``func`` and return the median and p95 wall time in milliseconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    line = '  '.join(f'{{:>{width}}}' for width in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
+
+
+def create_user(username='benchmark'):
+    from django.contrib.auth.models import User
+    return User.objects.create_user(username=username, password='benchmark-pass-123')
+
+
+def build_patients(user, count, start=0):
+    from patients.models import Patient
+    return [
+        Patient(
+            created_by=user,
+            first_name=f'First{index}',
+            last_name=f'Last{index % 5000}',
+            email=f'patient{index}@example.com',
+            phone_number=f'+1555{index:07d}',
+            date_of_birth=date(1950 + index % 60, 1 + index % 12, 1 + index % 28),
+            gender='MFO'[index % 3],
+            address=f'{index} Main St',
+            city='New York',
+            state='NY',
+            zip_code=f'{10000 + index % 900}',
+            blood_type='O+',
+            allergies='None',
+            medical_history='No significant medical history',
+        )
+        for index in range(start, start + count)
+    ]
+
+
+def build_doctors(user, count, start=0):
+    from doctors.models import Doctor
+    specializations = [choice for choice, _ in Doctor.SPECIALIZATION_CHOICES]
+    cities = [('Boston', 'MA'), ('New York', 'NY'), ('Chicago', 'IL'), ('Austin', 'TX'), ('Seattle', 'WA')]
+    doctors = []
+    for index in range(start, start + count):
+        city, state = cities[index % len(cities)]
+        doctors.append(Doctor(
+            created_by=user,
+            first_name=f'First{index}',
+            last_name=f'Last{index % 5000}',
+            email=f'doctor{index}@hospital.com',
+            phone_number=f'+1987{index:07d}',
+            specialization=specializations[index % len(specializations)],
+            license_number=f'MD{index:08d}',
+            years_of_experience=index % 40,
+            qualification='MD',
+            clinic_name=f'Clinic {index % 1000}',
+            clinic_address=f'{index} Medical Center Dr',
+            city=city,
+            state=state,
+            zip_code=f'{10000 + index % 900}',
+            consultation_fee=Decimal(50 + index % 450),
+            is_available=index % 10 != 0,
+        ))
+    return doctors
+
+
+def bulk_insert(model, objects, batch_size=2000):
+    model.objects.bulk_create(objects, batch_size=batch_size)
+
+
+def server_database(prefix, rows):
+    """
+    Migrate a temporary SQLite database, seed ``rows`` patients and return
+    the environment for servers using it and a bearer token for its user.
+    """
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    env = dict(
+        os.environ, DB_NAME=os.path.join(workdir, 'bench.sqlite3'), DEBUG='False',
+        SECURE_SSL_REDIRECT='False', SERVER_TIMING_HEADER='False',
+    )
+    env.pop('ASYNC_READ_VIEWS', None)
+    os.environ.update(env)
+    subprocess.run([sys.executable, str(BASE_DIR / 'manage.py'), 'migrate', '-v', '0'], env=env, check=True)
+
+    setup_django()
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import AccessToken
+    from patients.models import Patient
+
+    user = create_user()
+    bulk_insert(Patient, build_patients(user, rows))
+    token = AccessToken.for_user(user)
+    connection.close()
+    return env, str(token)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+@contextmanager
+def gunicorn(args, env):
+    """
+    Run ``gunicorn *args`` on a free port and yield the port. The server runs
+    in the database's directory so its log file lands there too.
+    """
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *args, '-b', f'127.0.0.1:{port}'],
+        cwd=os.path.dirname(env['DB_NAME']), env=dict(env, PYTHONPATH=str(BASE_DIR)), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        yield port
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def http_get(path, token):
+    return (
+        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+        f'Authorization: Bearer {token}\r\nConnection: close\r\n\r\n'
+    ).encode()
+
+
+async def fetch(port, request):
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(request)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return time.perf_counter() - started, int(response[9:12])
+
+
+async def load(port, request, connections, total):
+    """Issue ``total`` requests, ``connections`` at a time; return latencies, errors and wall time"""
+    pending = iter(range(total))
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        for _ in pending:
+            try:
+                elapsed, status = await fetch(port, request)
+            except (OSError, ValueError):
+                errors += 1
+                continue
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return sorted(latencies), errors, time.perf_counter() - started
+
+
+def run_load(port, request, connections, total):
+    """Warm the server up, then load it; return req/s, p50 and p99 in ms and the error count"""
+    asyncio.run(load(port, request, min(connections, 50), 200))
+    latencies, errors, seconds = asyncio.run(load(port, request, connections, total))
+    if not latencies:
+        return 0.0, None, None, errors
+    percentile = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+    return len(latencies) / seconds, percentile(0.5), percentile(0.99), errors
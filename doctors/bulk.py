@@ -0,0 +1,185 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from healthcare_backend.batching import chunked
+from stats import counters
+from . import cache
+from .models import Doctor
+from .serializers import DoctorBulkSerializer
+
+BATCH_SIZE = 500
+MAX_RECORDS = 5000
+
+UPDATE_FIELDS = [
+    field for field in DoctorBulkSerializer.Meta.fields if field != 'license_number'
+] + ['updated_at']
+
+CONFLICT = 'Another doctor took this email or license number while the request was processed.'
+
+
+class DoctorBulkUpserter:
+    """
+    Create or update doctors for ``user`` keyed on ``license_number``.
+
+    Per batch, records are validated with one ``DoctorBulkSerializer``
+    instance, both unique keys are checked with a single ``IN`` query and
+    the writes happen in one transaction: ``bulk_create`` for new licenses
+    and, for licenses the user already owns, ``bulk_create`` with
+    ``update_conflicts`` where the database supports it (``bulk_update``
+    elsewhere). Re-sending the same payload updates the same rows, so a
+    retried request is safe.
+
+    An email may only move to a doctor once no other row holds it, so
+    records that swap or take over emails within one batch are rejected
+    rather than left to the unique constraint. If the batch still hits
+    one (a concurrent writer), it is written record by record and the
+    records that conflict are reported as errors.
+    """
+
+    def __init__(self, user, batch_size=BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.serializer = DoctorBulkSerializer()
+        self.results = []
+        self.errors = []
+
+    def run(self, records):
+        for batch in chunked(enumerate(records), self.batch_size):
+            self.upsert_batch(batch)
+        if self.results:
+            # bulk_create/bulk_update bypass the model signals
+            cache.invalidate()
+        return self.manifest()
+
+    def manifest(self):
+        statuses = [result['status'] for result in self.results]
+        return {
+            'created': statuses.count('created'),
+            'updated': statuses.count('updated'),
+            'failed': len(self.errors),
+            'results': self.results,
+            'errors': self.errors,
+        }
+
+    def upsert_batch(self, batch):
+        valid = []
+        for index, record in batch:
+            try:
+                valid.append((index, self.serializer.run_validation(record)))
+            except ValidationError as exc:
+                self.errors.append({'index': index, 'errors': as_serializer_error(exc)})
+
+        try:
+            with transaction.atomic():
+                results, errors = self.write(valid)
+        except IntegrityError:
+            # A concurrent writer claimed one of the keys; re-check record by record
+            results, errors = self.write_each(valid)
+        self.results.extend(results)
+        self.errors.extend(errors)
+
+    def write_each(self, valid):
+        """Write records one at a time, reporting the ones the database still rejects"""
+        results, errors = [], []
+        for item in valid:
+            try:
+                with transaction.atomic():
+                    written, rejected = self.write([item])
+            except IntegrityError:
+                errors.append({'index': item[0], 'errors': {'non_field_errors': [CONFLICT]}})
+            else:
+                results.extend(written)
+                errors.extend(rejected)
+        return results, errors
+
+    def write(self, valid):
+        """Classify each record against the current rows and apply the batch"""
+        emails = {data['email'] for _, data in valid}
+        licenses = {data['license_number'] for _, data in valid}
+        existing = Doctor.objects.filter(
+            Q(email__in=emails) | Q(license_number__in=licenses)
+        ).order_by().values_list('id', 'email', 'license_number', 'created_by_id', 'specialization', 'city')
+        by_email, by_license = {}, {}
+        for pk, email, license_number, owner_id, *tracked in existing:
+            by_email[email] = pk
+            by_license[license_number] = (pk, owner_id, tracked)
+        # Rows this batch updates; their current emails are still taken while it runs
+        updated = {
+            by_license[license_number][0] for license_number in licenses
+            if license_number in by_license and by_license[license_number][1] == self.user.id
+        }
+
+        creates, updates, errors, replaced = [], [], [], []
+        seen_emails, seen_licenses = set(), set()
+        for index, data in valid:
+            email, license_number = data['email'], data['license_number']
+            if license_number in seen_licenses:
+                errors.append({'index': index, 'errors': {'license_number': ['Duplicate license number in request.']}})
+                continue
+            if email in seen_emails:
+                errors.append({'index': index, 'errors': {'email': ['Duplicate email in request.']}})
+                continue
+
+            current = by_license.get(license_number)
+            if current is not None and current[1] != self.user.id:
+                errors.append({'index': index, 'errors': {
+                    'license_number': ['A doctor with this license number already exists.']
+                }})
+                continue
+            current_pk = current[0] if current else None
+            if email in by_email and by_email[email] != current_pk:
+                if by_email[email] in updated:
+                    message = 'Another record in this request updates the doctor with this email; ' \
+                              'change it in a separate request.'
+                else:
+                    message = 'A doctor with this email already exists.'
+                errors.append({'index': index, 'errors': {'email': [message]}})
+                continue
+
+            seen_emails.add(email)
+            seen_licenses.add(license_number)
+            doctor = Doctor(created_by=self.user, **data)
+            if current_pk:
+                updates.append((index, doctor, current_pk))
+                replaced.extend(counters.doctor_keys(*current[2]))
+            else:
+                creates.append((index, doctor))
+
+        Doctor.objects.bulk_create([doctor for _, doctor in creates])
+        self.update(updates)
+        # Both bypass the model signals that keep the stats counters
+        written = [doctor for _, doctor in creates] + [doctor for _, doctor, _ in updates]
+        changes = counters.tally(replaced, -1)
+        changes.update(counters.tally(
+            key for doctor in written for key in counters.doctor_keys(doctor.specialization, doctor.city)
+        ))
+        counters.apply(self.user.id, changes)
+
+        results = [
+            {'index': index, 'status': 'created', 'id': doctor.pk} for index, doctor in creates
+        ] + [
+            {'index': index, 'status': 'updated', 'id': pk} for index, _, pk in updates
+        ]
+        results.sort(key=lambda result: result['index'])
+        return results, errors
+
+    def update(self, updates):
+        if not updates:
+            return
+        if connection.features.supports_update_conflicts_with_target:
+            # INSERT ... ON CONFLICT (license_number) DO UPDATE; created_at keeps its original value
+            Doctor.objects.bulk_create(
+                [doctor for _, doctor, _ in updates],
+                update_conflicts=True,
+                unique_fields=['license_number'],
+                update_fields=UPDATE_FIELDS,
+            )
+        else:
+            doctors = []
+            for _, doctor, pk in updates:
+                doctor.pk = pk
+                Doctor._meta.get_field('updated_at').pre_save(doctor, add=False)
+                doctors.append(doctor)
+            Doctor.objects.bulk_update(doctors, UPDATE_FIELDS)
@@ -0,0 +1,161 @@
+"""
+Read-through cache for the doctor directory.
+
+List pages and detail payloads are the same for every authenticated user,
+so the serialized data is cached under a directory-wide version key. Any
+doctor write (``doctors.signals`` and the bulk upsert) replaces the version,
+which orphans every cached entry at once; they expire on their own. The
+version is the time of the last write. Responses are validated by ``ETag``
+only: ``Last-Modified`` has one-second resolution, so a write in the same
+second as a read would answer ``If-Modified-Since`` with a stale 304.
+
+With the default local-memory cache each worker process has its own
+version, so set ``CACHE_BACKEND`` to a shared cache (Redis, Memcached or the
+database cache) to invalidate across workers; ``DOCTOR_CACHE_TIMEOUT``
+bounds the staleness otherwise.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+from healthcare_backend import metrics
+from healthcare_backend.db.routers import pin_primary
+from healthcare_backend.renderers import FastJSONRenderer
+
+VERSION_KEY = 'doctors:directory:version'
+
+hits = metrics.counter('doctor_cache_hits_total', 'Doctor directory responses served from the cache')
+misses = metrics.counter('doctor_cache_misses_total', 'Doctor directory responses built from the database')
+saved_seconds = metrics.counter(
+    'doctor_cache_saved_seconds_total', 'Time spent building the cached responses that hits reused'
+)
+
+
+def get_cache():
+    return caches[settings.DOCTOR_CACHE_ALIAS]
+
+
+def current_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time(), None)
+        version = cache.get(VERSION_KEY, time.time())
+    return version
+
+
+async def acurrent_version():
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time(), None)
+        version = await cache.aget(VERSION_KEY, time.time())
+    return version
+
+
+def _bump_version():
+    get_cache().set(VERSION_KEY, time.time(), None)
+
+
+def invalidate():
+    """
+    Start a new directory version; called on every doctor write.
+
+    The version is bumped again once the transaction commits, so a page
+    cached by a concurrent reader before the commit is not reused.
+    """
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+def cached_response(request, kind, build):
+    """
+    Return the cached payload for ``request`` or build, cache and return it.
+
+    ``build`` returns a DRF ``Response``; only 200 responses are cached. The
+    response carries an ``ETag``, and a matching ``If-None-Match`` gets a 304
+    without a body.
+    """
+    cache = get_cache()
+    version = current_version()
+    key = cache_key(request, kind, version)
+
+    entry = cache.get(key)
+    if entry is None:
+        misses.inc()
+        # An entry built from a lagging replica would outlive the lag
+        pin_primary('cache_fill')
+        started = time.perf_counter()
+        response = build()
+        if response.status_code != 200:
+            return response
+        entry = build_entry(response, started)
+        cache.set(key, entry, settings.DOCTOR_CACHE_TIMEOUT)
+    else:
+        response = reuse_entry(entry)
+    return conditional_response(request, response, entry)
+
+
+async def acached_response(request, kind, build):
+    """``cached_response`` for async views; ``build`` is a coroutine function"""
+    cache = get_cache()
+    version = await acurrent_version()
+    key = cache_key(request, kind, version)
+
+    entry = await cache.aget(key)
+    if entry is None:
+        misses.inc()
+        pin_primary('cache_fill')
+        started = time.perf_counter()
+        response = await build()
+        if response.status_code != 200:
+            return response
+        entry = build_entry(response, started)
+        await cache.aset(key, entry, settings.DOCTOR_CACHE_TIMEOUT)
+    else:
+        response = reuse_entry(entry)
+    return conditional_response(request, response, entry)
+
+
+def cache_key(request, kind, version):
+    # The absolute URI includes the host, which is baked into pagination links
+    url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'doctors:{kind}:{version}:{url_hash}'
+
+
+def build_entry(response, started):
+    body = FastJSONRenderer().render(response.data)
+    return {
+        'data': response.data,
+        'etag': quote_etag(hashlib.md5(body).hexdigest()),
+        'build_seconds': time.perf_counter() - started,
+    }
+
+
+def reuse_entry(entry):
+    hits.inc()
+    saved_seconds.inc(entry['build_seconds'])
+    return Response(entry['data'])
+
+
+def conditional_response(request, response, entry):
+    response['ETag'] = entry['etag']
+    response['Cache-Control'] = 'private, no-cache'
+    response['Vary'] = 'Authorization'
+    return get_conditional_response(request, etag=entry['etag'], response=response)
+
+
+def stats():
+    requests = hits.value + misses.value
+    return {
+        'hits': hits.value,
+        'misses': misses.value,
+        'hit_ratio': round(hits.value / requests, 4) if requests else 0.0,
+        'saved_ms': round(saved_seconds.value * 1000, 3),
+    }
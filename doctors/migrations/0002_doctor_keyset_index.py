@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='doctor',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['is_available', '-created_at', '-id'], name='doctor_avail_created_idx'),
+        ),
+    ]
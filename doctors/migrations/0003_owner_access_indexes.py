@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_doctor_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_avail_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-created_at', '-id'], name='doctor_available_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='doctor_owner_created_idx'),
+        ),
+    ]
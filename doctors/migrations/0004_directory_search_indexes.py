@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import healthcare_backend.db.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_owner_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['specialization', '-created_at', '-id'], name='doctor_specialization_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['city', 'state', '-created_at', '-id'], name='doctor_city_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['zip_code', '-created_at', '-id'], name='doctor_zip_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['consultation_fee'], name='doctor_fee_idx'),
+        ),
+        healthcare_backend.db.operations.VendorAddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('first_name', 'last_name', 'clinic_name', config='simple'), name='doctor_search_gin_idx'),
+            vendors=('postgresql',),
+        ),
+    ]
@@ -1,5 +1,28 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+
+# Directory full-text search (see doctors.search). The GIN index and the query
+# must share this expression for PostgreSQL to use the index.
+SEARCH_CONFIG = 'simple'
+SEARCH_VECTOR = SearchVector('first_name', 'last_name', 'clinic_name', config=SEARCH_CONFIG)
+
+
+class DoctorQuerySet(models.QuerySet):
+    def owned_by(self, user):
+        """Doctors created by ``user``"""
+        return self.filter(created_by=user)
+
+    def available(self):
+        return self.filter(is_available=True)
+
+    def for_serializer(self):
+        """Columns read by ``DoctorSerializer``, with the creator joined for ``created_by_username``"""
+        return self.select_related('created_by').only(
+            *(field.name for field in self.model._meta.concrete_fields),
+            'created_by__username',
+        )
 
 
 class Doctor(models.Model):
@@ -50,9 +73,43 @@ class Doctor(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DoctorQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Directory ordering over available doctors only (partial where supported),
+            # also the seek key for keyset pagination
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_available=True),
+                name='doctor_available_created_idx',
+            ),
+            # Owner-scoped lookups for update/delete
+            models.Index(fields=['created_by', '-created_at', '-id'], name='doctor_owner_created_idx'),
+            # Directory filters (doctors.search)
+            models.Index(
+                fields=['specialization', '-created_at', '-id'],
+                condition=models.Q(is_available=True),
+                name='doctor_specialization_idx',
+            ),
+            models.Index(
+                fields=['city', 'state', '-created_at', '-id'],
+                condition=models.Q(is_available=True),
+                name='doctor_city_state_idx',
+            ),
+            models.Index(
+                fields=['zip_code', '-created_at', '-id'],
+                condition=models.Q(is_available=True),
+                name='doctor_zip_code_idx',
+            ),
+            models.Index(
+                fields=['consultation_fee'], condition=models.Q(is_available=True), name='doctor_fee_idx',
+            ),
+            # Full-text search; created on PostgreSQL only (see the migration)
+            GinIndex(SEARCH_VECTOR, name='doctor_search_gin_idx'),
+        ]
         
     def __str__(self):
         return f"Dr. {self.first_name} {self.last_name} ({self.specialization})"
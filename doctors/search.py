@@ -0,0 +1,153 @@
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+
+from .models import SEARCH_CONFIG, SEARCH_VECTOR, Doctor
+
+ORDERING_FIELDS = {'created_at', 'consultation_fee', 'years_of_experience', 'last_name', 'relevance'}
+MAX_SEARCH_TERMS = 8
+# Largest values the filtered columns hold; larger bounds would overflow the database parameter
+MAX_INTEGER = 2 ** 31 - 1
+MAX_DECIMAL = Decimal('99999999.99')
+
+
+def _choice_list(value):
+    valid = {choice for choice, _ in Doctor.SPECIALIZATION_CHOICES}
+    choices = [item.strip().upper() for item in value.split(',') if item.strip()]
+    unknown = [choice for choice in choices if choice not in valid]
+    if unknown:
+        raise ValueError(f"Unknown specialization: {', '.join(unknown)}.")
+    return choices
+
+
+def _decimal(value):
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError('A valid number is required.')
+    if not number.is_finite() or number < 0:
+        raise ValueError('A valid non-negative number is required.')
+    if number > MAX_DECIMAL:
+        raise ValueError(f'Ensure this value is less than or equal to {MAX_DECIMAL}.')
+    return number
+
+
+def _integer(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError('A valid integer is required.')
+    if number < 0:
+        raise ValueError('A valid non-negative integer is required.')
+    if number > MAX_INTEGER:
+        raise ValueError(f'Ensure this value is less than or equal to {MAX_INTEGER}.')
+    return number
+
+
+def _text(value):
+    return value.strip()
+
+
+def _ordering(value):
+    field = value.lstrip('-')
+    if field not in ORDERING_FIELDS:
+        raise ValueError(f"Ordering must be one of: {', '.join(sorted(ORDERING_FIELDS))}.")
+    return value
+
+
+class DoctorSearch:
+    """
+    Typed filters, ordering and full-text search for the doctor directory.
+
+    Query parameters:
+        q                               name or clinic search
+        specialization                  comma-separated codes, e.g. ``CARDIOLOGY,NEUROLOGY``
+        city, state, zip_code           exact matches
+        min_fee, max_fee                ``consultation_fee`` range
+        min_experience, max_experience  ``years_of_experience`` range
+        ordering                        a field from ORDERING_FIELDS, ``-`` for descending
+
+    ``q`` uses a ``SearchVector`` backed by a GIN index on PostgreSQL and falls
+    back to ``icontains`` matching on other databases. The fallback scans the
+    table; it keeps ``q`` working in development and is not meant for large
+    directories (``benchmarks.bench_doctor_search`` leaves it out of the
+    latency budget).
+    """
+    PARAMETERS = {
+        'q': _text,
+        'specialization': _choice_list,
+        'city': _text,
+        'state': _text,
+        'zip_code': _text,
+        'min_fee': _decimal,
+        'max_fee': _decimal,
+        'min_experience': _integer,
+        'max_experience': _integer,
+        'ordering': _ordering,
+    }
+
+    def __init__(self, query_params):
+        self.params = {}
+        errors = {}
+        for name, parse in self.PARAMETERS.items():
+            value = query_params.get(name)
+            if value is None or value.strip() == '':
+                continue
+            try:
+                self.params[name] = parse(value)
+            except ValueError as exc:
+                errors[name] = [str(exc)]
+        if errors:
+            raise ValidationError(errors)
+
+    def apply(self, queryset):
+        params = self.params
+        filters = Q()
+        if params.get('specialization'):
+            filters &= Q(specialization__in=params['specialization'])
+        for field in ('city', 'state', 'zip_code'):
+            if field in params:
+                filters &= Q(**{field: params[field]})
+        if 'min_fee' in params:
+            filters &= Q(consultation_fee__gte=params['min_fee'])
+        if 'max_fee' in params:
+            filters &= Q(consultation_fee__lte=params['max_fee'])
+        if 'min_experience' in params:
+            filters &= Q(years_of_experience__gte=params['min_experience'])
+        if 'max_experience' in params:
+            filters &= Q(years_of_experience__lte=params['max_experience'])
+        queryset = queryset.filter(filters)
+
+        search_query = None
+        if params.get('q'):
+            queryset, search_query = self.search(queryset, params['q'])
+        return self.order(queryset, params.get('ordering'), search_query)
+
+    def search(self, queryset, text):
+        if connection.vendor == 'postgresql':
+            search_query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+            return queryset.alias(search=SEARCH_VECTOR).filter(search=search_query), search_query
+
+        # Fallback: every term must appear in the name or clinic
+        for term in text.split()[:MAX_SEARCH_TERMS]:
+            queryset = queryset.filter(
+                Q(first_name__icontains=term) | Q(last_name__icontains=term) | Q(clinic_name__icontains=term)
+            )
+        return queryset, None
+
+    def order(self, queryset, ordering, search_query):
+        if not ordering:
+            return queryset
+        descending = ordering.startswith('-')
+        field = ordering.lstrip('-')
+        if field == 'relevance':
+            if search_query is None:
+                return queryset
+            expression = SearchRank(SEARCH_VECTOR, search_query)
+        else:
+            expression = F(field)
+        expression = expression.desc() if descending else expression.asc()
+        return queryset.order_by(expression, '-id')
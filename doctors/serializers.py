@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from healthcare_backend.rows import RowSerializer
 from .models import Doctor
 
 
@@ -52,6 +53,26 @@ class DoctorCreateSerializer(DoctorSerializer):
         ]
 
 
+class DoctorBulkSerializer(DoctorCreateSerializer):
+    """
+    Record validation for bulk create/upsert.
+
+    ``doctors.bulk`` checks email and license number uniqueness once per
+    batch, so the per-record unique validators are disabled here.
+    """
+    class Meta(DoctorCreateSerializer.Meta):
+        extra_kwargs = {
+            'email': {'validators': []},
+            'license_number': {'validators': []},
+        }
+
+    def validate_email(self, value):
+        return value
+
+    def validate_license_number(self, value):
+        return value
+
+
 class DoctorListSerializer(serializers.ModelSerializer):
     """Simplified serializer for listing doctors (public view)"""
     full_name = serializers.ReadOnlyField()
@@ -63,3 +84,15 @@ class DoctorListSerializer(serializers.ModelSerializer):
             'qualification', 'clinic_name', 'city', 'state',
             'consultation_fee', 'is_available'
         ]
+
+
+# DoctorSerializer's columns, for ?fields= on the detail endpoint; full_name mirrors Doctor.full_name
+doctor_rows = RowSerializer(DoctorSerializer, computed={
+    'full_name': (('first_name', 'last_name'), lambda row: f"Dr. {row['first_name']} {row['last_name']}"),
+})
+
+
+# Compiled DoctorListSerializer for the directory; full_name mirrors Doctor.full_name
+doctor_list_rows = RowSerializer(DoctorListSerializer, computed={
+    'full_name': (('first_name', 'last_name'), lambda row: f"Dr. {row['first_name']} {row['last_name']}"),
+}, extra_columns=['created_at'])
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import Doctor
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_directory_cache(sender, **kwargs):
+    cache.invalidate()
@@ -1,3 +1,276 @@
-from django.test import TestCase
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from . import cache
+from .models import Doctor
+from .serializers import DoctorListSerializer
+
+
+def create_doctor(user, index, **extra):
+    fields = {
+        'created_by': user,
+        'first_name': f'Doctor{index}',
+        'last_name': 'Johnson',
+        'email': f'doctor{index}@hospital.com',
+        'phone_number': f'+1987000{index:04d}',
+        'specialization': 'CARDIOLOGY',
+        'license_number': f'MD{index:06d}',
+        'years_of_experience': 10,
+        'qualification': 'MD',
+        'clinic_name': 'Heart Care Clinic',
+        'clinic_address': '456 Medical Center Dr',
+        'city': 'Boston',
+        'state': 'MA',
+        'zip_code': '02101',
+        'consultation_fee': Decimal('200.00'),
+    }
+    fields.update(extra)
+    return Doctor.objects.create(**fields)
+
+
+class DoctorQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        for index in range(25):
+            create_doctor(self.user, index)
+
+    def test_list_query_count_is_constant(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('doctor_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_detail_query_count(self):
+        doctor = Doctor.objects.first()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('doctor_detail', args=[doctor.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created_by_username'], 'clinician')
+
+
+class DoctorSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        create_doctor(self.user, 1, first_name='Alice', specialization='NEUROLOGY', consultation_fee=Decimal('120.00'))
+        create_doctor(self.user, 2, first_name='Bob', city='Chicago', state='IL', years_of_experience=3)
+        create_doctor(self.user, 3, first_name='Carol', clinic_name='Lakeside Neuro', specialization='NEUROLOGY')
+        create_doctor(self.user, 4, first_name='Dan', is_available=False)
+
+    def search(self, **params):
+        response = self.client.get(reverse('doctor_list'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['full_name'] for row in response.data['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.search(specialization='neurology'), ['Dr. Carol Johnson', 'Dr. Alice Johnson'])
+        self.assertEqual(self.search(city='Chicago', state='IL'), ['Dr. Bob Johnson'])
+        self.assertEqual(self.search(max_fee='150'), ['Dr. Alice Johnson'])
+        self.assertEqual(self.search(min_experience='5', max_experience='10', ordering='-consultation_fee'),
+                         ['Dr. Carol Johnson', 'Dr. Alice Johnson'])
+
+    def test_text_search_matches_name_and_clinic(self):
+        self.assertEqual(self.search(q='alice'), ['Dr. Alice Johnson'])
+        self.assertEqual(self.search(q='lakeside'), ['Dr. Carol Johnson'])
+        self.assertEqual(self.search(q='dan'), [])
+
+    def test_invalid_parameters_are_rejected(self):
+        response = self.client.get(reverse('doctor_list'), {'min_fee': 'abc', 'specialization': 'ASTROLOGY'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'min_fee', 'specialization'})
+
+        response = self.client.get(reverse('doctor_list'), {'min_experience': '1' + '0' * 30, 'max_fee': '1e30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'min_experience', 'max_fee'})
+
+    def test_cursor_pagination_rejects_ordering(self):
+        response = self.client.get(reverse('doctor_list'), {'pagination': 'cursor', 'ordering': 'last_name'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+
+
+class DoctorBulkUpsertTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.owned = create_doctor(self.user, 1)
+        other = User.objects.create_user(username='other', password='pass12345')
+        self.foreign = create_doctor(other, 2)
+
+    def record(self, index, **extra):
+        fields = {
+            'first_name': f'Bulk{index}', 'last_name': 'Doe', 'email': f'bulk{index}@hospital.com',
+            'phone_number': '+1000', 'specialization': 'GENERAL', 'license_number': f'BULK{index}',
+            'years_of_experience': 5, 'qualification': 'MD', 'clinic_name': 'Clinic',
+            'clinic_address': '1 Road', 'city': 'Boston', 'state': 'MA', 'zip_code': '02101',
+            'consultation_fee': '99.50',
+        }
+        fields.update(extra)
+        return fields
+
+    def test_create_update_and_conflicts(self):
+        records = [
+            self.record(1),
+            self.record(2, license_number=self.owned.license_number, email=self.owned.email, city='Salem'),
+            self.record(3, license_number=self.foreign.license_number),
+            self.record(4, email=self.foreign.email),
+            self.record(5, license_number='BULK1'),
+            self.record(6, consultation_fee='lots'),
+        ]
+        with self.assertNumQueries(7):
+            # Savepoint pair, one lookup for both unique keys, one INSERT, one upsert,
+            # then the stats counters: one decrement (the old city) and one upsert
+            response = self.client.post(reverse('doctor_bulk_upsert'), records[:2], format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(reverse('doctor_bulk_upsert'), records, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (0, 2, 4))
+        self.assertEqual(
+            sorted((error['index'], *error['errors']) for error in response.data['errors']),
+            [(2, 'license_number'), (3, 'email'), (4, 'license_number'), (5, 'consultation_fee')],
+        )
+        self.owned.refresh_from_db()
+        self.assertEqual(self.owned.city, 'Salem')
+        self.assertEqual(Doctor.objects.filter(license_number='BULK1').count(), 1)
+
+    def test_email_swaps_are_reported(self):
+        second = create_doctor(self.user, 3)
+        records = [
+            self.record(1, license_number=self.owned.license_number, email=second.email),
+            self.record(2, license_number=second.license_number, email=self.owned.email),
+        ]
+        response = self.client.post(reverse('doctor_bulk_upsert'), records, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['failed'], 2)
+        for error in response.data['errors']:
+            self.assertIn('separate request', error['errors']['email'][0])
+        self.owned.refresh_from_db()
+        self.assertEqual(self.owned.first_name, 'Doctor1')
+
+    def test_conflicts_at_write_are_reported_per_record(self):
+        bulk_create = Doctor.objects.bulk_create
+
+        def racing_bulk_create(doctors, **kwargs):
+            # As if another request inserted bulk2's email after the lookup
+            if any(doctor.email == 'bulk2@hospital.com' for doctor in doctors):
+                raise IntegrityError('UNIQUE constraint failed: doctors_doctor.email')
+            return bulk_create(doctors, **kwargs)
+
+        with mock.patch.object(Doctor.objects, 'bulk_create', side_effect=racing_bulk_create):
+            response = self.client.post(reverse('doctor_bulk_upsert'), [self.record(1), self.record(2)], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('non_field_errors', response.data['errors'][0]['errors'])
+        self.assertTrue(Doctor.objects.filter(email='bulk1@hospital.com').exists())
+
+    def test_rejects_non_list_payload(self):
+        response = self.client.post(reverse('doctor_bulk_upsert'), {'doctors': 'nope'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class DoctorCacheTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.doctor = create_doctor(self.user, 1)
+        cache.get_cache().clear()
+
+    def test_repeat_list_is_served_from_cache(self):
+        first = self.client.get(reverse('doctor_list'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('doctor_list'))
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertNotIn('Last-Modified', second)
+
+    def test_conditional_get_returns_not_modified(self):
+        url = reverse('doctor_detail', args=[self.doctor.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_in_the_same_second_is_not_hidden(self):
+        url = reverse('doctor_detail', args=[self.doctor.pk])
+        self.client.get(url)
+        self.doctor.clinic_name = 'Harbor Clinic'
+        self.doctor.save()
+        # A date after the write's version, as a client would send within the same second
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 1))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['clinic_name'], 'Harbor Clinic')
+
+    def test_save_invalidates_cached_payloads(self):
+        url = reverse('doctor_detail', args=[self.doctor.pk])
+        etag = self.client.get(url)['ETag']
+        self.doctor.clinic_name = 'Harbor Clinic'
+        self.doctor.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['clinic_name'], 'Harbor Clinic')
+
+    def test_bulk_upsert_invalidates_list(self):
+        self.client.get(reverse('doctor_list'))
+        record = {
+            'first_name': 'New', 'last_name': 'Doctor', 'email': 'new@hospital.com',
+            'phone_number': '+19870009999', 'specialization': 'CARDIOLOGY',
+            'license_number': 'MD999999', 'years_of_experience': 5, 'qualification': 'MD',
+            'clinic_name': 'Clinic', 'clinic_address': '1 Main St', 'city': 'Boston',
+            'state': 'MA', 'zip_code': '02101', 'consultation_fee': '100.00',
+        }
+        self.client.post(reverse('doctor_bulk_upsert'), [record], format='json')
+        response = self.client.get(reverse('doctor_list'))
+        self.assertEqual(response.data['count'], 2)
+
+    def test_stats_report_hits_and_misses(self):
+        before = self.client.get(reverse('doctor_cache_stats')).data
+        self.client.get(reverse('doctor_list'))
+        self.client.get(reverse('doctor_list'))
+        after = self.client.get(reverse('doctor_cache_stats')).data
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+
+class DoctorRowSerializerTests(APITestCase):
+    def test_list_matches_model_serializer_output(self):
+        user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(user)
+        create_doctor(user, 1, consultation_fee=Decimal('99.5'))
+        create_doctor(user, 2, specialization='NEUROLOGY', years_of_experience=0)
+        create_doctor(user, 3, consultation_fee=Decimal('1200.00'))
+
+        response = self.client.get(reverse('doctor_list'))
+        expected = DoctorListSerializer(Doctor.objects.available(), many=True).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+
+class DoctorProjectionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.doctor = create_doctor(self.user, 1)
+
+    def test_detail_and_list_fields(self):
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(
+                reverse('doctor_detail', args=[self.doctor.pk]), {'fields': 'full_name,created_by_username'}
+            )
+        self.assertEqual(response.data, {'full_name': 'Dr. Doctor1 Johnson', 'created_by_username': 'clinician'})
+        self.assertNotIn('clinic_address', queries.captured_queries[0]['sql'])
+
+        response = self.client.get(reverse('doctor_list'), {'fields': 'id,specialization'})
+        self.assertEqual(response.data['results'], [{'id': self.doctor.pk, 'specialization': 'CARDIOLOGY'}])
+        # Cached per URL, so the projection is not served to the plain listing
+        response = self.client.get(reverse('doctor_list'))
+        self.assertIn('clinic_name', response.data['results'][0])
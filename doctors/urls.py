@@ -1,11 +1,18 @@
 from django.urls import path
+from healthcare_backend.async_views import read_view
 from . import views
 
 # API-only URLs for doctors
 urlpatterns = [
-    path('', views.DoctorListView.as_view(), name='doctor_list'),
+    path('', read_view(views.DoctorListView.as_view(), views.DoctorListAsyncView.as_view()), name='doctor_list'),
     path('create/', views.DoctorCreateView.as_view(), name='doctor_create'),
-    path('<int:pk>/', views.DoctorRetrieveView.as_view(), name='doctor_detail'),
+    path('bulk/', views.DoctorBulkUpsertView.as_view(), name='doctor_bulk_upsert'),
+    path('cache/stats/', views.DoctorCacheStatsView.as_view(), name='doctor_cache_stats'),
+    path(
+        '<int:pk>/',
+        read_view(views.DoctorRetrieveView.as_view(), views.DoctorRetrieveAsyncView.as_view()),
+        name='doctor_detail',
+    ),
     path('<int:pk>/update/', views.DoctorUpdateView.as_view(), name='doctor_update'),
     path('<int:pk>/delete/', views.DoctorDeleteView.as_view(), name='doctor_delete'),
 ]
@@ -2,15 +2,49 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from healthcare_backend.async_views import AsyncGenericAPIView, AsyncRetrieveAPIView
+from healthcare_backend.pagination import CreatedAtKeysetPagination
+from healthcare_backend.projection import ProjectionMixin
+from healthcare_backend.rows import AsyncRowListMixin, RowListMixin
+from . import cache
 from .models import Doctor
-from .serializers import DoctorSerializer, DoctorCreateSerializer, DoctorListSerializer
+from .bulk import MAX_RECORDS, DoctorBulkUpserter
+from .search import DoctorSearch
+from .serializers import DoctorSerializer, DoctorCreateSerializer, DoctorListSerializer, doctor_list_rows, doctor_rows
 
 
-class DoctorListView(generics.ListAPIView):
-    """Public view to list all available doctors"""
-    queryset = Doctor.objects.filter(is_available=True)
+class DoctorListView(RowListMixin, generics.ListAPIView):
+    """Public view to list and search available doctors"""
     serializer_class = DoctorListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    row_serializer = doctor_list_rows
+    
+    def get_queryset(self):
+        """Apply the directory filters and search from the query string"""
+        search = DoctorSearch(self.request.query_params)
+        return self.get_row_serializer().values(search.apply(Doctor.objects.available()))
+    
+    def list(self, request, *args, **kwargs):
+        return cache.cached_response(
+            request, 'list', lambda: super(DoctorListView, self).list(request, *args, **kwargs)
+        )
+
+
+class DoctorListAsyncView(AsyncRowListMixin, AsyncGenericAPIView):
+    """``DoctorListView`` through the async ORM and cache"""
+    serializer_class = DoctorListSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    row_serializer = doctor_list_rows
+    
+    def get_queryset(self):
+        """Apply the directory filters and search from the query string"""
+        search = DoctorSearch(self.request.query_params)
+        return self.get_row_serializer().values(search.apply(Doctor.objects.available()))
+    
+    async def get(self, request, *args, **kwargs):
+        return await cache.acached_response(request, 'list', lambda: self.alist(request, *args, **kwargs))
 
 
 class DoctorCreateView(generics.CreateAPIView):
@@ -33,11 +67,71 @@ class DoctorCreateView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DoctorRetrieveView(generics.RetrieveAPIView):
+class DoctorBulkUpsertView(generics.GenericAPIView):
+    """
+    Create or update many doctors in one request, keyed on license number.
+
+    Accepts a JSON list of doctor records (or ``{"doctors": [...]}``).
+    Records whose license number the user already owns are updated, new
+    ones are created, and the response lists the outcome per record index.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        records = request.data
+        if isinstance(records, dict):
+            records = records.get('doctors')
+        if not isinstance(records, list):
+            return Response({
+                'error': 'Expected a list of doctor records'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > MAX_RECORDS:
+            return Response({
+                'error': f'At most {MAX_RECORDS} records can be sent per request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        manifest = DoctorBulkUpserter(request.user).run(records)
+        return Response(manifest, status=status.HTTP_200_OK)
+
+
+class DoctorRetrieveView(ProjectionMixin, generics.RetrieveAPIView):
     """Retrieve doctor details"""
-    queryset = Doctor.objects.all()
     serializer_class = DoctorSerializer
     permission_classes = [IsAuthenticated]
+    row_serializer = doctor_rows
+    
+    def get_queryset(self):
+        """All doctors; ``?fields=`` narrows the columns read"""
+        return self.project_instances(Doctor.objects.all())
+    
+    def retrieve(self, request, *args, **kwargs):
+        return cache.cached_response(
+            request, 'detail', lambda: super(DoctorRetrieveView, self).retrieve(request, *args, **kwargs)
+        )
+
+
+class DoctorRetrieveAsyncView(ProjectionMixin, AsyncRetrieveAPIView):
+    """``DoctorRetrieveView`` through the async ORM and cache"""
+    serializer_class = DoctorSerializer
+    permission_classes = [IsAuthenticated]
+    row_serializer = doctor_rows
+    
+    def get_queryset(self):
+        """All doctors; ``?fields=`` narrows the columns read"""
+        return self.project_instances(Doctor.objects.all())
+    
+    async def get(self, request, *args, **kwargs):
+        return await cache.acached_response(
+            request, 'detail', lambda: super(DoctorRetrieveAsyncView, self).get(request, *args, **kwargs)
+        )
+
+
+class DoctorCacheStatsView(generics.GenericAPIView):
+    """Hit ratio and time saved by the doctor directory cache in this process"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        return Response(cache.stats(), status=status.HTTP_200_OK)
 
 
 class DoctorUpdateView(generics.UpdateAPIView):
@@ -47,7 +141,7 @@ class DoctorUpdateView(generics.UpdateAPIView):
     
     def get_queryset(self):
         """Return doctors created by the authenticated user"""
-        return Doctor.objects.filter(created_by=self.request.user)
+        return Doctor.objects.owned_by(self.request.user).for_serializer()
     
     def get_object(self):
         """Get doctor by ID, ensuring it belongs to the authenticated user"""
@@ -75,7 +169,7 @@ class DoctorDeleteView(generics.DestroyAPIView):
     
     def get_queryset(self):
         """Return doctors created by the authenticated user"""
-        return Doctor.objects.filter(created_by=self.request.user)
+        return Doctor.objects.owned_by(self.request.user)
     
     def get_object(self):
         """Get doctor by ID, ensuring it belongs to the authenticated user"""
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Export
+
+
+@admin.register(Export)
+class ExportAdmin(admin.ModelAdmin):
+    list_display = ['id', 'created_by', 'kind', 'file_format', 'status', 'rows', 'size', 'created_at']
+    list_filter = ['kind', 'status']
+    search_fields = ['created_by__username']
+    readonly_fields = ['created_at', 'finished_at']
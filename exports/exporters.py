@@ -0,0 +1,131 @@
+"""
+Full-data exports of a user's patients, doctors or mappings.
+
+``Exporter`` reads the rows with ``iterator(chunk_size=EXPORT_CHUNK_SIZE)``
+(a server-side cursor on PostgreSQL, ``fetchmany`` on SQLite), serializes
+them with the list endpoints' ``RowSerializer`` and encodes each chunk as
+NDJSON or CSV, optionally gzipped. CSV cells that a spreadsheet would run
+as a formula are prefixed with ``'``. One chunk is held in memory at a time
+whatever the size of the table, so the output can be streamed to the
+client (``exports.views``) or written to a file (``exports.jobs``).
+"""
+import csv
+import io
+import zlib
+
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+
+from doctors.models import Doctor
+from doctors.serializers import doctor_rows
+from healthcare_backend.batching import chunked
+from healthcare_backend.renderers import FastJSONRenderer
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import mapping_rows
+from patients.models import Patient
+from patients.serializers import patient_rows
+
+# Kind -> (model, row serializer of its list endpoint)
+KINDS = {
+    'patients': (Patient, patient_rows),
+    'doctors': (Doctor, doctor_rows),
+    'mappings': (PatientDoctorMapping, mapping_rows),
+}
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+GZIP_CONTENT_TYPE = 'application/gzip'
+# A CSV cell starting with one of these is run as a formula by spreadsheet apps
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_cell(value):
+    """Prefix text a spreadsheet would read as a formula with ``'`` so it stays text"""
+    if type(value) is str and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class Exporter:
+    """
+    The ``kind`` rows owned by ``user``, in id order, as chunks of bytes.
+
+    Iterate ``chunks()`` from sync code and ``achunks()`` from async code;
+    either may be iterated once. ``rows`` and ``size`` count what has been
+    produced so far.
+    """
+
+    def __init__(self, user, kind, file_format='ndjson', compress=False, fields=None, using=None):
+        model, rows = KINDS[kind]
+        self.kind = kind
+        self.file_format = file_format
+        self.row_serializer = rows if fields is None else rows.project(fields)
+        self.field_names = self.row_serializer.field_names
+        self.queryset = self.row_serializer.values(
+            model.objects.owned_by(user).order_by('id')
+        ).using(using or router.db_for_read(model))
+        self.chunk_size = settings.EXPORT_CHUNK_SIZE
+        self.compressor = zlib.compressobj(wbits=31) if compress else None  # gzip container
+        self.rows = 0
+        self.size = 0
+
+    @property
+    def content_type(self):
+        return GZIP_CONTENT_TYPE if self.compressor else CONTENT_TYPES[self.file_format]
+
+    def file_name(self, suffix=''):
+        """e.g. ``patients-20240131.csv.gz``"""
+        name = f"{self.kind}-{timezone.localdate():%Y%m%d}{suffix}.{self.file_format}"
+        return name + '.gz' if self.compressor else name
+
+    def chunks(self):
+        yield from self.output(self.header())
+        rows = self.queryset.iterator(chunk_size=self.chunk_size)
+        for chunk in chunked(rows, self.chunk_size):
+            yield from self.output(self.encode(chunk))
+        yield from self.output(b'', final=True)
+
+    async def achunks(self):
+        for data in self.output(self.header()):
+            yield data
+        chunk = []
+        async for row in self.queryset.aiterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                for data in self.output(self.encode(chunk)):
+                    yield data
+                chunk = []
+        for data in self.output(self.encode(chunk) if chunk else b'', final=True):
+            yield data
+
+    def header(self):
+        if self.file_format != 'csv':
+            return b''
+        return self.write_csv([self.field_names])
+
+    def encode(self, rows):
+        self.rows += len(rows)
+        results = self.row_serializer.serialize(rows)
+        if self.file_format == 'csv':
+            names = self.field_names
+            return self.write_csv([escape_cell(result[name]) for name in names] for result in results)
+        render = FastJSONRenderer().render
+        return b''.join(render(result) + b'\n' for result in results)
+
+    @staticmethod
+    def write_csv(lines):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(lines)
+        return buffer.getvalue().encode()
+
+    def output(self, data, final=False):
+        """``data`` compressed if requested; yields nothing for empty output"""
+        if self.compressor:
+            data = self.compressor.compress(data)
+            if final:
+                data += self.compressor.flush()
+        if data:
+            self.size += len(data)
+            yield data
@@ -0,0 +1,134 @@
+"""
+Background exports, for tenants too large to stream in one request.
+
+``start`` queues an ``Export`` once the transaction that created it
+commits. It runs on a per-process pool of ``EXPORT_WORKERS`` threads (in
+the calling thread when that is 0), writes the file to a temporary name in
+``EXPORT_DIR`` and moves it into place when it is complete, so a download
+never sees a partial file.
+
+A process that dies mid-export (or with jobs still queued) leaves them
+``RUNNING`` or ``PENDING``; ``fail_stale`` marks such jobs ``FAILED`` once
+they are ``EXPORT_STALE_MINUTES`` old, and starting them again is up to the
+client. ``expire`` deletes finished jobs and their files after
+``EXPORT_RETENTION_HOURS``; both run from ``manage.py expire_exports``.
+"""
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .exporters import Exporter
+from .models import Export
+
+logger = logging.getLogger(__name__)
+
+# Threads are only started once jobs are submitted
+_pool = ThreadPoolExecutor(max_workers=max(settings.EXPORT_WORKERS, 1), thread_name_prefix='export')
+
+
+def start(export):
+    """Run ``export`` after the current transaction commits"""
+    if settings.EXPORT_WORKERS:
+        transaction.on_commit(lambda: _pool.submit(_run_in_pool, export.pk))
+    else:
+        transaction.on_commit(lambda: run(export.pk))
+
+
+def _run_in_pool(export_id):
+    try:
+        run(export_id)
+    finally:
+        # Pool threads outlive requests; don't leave their connections open
+        connections.close_all()
+
+
+def run(export_id):
+    """Write the file of a pending export and record the outcome"""
+    if not Export.objects.filter(pk=export_id, status='PENDING').update(status='RUNNING', started_at=timezone.now()):
+        return
+    export = Export.objects.get(pk=export_id)
+    exporter = Exporter(
+        export.created_by_id, export.kind, export.file_format, export.gzip,
+        fields=export.fields.split(',') if export.fields else None,
+    )
+    file_name = exporter.file_name(f'-{export.pk}')
+    path = os.path.join(settings.EXPORT_DIR, file_name)
+    temporary = None
+    try:
+        os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=settings.EXPORT_DIR, suffix='.part', delete=False) as output:
+            temporary = output.name
+            for data in exporter.chunks():
+                output.write(data)
+        os.replace(temporary, path)
+    except Exception as exc:
+        logger.exception('Export %s failed', export.pk)
+        if temporary and os.path.exists(temporary):
+            os.remove(temporary)
+        Export.objects.filter(pk=export.pk, status='RUNNING').update(
+            status='FAILED', error=str(exc), finished_at=timezone.now(),
+        )
+        return
+
+    finished = Export.objects.filter(pk=export.pk, status='RUNNING').update(
+        status='DONE', rows=exporter.rows, size=exporter.size, file_name=file_name, finished_at=timezone.now(),
+    )
+    if not finished:
+        # Deleted, or given up on by ``fail_stale``, while it ran
+        os.remove(path)
+
+
+def remove_file(export):
+    if export.path and os.path.exists(export.path):
+        os.remove(export.path)
+
+
+def fail_stale(user=None):
+    """Mark jobs still pending or running after ``EXPORT_STALE_MINUTES`` as failed; returns how many"""
+    cutoff = timezone.now() - timedelta(minutes=settings.EXPORT_STALE_MINUTES)
+    exports = Export.objects.filter(status__in=Export.ACTIVE_STATUSES, created_at__lt=cutoff)
+    if user is not None:
+        exports = exports.filter(created_by=user)
+    # A job queued for a while may have started recently
+    exports = exports.exclude(started_at__gte=cutoff)
+    return exports.update(
+        status='FAILED', finished_at=timezone.now(),
+        error=f'The export did not finish within {settings.EXPORT_STALE_MINUTES} minutes; start it again.',
+    )
+
+
+def active_count(user):
+    """Jobs of ``user`` still pending or running, after giving up on stale ones"""
+    fail_stale(user)
+    return Export.objects.filter(created_by=user, status__in=Export.ACTIVE_STATUSES).count()
+
+
+def expire():
+    """
+    Delete jobs finished more than ``EXPORT_RETENTION_HOURS`` ago with their
+    files, and files in ``EXPORT_DIR`` no job refers to (such as the
+    ``.part`` file of a process that died) once they are as old.
+    Returns ``(jobs, files)`` deleted.
+    """
+    cutoff = timezone.now() - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    expired = list(Export.objects.filter(status__in=['DONE', 'FAILED'], finished_at__lt=cutoff))
+    for export in expired:
+        remove_file(export)
+        export.delete()
+
+    files = 0
+    if os.path.isdir(settings.EXPORT_DIR):
+        known = set(Export.objects.exclude(file_name='').values_list('file_name', flat=True))
+        oldest = time.time() - settings.EXPORT_RETENTION_HOURS * 3600
+        for entry in os.scandir(settings.EXPORT_DIR):
+            if entry.is_file() and entry.name not in known and entry.stat().st_mtime < oldest:
+                os.remove(entry.path)
+                files += 1
+    return len(expired), files
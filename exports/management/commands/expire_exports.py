@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from exports import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Mark background exports stuck pending or running as failed, and delete finished exports '
+        'and their files once they are older than EXPORT_RETENTION_HOURS'
+    )
+
+    def handle(self, *args, **options):
+        failed = jobs.fail_stale()
+        expired, files = jobs.expire()
+        self.stdout.write(self.style.SUCCESS(
+            f'{failed} stale export(s) marked failed; {expired} export(s) older than '
+            f'{settings.EXPORT_RETENTION_HOURS}h deleted, plus {files} orphaned file(s)'
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Export',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('patients', 'Patients'), ('doctors', 'Doctors'), ('mappings', 'Patient-doctor mappings')], max_length=10)),
+                ('file_format', models.CharField(choices=[('ndjson', 'NDJSON'), ('csv', 'CSV')], default='ndjson', max_length=10)),
+                ('gzip', models.BooleanField(default=False)),
+                ('fields', models.TextField(blank=True, help_text='Comma-separated fields to export; empty for all')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('file_name', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['created_by', '-created_at', '-id'], name='export_owner_created_idx')],
+            },
+        ),
+    ]
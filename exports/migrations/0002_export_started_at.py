@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='export',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
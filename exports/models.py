@@ -0,0 +1,58 @@
+import os
+
+from django.conf import settings
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class Export(models.Model):
+    """A background export; the file is written to ``EXPORT_DIR`` (see ``exports.jobs``)"""
+    KIND_CHOICES = [
+        ('patients', 'Patients'),
+        ('doctors', 'Doctors'),
+        ('mappings', 'Patient-doctor mappings'),
+    ]
+    FORMAT_CHOICES = [
+        ('ndjson', 'NDJSON'),
+        ('csv', 'CSV'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['PENDING', 'RUNNING']
+
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='exports')
+
+    # What to export
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='ndjson')
+    gzip = models.BooleanField(default=False)
+    fields = models.TextField(blank=True, help_text="Comma-separated fields to export; empty for all")
+
+    # Progress and result
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    rows = models.PositiveIntegerField(default=0)
+    size = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    file_name = models.CharField(max_length=200, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_by', '-created_at', '-id'], name='export_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} export #{self.pk} ({self.status})"
+
+    @property
+    def path(self):
+        return os.path.join(settings.EXPORT_DIR, self.file_name) if self.file_name else None
@@ -0,0 +1,28 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Export
+
+
+class ExportOptionsSerializer(serializers.Serializer):
+    """Query parameters of ``/api/exports/<kind>/``; ``?fields=``/``?exclude=`` are read separately"""
+    file_format = serializers.ChoiceField(choices=Export.FORMAT_CHOICES, default='ndjson')
+    gzip = serializers.BooleanField(default=False)
+
+
+class ExportSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Export
+        fields = [
+            'id', 'kind', 'file_format', 'gzip', 'fields', 'status', 'rows', 'size',
+            'error', 'download_url', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'DONE':
+            return None
+        return reverse('export_download', args=[obj.pk])
+
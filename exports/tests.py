@@ -0,0 +1,208 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from doctors.serializers import DoctorSerializer
+from doctors.tests import create_doctor
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from patients.tests import create_patient
+from . import jobs
+from .exporters import Exporter, escape_cell
+from .models import Export
+
+
+class StreamingExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patients = [create_patient(self.user, index) for index in range(5)]
+        self.doctor = create_doctor(self.user, 1)
+        PatientDoctorMapping.objects.create(patient=self.patients[0], doctor=self.doctor, created_by=self.user)
+        other = User.objects.create_user(username='other', password='pass12345')
+        create_patient(other, 9)
+
+    def get(self, kind, query=''):
+        response = self.client.get(reverse('export', args=[kind]) + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_matches_serializer(self):
+        response, body = self.get('patients')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="patients-\d{8}\.ndjson"$')
+        lines = [json.loads(line) for line in body.splitlines()]
+        expected = PatientSerializer(Patient.objects.filter(created_by=self.user).order_by('id'), many=True).data
+        self.assertEqual(lines, json.loads(json.dumps(expected)))
+
+    def test_csv_gzip_with_fields(self):
+        response, body = self.get('doctors', '?file_format=csv&gzip=true&fields=id,full_name,consultation_fee')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv.gz"'))
+        rows = list(csv.reader(io.StringIO(gzip.decompress(body).decode())))
+        self.assertEqual(rows, [
+            ['id', 'full_name', 'consultation_fee'],
+            [str(self.doctor.pk), self.doctor.full_name, DoctorSerializer(self.doctor).data['consultation_fee']],
+        ])
+
+    def test_csv_formulas_are_escaped(self):
+        create_patient(self.user, 7, first_name='=HYPERLINK("http://evil.example")', last_name='@SUM(A1)')
+        _, body = self.get('patients', '?file_format=csv&fields=first_name,last_name,phone_number,city')
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[-1][:2], ['\'=HYPERLINK("http://evil.example")', "'@SUM(A1)"])
+        self.assertEqual(rows[1][3], self.patients[0].city)
+        for value, escaped in (('+1555', "'+1555"), ('-2', "'-2"), ('\tx', "'\tx"), ('a=b', 'a=b'), (5, 5)):
+            self.assertEqual(escape_cell(value), escaped)
+
+    def test_mappings(self):
+        _, body = self.get('mappings', '?exclude=notes')
+        [line] = body.splitlines()
+        self.assertEqual(json.loads(line)['patient_name'], self.patients[0].full_name)
+        self.assertNotIn('notes', json.loads(line))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_rows_are_read_in_chunks(self):
+        exporter = Exporter(self.user, 'patients', 'csv')
+        # A single query; the cursor is read two rows at a time
+        with self.assertNumQueries(1):
+            chunks = list(exporter.chunks())
+        self.assertEqual(len(chunks), 4)  # header, then 2 + 2 + 1 rows
+        self.assertEqual((exporter.rows, exporter.size), (5, sum(map(len, chunks))))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    async def test_async_chunks_match(self):
+        sync_exporter = Exporter(self.user, 'patients', compress=True)
+        async_exporter = Exporter(self.user, 'patients', compress=True)
+        chunks = [chunk async for chunk in async_exporter.achunks()]
+        expected = await sync_to_async(lambda: b''.join(sync_exporter.chunks()))()
+        self.assertEqual(gzip.decompress(b''.join(chunks)), gzip.decompress(expected))
+        self.assertEqual(async_exporter.rows, 5)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(reverse('export', args=['nurses'])).status_code, 404)
+        response = self.client.get(reverse('export', args=['patients']) + '?file_format=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file_format', response.data)
+        response = self.client.get(reverse('export', args=['patients']) + '?fields=ssn')
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse('export', args=['patients'])).status_code, 401)
+
+
+class BackgroundExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        for index in range(3):
+            create_patient(self.user, index)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(EXPORT_DIR=directory.name, EXPORT_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def start(self, query=''):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('export', args=['patients']) + query)
+        self.assertEqual(response.status_code, 202)
+        return Export.objects.get(pk=response.data['export']['id'])
+
+    def test_export_is_written_and_downloaded(self):
+        export = self.start('?file_format=csv&fields=email')
+        response = self.client.get(reverse('export_job_detail', args=[export.pk]))
+        self.assertEqual((response.data['status'], response.data['rows']), ('DONE', 3))
+        self.assertEqual(response.data['download_url'], reverse('export_download', args=[export.pk]))
+
+        response = self.client.get(response.data['download_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'filename="{export.file_name}"', response['Content-Disposition'])
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body), export.size)
+        streamed = self.client.get(reverse('export', args=['patients']) + '?file_format=csv&fields=email')
+        self.assertEqual(body, b''.join(streamed.streaming_content))
+        self.assertEqual(os.listdir(os.path.dirname(export.path)), [export.file_name])
+
+        response = self.client.delete(reverse('export_job_detail', args=[export.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(export.path))
+
+    def test_pending_export_cannot_be_downloaded(self):
+        export = Export.objects.create(created_by=self.user, kind='patients')
+        response = self.client.get(reverse('export_download', args=[export.pk]))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(reverse('export_job_list')).data['results'][0]['status'], 'PENDING')
+
+    def test_exports_are_private(self):
+        export = self.start()
+        self.client.force_authenticate(User.objects.create_user(username='other', password='pass12345'))
+        self.assertEqual(self.client.get(reverse('export_job_detail', args=[export.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('export_download', args=[export.pk])).status_code, 404)
+
+    @override_settings(EXPORT_MAX_ACTIVE=1)
+    def test_active_exports_are_limited_per_user(self):
+        Export.objects.create(created_by=self.user, kind='patients')
+        response = self.client.post(reverse('export', args=['patients']))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(Export.objects.count(), 1)
+
+        # A job left behind by a dead process stops counting once it is stale
+        Export.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        export = self.start()
+        self.assertEqual(export.status, 'DONE')
+        stale = Export.objects.exclude(pk=export.pk).get()
+        self.assertEqual(stale.status, 'FAILED')
+        self.assertIn('did not finish', stale.error)
+
+    def test_stale_jobs_fail_and_old_exports_expire(self):
+        old = timezone.now() - timedelta(days=2)
+        export = self.start()
+        recent = self.start()
+        Export.objects.filter(pk=export.pk).update(finished_at=old)
+        running = Export.objects.create(created_by=self.user, kind='doctors', status='RUNNING')
+        Export.objects.filter(pk=running.pk).update(created_at=old, started_at=old)
+        queued_long = Export.objects.create(created_by=self.user, kind='doctors', status='RUNNING')
+        Export.objects.filter(pk=queued_long.pk).update(created_at=old, started_at=timezone.now())
+        orphan = os.path.join(os.path.dirname(export.path), 'patients-1.ndjson.part')
+        open(orphan, 'w').close()
+        os.utime(orphan, (old.timestamp(), old.timestamp()))
+
+        out = io.StringIO()
+        call_command('expire_exports', stdout=out)
+        self.assertIn('1 stale export(s) marked failed; 1 export(s)', out.getvalue())
+        self.assertFalse(Export.objects.filter(pk=export.pk).exists())
+        self.assertFalse(os.path.exists(export.path))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(os.path.exists(recent.path))
+        self.assertEqual(Export.objects.get(pk=running.pk).status, 'FAILED')
+        self.assertEqual(Export.objects.get(pk=queued_long.pk).status, 'RUNNING')
+
+    def test_job_given_up_on_does_not_finish(self):
+        export = Export.objects.create(created_by=self.user, kind='patients')
+        original = Exporter.chunks
+
+        def chunks(exporter):
+            # The job is marked failed while its file is being written
+            Export.objects.filter(pk=export.pk).update(status='FAILED')
+            yield from original(exporter)
+
+        with mock.patch.object(Exporter, 'chunks', chunks):
+            jobs.run(export.pk)
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'FAILED')
+        self.assertEqual(os.listdir(self.directory), [])
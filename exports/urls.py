@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('jobs/', views.ExportJobListView.as_view(), name='export_job_list'),
+    path('jobs/<int:pk>/', views.ExportJobDetailView.as_view(), name='export_job_detail'),
+    path('jobs/<int:pk>/download/', views.ExportDownloadView.as_view(), name='export_download'),
+    path('<str:kind>/', views.ExportView.as_view(), name='export'),
+]
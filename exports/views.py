@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from healthcare_backend.projection import requested_fields
+from . import jobs
+from .exporters import CONTENT_TYPES, GZIP_CONTENT_TYPE, KINDS, Exporter
+from .models import Export
+from .serializers import ExportOptionsSerializer, ExportSerializer
+
+
+class ExportView(generics.GenericAPIView):
+    """
+    Every patient, doctor or mapping of the authenticated user as NDJSON or CSV.
+
+    ``GET`` streams the export in the response; ``POST`` starts a background
+    export (``exports.jobs``) and answers 202 with the job to poll, or 429
+    while the user has ``EXPORT_MAX_ACTIVE`` jobs in progress. Both take
+    ``?file_format=ndjson|csv``, ``?gzip=true`` and ``?fields=``/``?exclude=``.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ExportSerializer
+
+    def get_options(self, request, kind):
+        """``(file_format, gzip, fields)`` from the query string"""
+        if kind not in KINDS:
+            raise Http404
+        options = ExportOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+        _, rows = KINDS[kind]
+        fields = requested_fields(request.query_params, rows.field_names)
+        return options.validated_data['file_format'], options.validated_data['gzip'], fields
+
+    def get(self, request, kind):
+        file_format, compress, fields = self.get_options(request, kind)
+        exporter = Exporter(request.user, kind, file_format, compress, fields)
+        # Django loads a sync iterator whole under ASGI (and an async one under
+        # WSGI), so hand over the one this server streams
+        if isinstance(request._request, ASGIRequest):
+            content = exporter.achunks()
+        else:
+            content = exporter.chunks()
+        response = StreamingHttpResponse(content, content_type=exporter.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{exporter.file_name()}"'
+        # Don't let a proxy buffer the whole body before passing it on
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def post(self, request, kind):
+        file_format, compress, fields = self.get_options(request, kind)
+        with transaction.atomic():
+            # Serialize a user's concurrent requests so both can't pass the limit
+            User.objects.select_for_update().filter(pk=request.user.pk).exists()
+            if jobs.active_count(request.user) >= settings.EXPORT_MAX_ACTIVE:
+                return Response({
+                    'error': f'You already have {settings.EXPORT_MAX_ACTIVE} exports in progress; '
+                             'wait for one to finish.',
+                }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            export = Export.objects.create(
+                created_by=request.user, kind=kind, file_format=file_format, gzip=compress,
+                fields=','.join(fields or ()),
+            )
+            jobs.start(export)
+        return Response({
+            'message': 'Export started',
+            'export': ExportSerializer(export).data,
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobListView(generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = ExportSerializer
+
+    def get_queryset(self):
+        """Return exports started by the authenticated user"""
+        return Export.objects.filter(created_by=self.request.user)
+
+
+class ExportJobDetailView(generics.RetrieveDestroyAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = ExportSerializer
+
+    def get_queryset(self):
+        return Export.objects.filter(created_by=self.request.user)
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        jobs.remove_file(instance)
+        instance.delete()
+        return Response({
+            'message': 'Export deleted successfully'
+        }, status=status.HTTP_200_OK)
+
+
+class ExportDownloadView(generics.GenericAPIView):
+    """The file of a finished background export; 409 until it is done"""
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Export.objects.filter(created_by=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        export = self.get_object()
+        if export.status != 'DONE':
+            return Response({
+                'error': f'The export is {export.status.lower()}',
+                'status': export.status,
+            }, status=status.HTTP_409_CONFLICT)
+        try:
+            file = open(export.path, 'rb')
+        except FileNotFoundError:
+            raise Http404('The export file no longer exists')
+        content_type = GZIP_CONTENT_TYPE if export.gzip else CONTENT_TYPES[export.file_format]
+        return FileResponse(file, as_attachment=True, filename=export.file_name, content_type=content_type)
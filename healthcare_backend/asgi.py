@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthcare_backend.settings')
+# Route reads to the async views (healthcare_backend.async_views)
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
+# Each request has its own connection under ASGI, so persistent ones would
+# only pile up; use DB_POOL_SIZE to reuse connections
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,113 @@
+"""
+Async read views for the ASGI deployment.
+
+DRF 3.14 only dispatches sync handlers. ``AsyncAPIView`` runs the same
+authentication, permission and throttle checks (``APIView.initial``) and
+then awaits an ``async def get`` that reads through Django's async ORM
+(``aget``, ``acount``, ``async for``). The response is rendered in the
+event loop, so apart from the ORM calls a request never waits on a worker
+thread.
+
+The checks run in the event loop and must not query the database.
+``StatelessJWTAuthentication`` does not, and the async handlers only read
+``request.user.pk``.
+
+``read_view`` wires a sync and an async view to one URL. The async view
+serves GET and HEAD when ``ASYNC_READ_VIEWS`` is on, which ``asgi.py``
+turns on; under WSGI the sync views are used unchanged.
+"""
+import inspect
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class AsyncAPIView(APIView):
+    """``APIView`` whose handlers may be coroutines"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.render_response(request, self.response)
+
+    def render_response(self, request, response):
+        """
+        Render in the event loop and return a plain ``HttpResponse``.
+
+        Returning the DRF response would make Django render it through
+        ``sync_to_async``. The render time is reported to
+        ``RequestMetricsMiddleware`` as for sync views.
+        """
+        if not isinstance(response, SimpleTemplateResponse):
+            return response
+        started = time.perf_counter()
+        response.render()
+        request._request._render_seconds = time.perf_counter() - started
+        return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+
+class AsyncGenericAPIView(AsyncAPIView, generics.GenericAPIView):
+    async def aget_object(self):
+        """``get_object()`` through the async ORM"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+
+class AsyncRetrieveAPIView(AsyncGenericAPIView):
+    async def get(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+
+def read_view(sync_view, async_view):
+    """
+    Serve GET/HEAD with ``async_view`` and other methods with ``sync_view``
+    when ``ASYNC_READ_VIEWS`` is on; otherwise return ``sync_view``.
+    """
+    if not settings.ASYNC_READ_VIEWS:
+        return sync_view
+    write_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await async_view(request, *args, **kwargs)
+        return await write_view(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
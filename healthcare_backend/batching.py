@@ -0,0 +1,11 @@
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items without materializing ``iterable``"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
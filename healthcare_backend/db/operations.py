@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+class VendorAddIndex(migrations.AddIndex):
+    """
+    ``AddIndex`` that only touches the database on the given vendors.
+
+    Used for PostgreSQL-only index types (GIN over a ``SearchVector``) so the
+    same migration still applies cleanly on the SQLite development database.
+    The migration state records the index everywhere, keeping ``makemigrations``
+    quiet.
+    """
+
+    def __init__(self, model_name, index, vendors=('postgresql',)):
+        super().__init__(model_name, index)
+        self.vendors = tuple(vendors)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        kwargs['vendors'] = self.vendors
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor in self.vendors:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor in self.vendors:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f'{super().describe()} ({", ".join(self.vendors)} only)'
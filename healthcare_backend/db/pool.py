@@ -0,0 +1,136 @@
+"""
+Per-process database connection pool.
+
+Django 4.2 has no pool of its own. Under ASGI every request runs in its own
+context and gets a new connection, so persistent connections
+(``CONN_MAX_AGE``) are not reused there. The ``healthcare_backend.db.postgresql``
+backend instead checks a connection out of this pool when Django connects
+and puts it back when Django closes it at the end of the request.
+
+At most ``SIZE`` connections are open at once. A request that waits
+``TIMEOUT`` seconds for one gets ``PoolTimeout`` (answered with 503).
+Connections are rolled back before they are reused, dropped after a
+database error, and closed after ``MAX_IDLE`` seconds unused.
+"""
+import os
+import threading
+import time
+
+from django.db import OperationalError
+
+from .. import metrics
+
+UTILIZATION_BUCKETS = (0.25, 0.5, 0.75, 0.9, 1.0)
+
+checkouts = metrics.counter('db_pool_checkouts_total', 'Connections checked out of the pool', ('database',))
+connects = metrics.counter('db_pool_connects_total', 'New connections opened by the pool', ('database',))
+timeouts = metrics.counter('db_pool_timeouts_total', 'Checkouts that gave up waiting for a connection', ('database',))
+wait_duration = metrics.histogram(
+    'db_pool_wait_seconds', 'Time spent waiting for a pooled connection', ('database',)
+)
+utilization = metrics.histogram(
+    'db_pool_utilization', 'Share of the pool in use after each checkout', ('database',), buckets=UTILIZATION_BUCKETS
+)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, alias, connect, size, timeout, max_idle=300):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._connect = connect
+        self._idle = []
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            timeouts.inc(database=self.alias)
+            raise PoolTimeout(f'No connection to {self.alias!r} free after {self.timeout}s')
+        wait_duration.observe(time.perf_counter() - started, database=self.alias)
+        try:
+            connection = self._pop_idle()
+            if connection is None:
+                connection = self._connect()
+                connects.inc(database=self.alias)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            in_use = self._in_use
+        checkouts.inc(database=self.alias)
+        utilization.observe(in_use / self.size, database=self.alias)
+        return connection
+
+    def _pop_idle(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, returned_at = self._idle.pop()
+            if not connection.closed and now - returned_at < self.max_idle:
+                return connection
+            _close_quietly(connection)
+
+    def release(self, connection, discard=False):
+        try:
+            if not discard and not connection.closed:
+                # psycopg2 and psycopg 3 both report 0 for an idle connection
+                if connection.info.transaction_status != 0:
+                    connection.rollback()
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+                    connection = None
+        except Exception:
+            pass
+        finally:
+            if connection is not None:
+                _close_quietly(connection)
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            _close_quietly(connection)
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def get_pool(alias, options, connect):
+    """Return this process's pool for ``alias``, creating it with ``connect``"""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(
+                alias, connect, options['SIZE'], options.get('TIMEOUT', 5.0), options.get('MAX_IDLE', 300),
+            )
+        return pool
+
+
+def _forget_pools():
+    # Connections are not shared with forked workers (gunicorn preload_app)
+    _pools.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools)
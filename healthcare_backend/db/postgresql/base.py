@@ -0,0 +1,31 @@
+"""
+PostgreSQL backend that takes connections from ``healthcare_backend.db.pool``.
+
+Used instead of ``django.db.backends.postgresql`` when ``DB_POOL_SIZE`` is
+set; the pool options are read from the database's ``POOL`` setting.
+"""
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from ..pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict['POOL'], partial(super().get_new_connection, conn_params))
+        connection = pool.acquire()
+        # Normally set while connecting; a reused connection skips that
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+        )
+        self.pool = pool
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            # A connection closed inside atomic() stays attached to this
+            # wrapper, and one that raised may be broken: don't reuse either
+            discard = self.errors_occurred or self.in_atomic_block
+            with self.wrap_database_errors:
+                self.pool.release(self.connection, discard=discard)
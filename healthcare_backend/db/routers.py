@@ -0,0 +1,81 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` opens a routing scope for every request. In a
+GET, HEAD or OPTIONS request, reads go to one replica from
+``DATABASE_REPLICAS``, picked at random for the whole request; everything
+else, and any read outside a request, goes to ``default``.
+
+The first write in a request pins the rest of it to ``default``, so the
+object a create or update view serializes back is read from the primary
+and not from a replica that has not caught up yet. ``pin_primary()`` does
+the same for code that must not read stale data, such as a cache fill.
+
+Every decision is counted in ``db_route_total``.
+"""
+import contextvars
+import random
+
+from django.conf import settings
+
+from .. import metrics
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+routes = metrics.counter(
+    'db_route_total', 'Database routing decisions by operation, database and reason',
+    ('operation', 'database', 'reason'),
+)
+
+
+class RoutingState:
+    def __init__(self, replica):
+        self.replica = replica
+        self.reason = 'safe_method' if replica else 'unsafe_method'
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+def start_request(method):
+    """Open the routing scope of a request; returns a token for ``end_request``"""
+    replicas = settings.DATABASE_REPLICAS
+    replica = random.choice(replicas) if replicas and method in SAFE_METHODS else None
+    return _state.set(RoutingState(replica))
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def pin_primary(reason='pinned'):
+    """Send the rest of the current request's reads to ``default``"""
+    state = _state.get()
+    if state is not None and state.replica:
+        state.replica = None
+        state.reason = reason
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None:
+            database, reason = 'default', 'outside_request'
+        elif state.replica:
+            database, reason = state.replica, state.reason
+        else:
+            database, reason = 'default', state.reason
+        routes.inc(operation='read', database=database, reason=reason)
+        return database
+
+    def db_for_write(self, model, **hints):
+        pin_primary('after_write')
+        routes.inc(operation='write', database='default', reason='write')
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
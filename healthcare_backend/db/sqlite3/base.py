@@ -0,0 +1,34 @@
+"""
+SQLite backend tuned for several gunicorn workers sharing one file.
+
+Used for SQLite databases when ``SQLITE_TUNED`` is on. Every new
+connection applies the database's ``PRAGMAS`` setting (WAL journal,
+``synchronous=NORMAL``, page cache, mmap and busy timeout). WAL is
+persistent, so settings leave it out for the committed development
+database.
+
+With ``TRANSACTION_MODE`` set to ``IMMEDIATE``
+(``SQLITE_IMMEDIATE_TRANSACTIONS``), ``atomic()`` blocks start with
+``BEGIN IMMEDIATE``. A deferred transaction that reads before it writes
+has to upgrade its lock, and in WAL mode that fails with "database is
+locked" without waiting if another process committed in between.
+IMMEDIATE takes the write lock up front, where the busy timeout applies,
+but read-only blocks then queue behind writers too. Django 5.1 has both
+as ``init_command`` and ``transaction_mode``.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE', 'DEFERRED')
+        if mode == 'DEFERRED':
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {mode}')
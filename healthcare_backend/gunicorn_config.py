@@ -0,0 +1,118 @@
+"""
+gunicorn configuration, used by the Procfile::
+
+    gunicorn -c python:healthcare_backend.gunicorn_config
+
+``GUNICORN_WORKER_CLASS`` picks ``sync``, ``gthread`` (default) or
+``uvicorn``; uvicorn workers serve the ASGI app, which routes reads to the
+async views. Workers and threads are sized from the CPUs available to the
+process and capped so that together they never hold more than
+``GUNICORN_DB_CONNECTIONS`` database connections, Django's one connection
+per thread (or, for uvicorn, per in-flight request). With a connection
+pool (``DB_POOL_SIZE``) a worker holds at most the pool's size instead.
+``WEB_CONCURRENCY`` and ``GUNICORN_THREADS`` override the computed sizes.
+
+The app is preloaded in the master so workers share its memory
+copy-on-write, and each worker restarts after about
+``GUNICORN_MAX_REQUESTS`` requests (plus up to 10% jitter so they do not
+all restart at once). ``child_exit`` archives an exited worker's metrics
+when ``METRICS_DIR`` is set (see ``healthcare_backend.metrics``).
+"""
+import os
+
+# Not ``from decouple import config``: gunicorn reads module-level names as
+# settings, and ``config`` is one of them
+import decouple
+
+# Size-based log rotation can't be shared between worker processes
+os.environ.setdefault('LOG_FILE_PER_PROCESS', 'True')
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'healthcare_backend.workers.UvicornWorker',
+}
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not on Linux
+        return os.cpu_count() or 1
+
+
+def plan(kind, cpus, db_connections=None, workers=None, threads=None, worker_connections=1000, pool_size=None):
+    """
+    Return ``(workers, threads, worker_connections)`` for ``kind``.
+
+    Defaults are ``2 * cpus + 1`` sync workers, or ``cpus + 1`` gthread
+    workers of 4 threads, or ``cpus + 1`` uvicorn workers. With a
+    ``db_connections`` budget the computed values shrink to fit it, each
+    worker counting as ``pool_size`` connections when pooled; explicit
+    ``workers``/``threads`` are kept as given.
+    """
+    if kind == 'sync':
+        threads = 1
+    elif kind == 'gthread':
+        threads = threads or 4
+    else:
+        threads = 1
+    if workers is None:
+        workers = 2 * cpus + 1 if kind == 'sync' else cpus + 1
+        if db_connections:
+            per_worker = pool_size or (threads if kind != 'uvicorn' else 1)
+            workers = max(1, min(workers, db_connections // per_worker))
+    if db_connections and not pool_size:
+        if kind == 'gthread':
+            threads = max(1, min(threads, db_connections // workers))
+        elif kind == 'uvicorn':
+            worker_connections = max(1, min(worker_connections, db_connections // workers))
+    return workers, threads, worker_connections
+
+
+def optional_int(value):
+    return int(value) if value else None
+
+
+def sizes(kind):
+    """``plan()`` for ``kind`` with this machine's CPUs and the environment's overrides"""
+    return plan(
+        kind,
+        available_cpus(),
+        db_connections=decouple.config('GUNICORN_DB_CONNECTIONS', default=0, cast=int),
+        workers=decouple.config('WEB_CONCURRENCY', default=None, cast=optional_int),
+        threads=decouple.config('GUNICORN_THREADS', default=None, cast=optional_int),
+        worker_connections=decouple.config('GUNICORN_WORKER_CONNECTIONS', default=1000, cast=int),
+        pool_size=decouple.config('DB_POOL_SIZE', default=0, cast=int),
+    )
+
+
+kind = decouple.config('GUNICORN_WORKER_CLASS', default='gthread')
+if kind not in WORKER_CLASSES:
+    raise ValueError(f'GUNICORN_WORKER_CLASS must be one of {", ".join(WORKER_CLASSES)}, not {kind!r}')
+
+workers, threads, worker_connections = sizes(kind)
+worker_class = WORKER_CLASSES[kind]
+wsgi_app = 'healthcare_backend.asgi:application' if kind == 'uvicorn' else 'healthcare_backend.wsgi:application'
+
+bind = f"0.0.0.0:{decouple.config('PORT', default='8000')}"
+preload_app = decouple.config('GUNICORN_PRELOAD', default=True, cast=bool)
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = max_requests // 10
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+keepalive = 5
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared between processes
+    from django.db import connections
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    # Fold the exited worker's metrics into the archive before its pid can be reused
+    directory = decouple.config('METRICS_DIR', default='')
+    if directory:
+        from healthcare_backend import metrics
+        metrics.archive(worker.pid, directory)
@@ -0,0 +1,283 @@
+"""
+Logging pipeline: request threads only queue records, a listener thread
+formats and writes them.
+
+``configure`` is Django's ``LOGGING_CONFIG``. It applies ``LOGGING`` as
+usual, then moves the root logger's handlers behind a ``QueueHandler``.
+A ``QueueListener`` thread feeds them, so a slow disk never holds up a
+request.
+
+Before a record is queued, ``SamplingFilter`` can drop it. It keeps a
+fraction of each configured logger's records (``LOG_SAMPLE_RATES``) and
+caps each logger at a number of records per second (``LOG_RATE_LIMITS``),
+reporting how many were dropped. Records at WARNING and above are never
+sampled, only rate limited.
+
+``JSONFormatter`` writes one JSON object per line. ``redact`` masks
+passwords, tokens and similar values in messages and extra fields. Under
+gunicorn every process writes its own ``ProcessRotatingFileHandler`` file,
+since size-based rotation cannot be shared between processes.
+"""
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+SENSITIVE_KEYS = (
+    'password', 'password_confirm', 'secret', 'token', 'access', 'refresh', 'authorization', 'cookie',
+)
+_SENSITIVE_PATTERN = '|'.join(SENSITIVE_KEYS)
+_ASSIGNMENT = re.compile(
+    rf"""(?P<key>['"]?[\w-]*(?:{_SENSITIVE_PATTERN})[\w-]*['"]?\s*[:=]\s*)"""
+    r"""(?P<value>(?:Bearer\s+)?(?:'[^']*'|"[^"]*"|[^\s,;}]+))""",
+    re.IGNORECASE,
+)
+_BEARER = re.compile(r'(Bearer\s+)[\w.~+/=-]+', re.IGNORECASE)
+REDACTED = '[REDACTED]'
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_queue_handler = None
+
+
+def is_sensitive(key):
+    key = str(key).lower()
+    return any(name in key for name in SENSITIVE_KEYS)
+
+
+def redact(value):
+    """Mask sensitive values in ``value`` (a string, or a dict/list of them)"""
+    if isinstance(value, str):
+        value = _ASSIGNMENT.sub(lambda match: match['key'] + REDACTED, value)
+        return _BEARER.sub(r'\1' + REDACTED, value)
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if is_sensitive(key) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact(record.getMessage()),
+            'process': record.process,
+            'thread': record.thread,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = REDACTED if is_sensitive(key) else redact(value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = redact(record.exc_text)
+        if orjson is None:
+            return json.dumps(entry, default=str, ensure_ascii=False, separators=(',', ':'))
+        return orjson.dumps(entry, default=str).decode()
+
+
+class RedactingFormatter(logging.Formatter):
+    """Plain-text formatter that masks sensitive values, for the console"""
+
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class ProcessRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    ``RotatingFileHandler`` that, with ``per_process``, writes to
+    ``<name>.<pid><ext>`` and switches to a new file in forked children.
+    """
+
+    def __init__(self, filename, per_process=False, **kwargs):
+        self.template = os.fspath(filename)
+        self.per_process = per_process
+        kwargs.setdefault('delay', True)
+        super().__init__(self._filename(), **kwargs)
+
+    def _filename(self):
+        if not self.per_process:
+            return self.template
+        root, ext = os.path.splitext(self.template)
+        return f'{root}.{os.getpid()}{ext}'
+
+    def reopen(self):
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(self._filename())
+        finally:
+            self.release()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep ``rates[logger]`` of a logger's records below WARNING and at most
+    ``limits[logger]`` records per second. A setting applies to the logger
+    and its children, the most specific name winning; ``root`` applies to
+    all. The first record let through after drops carries ``dropped``.
+    """
+
+    def __init__(self, rates=None, limits=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.limits = dict(limits or {})
+        self._rules = {}
+        self._seen = {}
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _match(settings, name):
+        while name not in settings:
+            if '.' not in name:
+                return 'root' if 'root' in settings else None
+            name = name.rsplit('.', 1)[0]
+        return name
+
+    def filter(self, record):
+        rule = self._rules.get(record.name)
+        if rule is None:
+            rule = (self._match(self.rates, record.name), self._match(self.limits, record.name))
+            self._rules[record.name] = rule
+        sampled, limited = rule
+        if sampled is not None and record.levelno < logging.WARNING and not self._sample(sampled):
+            return False
+        return limited is None or self._admit(record, limited)
+
+    def _sample(self, name):
+        # Every 1/rate-th record rather than random(), so the share is exact
+        rate = self.rates[name]
+        with self._lock:
+            seen = self._seen[name] = self._seen.get(name, 0) + 1
+        return int(seen * rate) > int((seen - 1) * rate)
+
+    def _admit(self, record, name):
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(name)
+            if window is None or now - window[0] >= 1.0:
+                if window and window[2]:
+                    record.dropped = window[2]
+                window = self._windows[name] = [now, 0, 0]
+            if window[1] >= self.limits[name]:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+
+def parse_rates(value, cast=float):
+    """Parse ``logger=value,...`` (e.g. ``LOG_SAMPLE_RATES``) into a dict"""
+    pairs = (item.split('=', 1) for item in value.split(',') if '=' in item)
+    return {name.strip(): cast(number) for name, number in pairs}
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Keep the traceback in its own attribute for JSONFormatter
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class _FilteredHandler(logging.Handler):
+    """``LOG_ASYNC=False``: pass each record through the filters once, then to ``handlers``"""
+
+    def __init__(self, handlers):
+        super().__init__()
+        self.handlers = handlers
+
+    def emit(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _start(handlers):
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _after_fork():
+    # The listener thread does not survive fork(); start one in the child
+    if _listener is None:
+        return
+    handlers = _listener.handlers
+    for handler in handlers:
+        if isinstance(handler, ProcessRotatingFileHandler):
+            handler.reopen()
+    _start(handlers)
+
+
+def stop():
+    """Flush queued records; called at exit"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def configure(config):
+    """
+    ``LOGGING_CONFIG``: apply ``config``, then put the root handlers behind a
+    queue. With ``LOG_ASYNC=False`` they are written synchronously, behind
+    the same sampling and rate limits when any are set.
+    """
+    global _queue_handler
+    from django.conf import settings
+
+    stop()
+    logging.config.dictConfig(config)
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    sampling = settings.LOG_SAMPLE_RATES or settings.LOG_RATE_LIMITS
+    if not handlers or not (settings.LOG_ASYNC or sampling):
+        return
+    for handler in handlers:
+        root.removeHandler(handler)
+    # One filter in front of all handlers, so each record is sampled and counted once
+    sampler = SamplingFilter(settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMITS)
+    if not settings.LOG_ASYNC:
+        handler = _FilteredHandler(handlers)
+        handler.addFilter(sampler)
+        root.addHandler(handler)
+        return
+    first_configuration = _queue_handler is None
+    _queue_handler = _QueueHandler(None)
+    _queue_handler.addFilter(sampler)
+    root.addHandler(_queue_handler)
+    _start(handlers)
+    if first_configuration:
+        import atexit
+        atexit.register(stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,291 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Metrics are created once at import time with ``counter()`` or
+``histogram()`` and updated from request code. Updates only touch a dict
+under a lock, so they are cheap enough for every request.
+
+Each gunicorn worker has its own registry. When ``METRICS_DIR`` is set,
+every process periodically writes its values to
+``<METRICS_DIR>/<pid>-<start>.json`` and ``collect()`` sums the files of all
+workers, so whichever worker serves ``/metrics`` reports totals for the
+whole server. The start time in the name keeps a process that reuses a pid
+from overwriting an earlier one's totals. When a worker exits, gunicorn's
+``child_exit`` hook calls ``archive()``, which adds its values to
+``archive.json`` and deletes its file, so counters never go backwards and
+the directory does not grow with every restart.
+"""
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Unix
+    fcntl = None
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+_registry = {}
+_registry_lock = threading.Lock()
+_last_dump = 0.0
+# (pid, start) of this process; reset in a forked child by ``_state_file()``
+_process = (None, None)
+
+
+class Counter:
+    """A monotonically increasing value, safe to update from request threads"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    @property
+    def value(self):
+        """Value of an unlabelled counter"""
+        return self.values.get((), 0)
+
+    def empty(self):
+        return 0
+
+    def merge(self, current, other):
+        return current + other
+
+    def samples(self, key, value):
+        yield self.name, key, value
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets, plus their sum and count.
+
+    Values are stored as ``[bucket counts..., +Inf count, sum]`` with
+    non-cumulative counts; exposition makes them cumulative.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, amount, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            value = self.values.get(key)
+            if value is None:
+                value = self.values[key] = self.empty()
+            value[index] += 1
+            value[-1] += amount
+
+    def empty(self):
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def merge(self, current, other):
+        return [a + b for a, b in zip(current, other)]
+
+    def samples(self, key, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), value):
+            cumulative += count
+            le = '+Inf' if bound == math.inf else repr(float(bound))
+            yield self.name + '_bucket', key + (('le', le),), cumulative
+        yield self.name + '_sum', key, value[-1]
+        yield self.name + '_count', key, cumulative
+
+
+def _register(metric_class, name, documentation, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = metric_class(name, documentation, **kwargs)
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter, name, documentation, labelnames=labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, documentation, labelnames=labelnames, buckets=buckets)
+
+
+def _dump_state():
+    with _registry_lock:
+        metrics = list(_registry.values())
+    state = {}
+    for metric in metrics:
+        with metric._lock:
+            values = [[list(key), metric.merge(metric.empty(), value)] for key, value in metric.values.items()]
+        state[metric.name] = values
+    return state
+
+
+def dump(force=False):
+    """
+    Write this process's values to ``METRICS_DIR``.
+
+    Called after every request; writes at most once per
+    ``METRICS_DUMP_INTERVAL`` seconds unless ``force`` is set.
+    """
+    global _last_dump
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_dump < settings.METRICS_DUMP_INTERVAL:
+        return
+    _last_dump = now
+    os.makedirs(directory, exist_ok=True)
+    _write_state(directory, _state_file(), _dump_state())
+
+
+def _state_file():
+    global _process
+    pid = os.getpid()
+    if _process[0] != pid:
+        _process = (pid, time.time_ns())
+    return f'{pid}-{_process[1]}.json'
+
+
+def _write_state(directory, filename, state):
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as handle:
+        json.dump(state, handle)
+    os.replace(path, os.path.join(directory, filename))
+
+
+def _read_state(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _locked(directory, exclusive):
+    """Keep ``collect()`` from reading a worker's values both archived and in its own file"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _add(current, other):
+    if isinstance(current, list):
+        return [a + b for a, b in zip(current, other)]
+    return current + other
+
+
+def archive(pid, directory):
+    """Add the values of the exited process ``pid`` to the archive file and delete its files"""
+    if not os.path.isdir(directory):
+        return
+    prefix = f'{pid}-'
+    with _locked(directory, exclusive=True):
+        filenames = [
+            filename for filename in os.listdir(directory)
+            if filename.startswith(prefix) and filename.endswith('.json')
+        ]
+        if not filenames:
+            return
+        totals = {
+            name: {tuple(key): value for key, value in values}
+            for name, values in (_read_state(os.path.join(directory, ARCHIVE_FILE)) or {}).items()
+        }
+        for filename in filenames:
+            for name, values in (_read_state(os.path.join(directory, filename)) or {}).items():
+                merged = totals.setdefault(name, {})
+                for key, value in values:
+                    key = tuple(key)
+                    merged[key] = _add(merged[key], value) if key in merged else value
+        _write_state(directory, ARCHIVE_FILE, {
+            name: [[list(key), value] for key, value in values.items()] for name, values in totals.items()
+        })
+        for filename in filenames:
+            os.remove(os.path.join(directory, filename))
+
+
+def collect():
+    """Return ``{metric: {label values: value}}`` summed across worker processes"""
+    directory = getattr(settings, 'METRICS_DIR', None)
+    with _registry_lock:
+        metrics = dict(_registry)
+    if not directory:
+        states = [_dump_state()]
+    else:
+        dump(force=True)
+        with _locked(directory, exclusive=False):
+            states = [
+                _read_state(os.path.join(directory, filename))
+                for filename in os.listdir(directory) if filename.endswith('.json')
+            ]
+        states = [state for state in states if state is not None]
+
+    # Unlabelled metrics are always exported, starting from zero
+    merged = {name: {} if metric.labelnames else {(): metric.empty()} for name, metric in metrics.items()}
+    for state in states:
+        for name, values in state.items():
+            metric = metrics.get(name)
+            if metric is None:
+                continue
+            for key, value in values:
+                key = tuple(key)
+                current = merged[name].get(key, metric.empty())
+                merged[name][key] = metric.merge(current, value)
+    return merged
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def exposition():
+    """Render every metric in the Prometheus text format (version 0.0.4)"""
+    with _registry_lock:
+        metrics = dict(_registry)
+    lines = []
+    for name, values in sorted(collect().items()):
+        metric = metrics[name]
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for key, value in sorted(values.items()):
+            labels = tuple(zip(metric.labelnames, key))
+            for sample_name, pairs, sample in metric.samples(labels, value):
+                lines.append(f'{sample_name}{_format_labels(pairs)} {sample}')
+    return '\n'.join(lines) + '\n'
@@ -1,19 +1,32 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
 from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
+from whitenoise.middleware import WhiteNoiseMiddleware
 import logging
 
-logger = logging.getLogger(__name__)
+from . import metrics
+from .db import routers
+from .db.pool import PoolTimeout
 
-class ErrorHandlingMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        response = self.get_response(request)
-        return response
+logger = logging.getLogger(__name__)
 
+class ErrorHandlingMiddleware(MiddlewareMixin):
     def process_exception(self, request, exception):
         """Handle unhandled exceptions"""
+        if isinstance(exception, PoolTimeout):
+            logger.warning(str(exception))
+            return JsonResponse({
+                'error': 'Service unavailable',
+                'message': 'The server is busy. Please try again shortly.',
+                'status_code': 503
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
         logger.error(f"Unhandled exception: {str(exception)}", exc_info=True)
         
         return JsonResponse({
@@ -21,3 +34,180 @@ class ErrorHandlingMiddleware:
             'message': 'An unexpected error occurred. Please try again later.',
             'status_code': 500
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+requests_total = metrics.counter(
+    'http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status')
+)
+request_duration = metrics.histogram(
+    'http_request_duration_seconds', 'Wall time spent handling the request', ('route', 'method')
+)
+db_queries = metrics.histogram(
+    'http_request_db_queries', 'Database queries executed per request', ('route',), buckets=QUERY_BUCKETS
+)
+db_duration = metrics.histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request', ('route',)
+)
+serialize_duration = metrics.histogram(
+    'http_request_serialize_seconds', 'Time spent rendering the response body', ('route',)
+)
+response_size = metrics.histogram(
+    'http_response_size_bytes', 'Response body size', ('route',), buckets=SIZE_BUCKETS
+)
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` hook counting queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, query count/time, render time and response size per URL name.
+
+    Values go into the histograms in ``healthcare_backend.metrics`` (exported
+    at ``/metrics``) and, when ``SERVER_TIMING_HEADER`` is on, into a
+    ``Server-Timing`` header for the browser's network panel.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        timer = QueryTimer()
+        request._render_seconds = 0.0
+        with self.wrap_queries(timer):
+            response = self.get_response(request)
+        return self.finish(request, response, start, timer)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        timer = QueryTimer()
+        request._render_seconds = 0.0
+        with self.wrap_queries(timer):
+            response = await self.get_response(request)
+        return self.finish(request, response, start, timer)
+
+    @staticmethod
+    def wrap_queries(timer):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        return stack
+
+    def finish(self, request, response, start, timer):
+        total = time.perf_counter() - start
+
+        match = request.resolver_match
+        route = (match.view_name if match else None) or 'unresolved'
+        render = request._render_seconds
+        requests_total.inc(route=route, method=request.method, status=response.status_code)
+        request_duration.observe(total, route=route, method=request.method)
+        db_queries.observe(timer.count, route=route)
+        db_duration.observe(timer.duration, route=route)
+        serialize_duration.observe(render, route=route)
+        if not response.streaming:
+            response_size.observe(len(response.content), route=route)
+        metrics.dump()
+
+        if settings.SERVER_TIMING_HEADER:
+            app = max(total - timer.duration - render, 0.0)
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries"',
+                f'serialize;dur={render * 1000:.2f}',
+                f'app;dur={app * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ])
+        return response
+
+    def process_template_response(self, request, response):
+        """Time ``response.render()``, which runs right after this hook"""
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._render_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Open the read-replica routing scope (``healthcare_backend.db.routers``) of each request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = routers.start_request(request.method)
+        try:
+            return self.get_response(request)
+        finally:
+            routers.end_request(token)
+
+    async def __acall__(self, request):
+        token = routers.start_request(request.method)
+        try:
+            return await self.get_response(request)
+        finally:
+            routers.end_request(token)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    ``WhiteNoiseMiddleware`` that can also run in async mode.
+
+    WhiteNoise 6 is sync-only, which under ASGI would send every request
+    through a worker thread. Here only static file responses are built in
+    ``sync_to_async``; other requests pass straight through.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
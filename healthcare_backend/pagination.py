@@ -0,0 +1,166 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CreatedAtKeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode.
+
+    ``?pagination=cursor`` starts a keyset walk ordered by ``(-created_at, -id)``;
+    the ``next``/``previous`` links carry an opaque ``cursor`` parameter. Keyset
+    pages skip the ``COUNT(*)`` and seek on the composite index instead of
+    scanning an ``OFFSET``, so page N costs the same as page 1. The seek is
+    written as ``created_at <= t AND (created_at < t OR id < i)`` so the
+    leading range stays sargable on every backend. Keyset pages have no other
+    order, so combining them with ``?ordering=`` is answered with 400.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_keyset(request):
+            return super().paginate_queryset(queryset, request, view)
+        queryset, page_size, position = self.start_keyset(queryset, request)
+        return self.finish_keyset(list(queryset[:page_size + 1]), page_size, position)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, reading through the async ORM"""
+        if self.use_keyset(request):
+            queryset, page_size, position = self.start_keyset(queryset, request)
+            return self.finish_keyset([row async for row in queryset[:page_size + 1]], page_size, position)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def use_keyset(self, request):
+        """Record whether ``request`` asks for a keyset page"""
+        self.keyset = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+        if self.keyset and request.query_params.get(self.ordering_query_param, '').strip():
+            raise ValidationError({self.ordering_query_param: [
+                'Cursor pagination is always ordered by newest first; use page numbers to order by another field.'
+            ]})
+        return self.keyset
+
+    def start_keyset(self, queryset, request):
+        """Return the positioned queryset, the page size and the decoded cursor"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        if position is None:
+            created_at, pk, self.reverse = None, None, False
+        else:
+            created_at, pk, self.reverse = position
+        return self.seek(queryset, created_at, pk, self.reverse), page_size, position
+
+    def finish_keyset(self, results, page_size, position):
+        """Trim the ``page_size + 1`` rows fetched to a page and work out the links"""
+        has_more = len(results) > page_size
+        results = results[:page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page_results = results
+        return results
+
+    @staticmethod
+    def seek(queryset, created_at=None, pk=None, reverse=False):
+        """Order ``queryset`` for a keyset walk and position it after ``(created_at, pk)``"""
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+            if created_at is not None:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(id__gt=pk), created_at__gte=created_at
+                )
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+            if created_at is not None:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at
+                )
+        return queryset
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[0], reverse=True)
+
+    def encode_cursor(self, item, reverse):
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.cursor_token(item, reverse))
+
+    @staticmethod
+    def cursor_token(item, reverse=False):
+        """Token for ``item``, a model instance or a ``.values()`` row with ``created_at`` and ``id``"""
+        if isinstance(item, dict):
+            payload = {'t': item['created_at'].isoformat(), 'i': item['id']}
+        else:
+            payload = {'t': item.created_at.isoformat(), 'i': item.pk}
+        if reverse:
+            payload['r'] = 1
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+    def decode_cursor(self, request):
+        """Return ``(created_at, id, reverse)`` for the request's cursor, or None for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            created_at = parse_datetime(payload['t'])
+            pk = int(payload['i'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, bool(payload.get('r'))
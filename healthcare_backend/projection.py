@@ -0,0 +1,82 @@
+"""
+Sparse fieldsets for the read endpoints.
+
+``?fields=id,full_name`` keeps only the listed fields of each result and
+``?exclude=address,medical_history`` drops the listed ones; both take
+comma-separated names and may be combined. The selection is pushed down to
+the query: list views fetch only the projected serializer's ``.values()``
+columns, and detail views load instances with ``.only()`` those columns,
+so large text columns nobody asked for are never read. Unknown names are
+answered with 400.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+READ_METHODS = ('GET', 'HEAD')
+
+
+def parse_names(query_params, param):
+    return {name.strip() for value in query_params.getlist(param) for name in value.split(',') if name.strip()}
+
+
+def requested_fields(query_params, available):
+    """
+    The names of ``available`` selected by ``?fields=`` and ``?exclude=``, in
+    ``available``'s order, or None when the request selects every field.
+    """
+    selected = parse_names(query_params, FIELDS_PARAM)
+    excluded = parse_names(query_params, EXCLUDE_PARAM)
+    if not selected and not excluded:
+        return None
+    for param, names in ((FIELDS_PARAM, selected), (EXCLUDE_PARAM, excluded)):
+        unknown = sorted(names.difference(available))
+        if unknown:
+            raise ValidationError({param: [
+                f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(available)}."
+            ]})
+
+    names = tuple(name for name in available if (not selected or name in selected) and name not in excluded)
+    if not names:
+        raise ValidationError({EXCLUDE_PARAM: ['At least one field must be left.']})
+    return None if len(names) == len(available) else names
+
+
+class ProjectionMixin:
+    """
+    ``?fields=`` and ``?exclude=`` for GET requests to generic views with a
+    ``row_serializer`` (a ``healthcare_backend.rows.RowSerializer``).
+
+    Row list views serialize with ``get_row_serializer()``. Detail views get
+    their queryset through ``project_instances()`` and have the fields that
+    were not selected removed from ``get_serializer()``.
+    """
+    row_serializer = None
+
+    def get_projection(self):
+        """The selected field names, or None for all of them (and for writes)"""
+        if not hasattr(self, '_projection'):
+            self._projection = None
+            if self.request.method in READ_METHODS:
+                self._projection = requested_fields(self.request.query_params, self.row_serializer.field_names)
+        return self._projection
+
+    def get_row_serializer(self):
+        names = self.get_projection()
+        return self.row_serializer if names is None else self.row_serializer.project(names)
+
+    def project_instances(self, queryset):
+        """``queryset.for_serializer()``, or only the selected fields' columns"""
+        if self.get_projection() is None:
+            return queryset.for_serializer()
+        return self.get_row_serializer().only(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.get_projection()
+        if names is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in list(fields):
+                if name not in names:
+                    fields.pop(name)
+        return serializer
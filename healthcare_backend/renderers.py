@@ -0,0 +1,59 @@
+"""
+JSON renderer and parser backed by orjson.
+
+Both classes are drop-in replacements for DRF's ``JSONRenderer`` and
+``JSONParser`` and produce the same output: types orjson does not handle
+the way DRF does (``Decimal``, dates, times, lazy strings, ...) go through
+DRF's ``JSONEncoder.default``. When orjson is not installed, or for
+requests DRF's classes handle differently (indented output, non UTF-8
+bodies, invalid JSON), they defer to the stdlib-based parent class.
+"""
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+if orjson is not None:
+    # Datetimes are passed to the DRF encoder, which renders UTC as "Z"
+    DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(data, default=_encoder.default, option=DUMPS_OPTIONS)
+        # Match DRF, which escapes these so the output is also valid JavaScript
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read() if stream is not None else b''
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Let the stdlib parser report the error; it also accepts integers wider than 64 bits
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,252 @@
+"""
+Compiled read-only serialization for hot list endpoints.
+
+``RowSerializer`` takes an existing ``ModelSerializer`` class and works out,
+once, which ``.values()`` column feeds each output field and how to convert
+it. List views then fetch plain dict rows instead of model instances and
+turn each row into the same dict the ``ModelSerializer`` would have built,
+skipping per-instance model construction, attribute-chain lookups and the
+serializer's field machinery.
+
+Fields that are not backed by a column (properties such as ``full_name``)
+are declared in ``computed`` as ``name: (columns, function)``; the function
+receives the row. Parity with the source serializer is covered by tests.
+
+``project(names)`` returns the same serializer restricted to some of its
+fields, for ``?fields=``/``?exclude=`` (``healthcare_backend.projection``):
+only those fields' columns are fetched, and ``only()`` narrows a model
+queryset to them for the views that serialize instances.
+"""
+import datetime
+import decimal
+import operator
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import ForeignObjectRel
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, fields, relations
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .projection import ProjectionMixin
+
+# DRF fields whose to_representation returns database values unchanged
+PASSTHROUGH = {
+    fields.CharField.to_representation,
+    fields.IntegerField.to_representation,
+    fields.ChoiceField.to_representation,
+    fields.ReadOnlyField.to_representation,
+}
+
+# Always fetched by projections: the keyset cursor is built from them
+KEYSET_COLUMNS = ('id', 'created_at')
+MAX_PROJECTIONS = 128
+
+
+class RowSerializer:
+    def __init__(self, serializer_class, computed=None, extra_columns=(), fields=None):
+        self.serializer_class = serializer_class
+        self.computed = computed or {}
+        self.extra_columns = tuple(extra_columns)
+        self.fields = fields
+        self._projections = {}
+
+    @cached_property
+    def field_names(self):
+        """Names of the readable fields, in output order"""
+        return tuple(
+            name for name, field in self.serializer_class().fields.items()
+            if not field.write_only and (self.fields is None or name in self.fields)
+        )
+
+    def project(self, names):
+        """This serializer restricted to the fields ``names``, compiled once per combination"""
+        names = tuple(names)
+        projected = self._projections.get(names)
+        if projected is None:
+            if len(self._projections) >= MAX_PROJECTIONS:
+                self._projections.clear()
+            projected = self._projections[names] = RowSerializer(
+                self.serializer_class, self.computed, self.extra_columns + KEYSET_COLUMNS, fields=names,
+            )
+        return projected
+
+    @cached_property
+    def plan(self):
+        """
+        ``(columns, entries)``: the ``.values()`` columns and one
+        ``(key, column, source)`` entry per output field, in the serializer's
+        field order. ``source`` is ``None`` when the column value is used
+        unchanged, the DRF field whose conversion ``serialize()`` resolves,
+        or, with ``column`` ``None``, the computed function taking the row.
+        """
+        model = self.serializer_class.Meta.model
+        columns = list(self.extra_columns)
+        entries = []
+
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only or (self.fields is not None and name not in self.fields):
+                continue
+            if name in self.computed:
+                needed, function = self.computed[name]
+                columns.extend(needed)
+                entries.append((name, None, function))
+                continue
+
+            path = field.source.split('.')
+            if len(path) > 1:
+                self.check_relation(model, path[0])
+            elif not self.is_column(model, path[0]):
+                raise ImproperlyConfigured(
+                    f'{self.serializer_class.__name__}.{name} has no column; declare it in computed'
+                )
+            column = '__'.join(path)
+            columns.append(column)
+
+            if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+                # DRF renders the related pk, which is what the column holds
+                entries.append((name, column, None))
+            elif isinstance(field, (relations.RelatedField, fields.SerializerMethodField)) or hasattr(field, 'fields'):
+                raise ImproperlyConfigured(f'{self.serializer_class.__name__}.{name} cannot be compiled')
+            elif type(field).to_representation in PASSTHROUGH:
+                entries.append((name, column, None))
+            else:
+                entries.append((name, column, field))
+
+        return list(dict.fromkeys(columns)), entries
+
+    @staticmethod
+    def is_column(model, name):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete
+
+    def check_relation(self, model, name):
+        # DRF omits the key when a nullable relation is empty; rows would carry None instead
+        field = model._meta.get_field(name)
+        if isinstance(field, ForeignObjectRel) or field.null:
+            raise ImproperlyConfigured(
+                f'{self.serializer_class.__name__}: source through nullable relation {name!r} cannot be compiled'
+            )
+
+    def values(self, queryset):
+        """Restrict ``queryset`` to dict rows with the columns this serializer needs"""
+        return queryset.values(*self.plan[0])
+
+    def only(self, queryset):
+        """
+        Restrict a model ``queryset`` to the columns this serializer needs,
+        joining the relations its dotted sources go through
+        """
+        columns = self.plan[0]
+        relations = sorted({column.split('__')[0] for column in columns if '__' in column})
+        if relations:
+            # select_related() without arguments would follow every foreign key
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*relations, *columns)
+
+    def serialize(self, rows):
+        # Built per call: datetime output depends on the active time zone
+        getters = []
+        for key, column, source in self.plan[1]:
+            if column is None:
+                getters.append((key, source))
+            elif source is None:
+                getters.append((key, operator.itemgetter(column)))
+            else:
+                getters.append((key, converting_getter(column, fast_converter(source))))
+        return [{key: get(row) for key, get in getters} for row in rows]
+
+
+def converting_getter(column, convert):
+    """``row[column]`` through ``convert``; like Serializer.to_representation, None skips it"""
+    def get(row):
+        value = row[column]
+        return None if value is None else convert(value)
+    return get
+
+
+def fast_converter(field):
+    """
+    ``field.to_representation``, specialised for ISO 8601 dates and
+    datetimes and for decimals rendered as strings.
+
+    DRF looks up the output format, the current time zone and the decimal
+    context for every value; here they are resolved once per page.
+    """
+    if isinstance(field, fields.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if not timezone.is_aware(value):
+                return field.to_representation(value)
+            try:
+                value = value.astimezone(field_timezone).isoformat()
+            except OverflowError:
+                return field.to_representation(value)
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    if isinstance(field, fields.DecimalField):
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if not coerce_to_string or field.localize or field.decimal_places is None:
+            return field.to_representation
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        exponent = decimal.Decimal('.1') ** field.decimal_places
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                return field.to_representation(value)
+            return '{:f}'.format(value.quantize(exponent, rounding=field.rounding, context=context))
+        return convert
+
+    if isinstance(field, fields.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return datetime.date.isoformat
+
+    return field.to_representation
+
+
+class RowListMixin(ProjectionMixin):
+    """
+    ``list()`` for generic views whose ``get_queryset()`` returns
+    ``get_row_serializer().values(...)``; rows skip ``get_serializer()``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_rows(page))
+        return Response(self.serialize_rows(list(queryset)))
+
+    def serialize_rows(self, rows):
+        """Output data for ``rows``; views extend it, e.g. to embed related data"""
+        return self.get_row_serializer().serialize(rows)
+
+
+class AsyncRowListMixin(ProjectionMixin):
+    """``RowListMixin`` for ``AsyncGenericAPIView``; rows are read with the async ORM"""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(await self.aserialize_rows(page))
+        return Response(await self.aserialize_rows([row async for row in queryset]))
+
+    async def aserialize_rows(self, rows):
+        """``RowListMixin.serialize_rows``; may read more data through the async ORM"""
+        return self.get_row_serializer().serialize(rows)
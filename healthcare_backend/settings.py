@@ -14,6 +14,8 @@ from pathlib import Path
 from decouple import config
 from datetime import timedelta
 
+from healthcare_backend.logs import parse_rates
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     
     # Local apps
@@ -50,11 +53,15 @@ INSTALLED_APPS = [
     'patients',
     'doctors',
     'mappings',
+    'stats',
+    'exports',
 ]
 
 MIDDLEWARE = [
+    'healthcare_backend.middleware.RequestMetricsMiddleware',
+    'healthcare_backend.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'healthcare_backend.middleware.StaticFilesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -121,6 +128,146 @@ else:
     }
 
 
+# Read replicas: comma-separated database URLs, parsed like DATABASE_URL.
+# Reads in GET/HEAD/OPTIONS requests go to them until the request writes
+# (healthcare_backend.db.routers); tests use the primary for them
+DATABASE_REPLICA_URLS = [url for url in config('DATABASE_REPLICA_URLS', default='').split(',') if url]
+if DATABASE_REPLICA_URLS:
+    import dj_database_url
+    for index, url in enumerate(DATABASE_REPLICA_URLS, 1):
+        DATABASES[f'replica{index}'] = dict(dj_database_url.parse(url), TEST={'MIRROR': 'default'})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['healthcare_backend.db.routers.ReplicaRouter'] if DATABASE_REPLICAS else []
+
+# Keep connections open between requests for DB_CONN_MAX_AGE seconds and
+# check them before reuse; asgi.py turns this off since ASGI requests do not
+# reuse them. DB_POOL_SIZE > 0 (PostgreSQL) hands out connections from a
+# per-process pool per database instead (healthcare_backend.db.pool), for
+# both stacks. Behind PgBouncer in transaction pooling mode set DB_PGBOUNCER=True.
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=0, cast=int)
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+# SQLITE_TUNED=True opens SQLite databases with WAL, relaxed fsync and a larger
+# page cache (healthcare_backend.db.sqlite3) so several workers can share one.
+# WAL is stored in the file itself, so it is never switched on for the
+# committed development database; set DB_NAME to use it. With
+# SQLITE_IMMEDIATE_TRANSACTIONS=True every atomic() block, read-only ones
+# included, also takes the write lock up front with BEGIN IMMEDIATE.
+SQLITE_TUNED = config('SQLITE_TUNED', default=False, cast=bool)
+SQLITE_IMMEDIATE_TRANSACTIONS = config('SQLITE_IMMEDIATE_TRANSACTIONS', default=False, cast=bool)
+DEVELOPMENT_DATABASE = BASE_DIR / 'healthcare_db.sqlite3'
+
+for database in DATABASES.values():
+    database.update(
+        CONN_MAX_AGE=config('DB_CONN_MAX_AGE', default=60, cast=int),
+        CONN_HEALTH_CHECKS=True,
+    )
+    if database['ENGINE'] == 'django.db.backends.sqlite3' and SQLITE_TUNED:
+        # busy_timeout first: switching to WAL needs the lock
+        pragmas = {
+            'busy_timeout': config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=16384, cast=int),
+            'mmap_size': config('SQLITE_MMAP_SIZE_MB', default=256, cast=int) * 1024 * 1024,
+        }
+        if str(database['NAME']) == str(DEVELOPMENT_DATABASE):
+            del pragmas['journal_mode']
+        database.update(
+            ENGINE='healthcare_backend.db.sqlite3',
+            PRAGMAS=pragmas,
+            TRANSACTION_MODE='IMMEDIATE' if SQLITE_IMMEDIATE_TRANSACTIONS else 'DEFERRED',
+        )
+    if database['ENGINE'] != 'django.db.backends.postgresql':
+        continue
+    if DB_POOL_SIZE:
+        database.update(
+            ENGINE='healthcare_backend.db.postgresql',
+            # Django closes the connection after each request, which returns it to the pool
+            CONN_MAX_AGE=0,
+            POOL={
+                'SIZE': DB_POOL_SIZE,
+                'TIMEOUT': config('DB_POOL_TIMEOUT', default=5.0, cast=float),
+                'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300, cast=int),
+            },
+        )
+    if DB_PGBOUNCER:
+        # Named cursors (QuerySet.iterator()) do not survive transaction pooling
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# Serve GET/HEAD on the main read endpoints with async views
+# (healthcare_backend.async_views); asgi.py turns this on
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at Redis,
+# Memcached or the database cache to share entries between workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='healthcare-backend'),
+    }
+}
+
+DOCTOR_CACHE_ALIAS = 'default'
+DOCTOR_CACHE_TIMEOUT = config('DOCTOR_CACHE_TIMEOUT', default=300, cast=int)
+
+
+# Metrics
+# With several gunicorn workers set METRICS_DIR to a directory shared by
+# them (emptied on deploy) so /metrics reports totals for all workers.
+# /metrics answers clients in METRICS_ALLOWED_IPS, or only scrapes carrying
+# METRICS_TOKEN once one is set; METRICS_PUBLIC=True opens it to anyone.
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_DUMP_INTERVAL = config('METRICS_DUMP_INTERVAL', default=1.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1').split(',')
+METRICS_PUBLIC = config('METRICS_PUBLIC', default=False, cast=bool)
+SERVER_TIMING_HEADER = config('SERVER_TIMING_HEADER', default=DEBUG, cast=bool)
+
+
+# Password hashing (authentication.hashers)
+# PASSWORD_HASHER picks the hasher for new hashes; older hashes are upgraded
+# on the next successful login. argon2 needs the argon2-cffi package.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='scrypt')
+_PASSWORD_HASHERS = {
+    'scrypt': 'authentication.hashers.ScryptPasswordHasher',
+    'argon2': 'authentication.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'authentication.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=102400, cast=int)
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=600000, cast=int)
+
+# Threads per process that hash passwords, logins allowed to wait for one,
+# and how long they wait before getting a 503
+LOGIN_HASH_WORKERS = config('LOGIN_HASH_WORKERS', default=2, cast=int)
+LOGIN_HASH_QUEUE = config('LOGIN_HASH_QUEUE', default=32, cast=int)
+LOGIN_HASH_WAIT = config('LOGIN_HASH_WAIT', default=5.0, cast=float)
+
+
+# Exports (exports.exporters)
+# Rows are read from the database EXPORT_CHUNK_SIZE at a time, so an export
+# holds one chunk in memory whatever the table size. Background exports run
+# on EXPORT_WORKERS threads per process (0 runs them in the request, after
+# commit) and are written to EXPORT_DIR, which every worker must share.
+# A user may have EXPORT_MAX_ACTIVE jobs pending or running at once. Jobs
+# not finished after EXPORT_STALE_MINUTES are marked FAILED, and finished
+# ones are deleted with their files after EXPORT_RETENTION_HOURS by
+# `manage.py expire_exports`.
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_WORKERS = config('EXPORT_WORKERS', default=1, cast=int)
+EXPORT_DIR = config('EXPORT_DIR', default=str(BASE_DIR / 'export_files'))
+EXPORT_MAX_ACTIVE = config('EXPORT_MAX_ACTIVE', default=2, cast=int)
+EXPORT_STALE_MINUTES = config('EXPORT_STALE_MINUTES', default=60, cast=int)
+EXPORT_RETENTION_HOURS = config('EXPORT_RETENTION_HOURS', default=24, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -176,13 +323,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'healthcare_backend.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'healthcare_backend.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -200,8 +352,17 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.TokenRefreshSerializer',
 }
 
+# Validated access tokens kept per worker by StatelessJWTAuthentication
+JWT_TOKEN_CACHE_SIZE = config('JWT_TOKEN_CACHE_SIZE', default=1024, cast=int)
+
+# Refresh token revocations are mirrored in memory (authentication.revocation);
+# processes resync when the version in this cache changes, or after the interval
+JWT_REVOCATION_CACHE_ALIAS = 'default'
+JWT_REVOCATION_SYNC_INTERVAL = config('JWT_REVOCATION_SYNC_INTERVAL', default=5.0, cast=float)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     # Development domains
@@ -233,15 +394,25 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 # Logging Configuration
+# Records are queued by request threads and written by a listener thread
+# (healthcare_backend.logs); the file gets one JSON object per line.
+# LOG_SAMPLE_RATES / LOG_RATE_LIMITS take "logger=value,..." pairs, e.g.
+# "authentication=0.1" or "root=200" (records per second). gunicorn_config
+# sets LOG_FILE_PER_PROCESS so each worker rotates its own file.
+LOGGING_CONFIG = 'healthcare_backend.logs.configure'
+LOG_ASYNC = config('LOG_ASYNC', default=True, cast=bool)
+LOG_SAMPLE_RATES = config('LOG_SAMPLE_RATES', default='', cast=parse_rates)
+LOG_RATE_LIMITS = config('LOG_RATE_LIMITS', default='', cast=lambda value: parse_rates(value, int))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+        'json': {
+            '()': 'healthcare_backend.logs.JSONFormatter',
         },
         'simple': {
+            '()': 'healthcare_backend.logs.RedactingFormatter',
             'format': '{levelname} {message}',
             'style': '{',
         },
@@ -249,9 +420,12 @@ LOGGING = {
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': 'healthcare_backend.log',
-            'formatter': 'verbose',
+            'class': 'healthcare_backend.logs.ProcessRotatingFileHandler',
+            'filename': config('LOG_FILE', default='healthcare_backend.log'),
+            'per_process': config('LOG_FILE_PER_PROCESS', default=False, cast=bool),
+            'maxBytes': config('LOG_FILE_MAX_MB', default=50, cast=int) * 1024 * 1024,
+            'backupCount': config('LOG_FILE_BACKUPS', default=5, cast=int),
+            'formatter': 'json',
         },
         'console': {
             'level': 'DEBUG',
@@ -0,0 +1,456 @@
+import io
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from doctors.tests import create_doctor
+from doctors.views import DoctorListAsyncView, DoctorRetrieveAsyncView
+from mappings.models import PatientDoctorMapping
+from mappings.views import PatientDoctorsAsyncView
+from patients.models import Patient
+from patients.tests import create_patient
+from patients.views import PatientListAsyncView, PatientRetrieveAsyncView
+
+from . import gunicorn_config, logs, metrics
+from .db import routers
+from .db.pool import ConnectionPool, PoolTimeout
+from .db.sqlite3.base import DatabaseWrapper as SQLiteWrapper
+from .middleware import ErrorHandlingMiddleware
+from .async_views import read_view
+from .renderers import FastJSONParser, FastJSONRenderer
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('patient_list_create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=')
+
+    def test_metrics_exposition_counts_requests_per_route(self):
+        self.client.get(reverse('patient_list_create'))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'http_requests_total\{route="patient_list_create",method="GET",status="200"\} \d+')
+        self.assertRegex(body, r'http_request_db_queries_bucket\{route="patient_list_create",le="\+Inf"\} \d+')
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_are_restricted_to_allowed_ips(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['203.0.113.7']):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 200)
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with override_settings(METRICS_PUBLIC=True):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 200)
+
+    def test_worker_files_are_merged(self):
+        counter = metrics.counter('test_merge_total', 'Merged across workers')
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            counter.inc(2)
+            metrics.dump(force=True)
+            with open(f'{directory}/99999.json', 'w') as handle:
+                handle.write('{"test_merge_total": [[[], 5]]}')
+            self.assertEqual(metrics.collect()['test_merge_total'][()], counter.value + 5)
+
+    def test_exited_workers_are_archived(self):
+        counter = metrics.counter('test_archive_total', 'Archived across workers', labelnames=['route'])
+        metrics.histogram('test_archive_seconds', 'Archived histogram', buckets=(1.0,))
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            metrics.dump(force=True)
+            self.assertTrue(os.path.exists(f'{directory}/{os.getpid()}-{metrics._process[1]}.json'))
+            # Two processes that had the same pid, then a live worker
+            for filename, total in (('4242-1.json', 3), ('4242-2.json', 4), ('5151-1.json', 10)):
+                with open(f'{directory}/{filename}', 'w') as handle:
+                    json.dump({
+                        'test_archive_total': [[['a'], total]],
+                        'test_archive_seconds': [[[], [total, 1, 2.5]]],
+                    }, handle)
+            before = metrics.collect()
+            metrics.archive(4242, directory)
+            metrics.archive(4242, directory)
+            self.assertEqual(metrics.collect(), before)
+            self.assertEqual(before['test_archive_total'][('a',)], counter.values.get(('a',), 0) + 17)
+            self.assertEqual(before['test_archive_seconds'][()], [17, 3, 7.5])
+            self.assertEqual(
+                sorted(name for name in os.listdir(directory) if not name.startswith(f'{os.getpid()}-')),
+                ['.lock', '5151-1.json', 'archive.json'],
+            )
+
+            # gunicorn calls the hook in the master once it has reaped the worker
+            with mock.patch.dict(os.environ, {'METRICS_DIR': directory}):
+                gunicorn_config.child_exit(None, mock.Mock(pid=5151))
+            self.assertFalse(os.path.exists(f'{directory}/5151-1.json'))
+            self.assertEqual(metrics.collect(), before)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_renderer(self):
+        data = {
+            'fee': Decimal('200.50'),
+            'born': date(1990, 5, 15),
+            'seen_at': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'opens': time(9, 30),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Patient'),
+            'notes': 'line\u2028break',
+            'tags': ('a', 'b'),
+            1: 'numeric key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_drf(self):
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        self.assertEqual(rendered, b'{\n    "a": 1\n}')
+
+    def test_parser_reports_invalid_json(self):
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            FastJSONParser().parse(io.BytesIO(b'{"a": '))
+
+    def test_parser_accepts_wide_integers(self):
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(b'[18446744073709551616]')), [2 ** 64])
+
+
+class AsyncReadViewTests(APITestCase):
+    """The async read views return what the sync views served at the same URL return"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patient = create_patient(self.user, 0)
+        for index in range(1, 25):
+            create_patient(self.user, index)
+        for index in range(3):
+            PatientDoctorMapping.objects.create(
+                patient=self.patient, doctor=create_doctor(self.user, index), created_by=self.user
+            )
+
+    async def aget(self, view, url, user=True, **kwargs):
+        request = APIRequestFactory().get(url)
+        if user:
+            force_authenticate(request, self.user)
+        response = await view.as_view()(request, **kwargs)
+        return response.status_code, json.loads(response.content)
+
+    async def sync_get(self, url):
+        response = await sync_to_async(self.client.get)(url)
+        return response.status_code, response.json()
+
+    async def test_patient_list_pages(self):
+        for query in ('', '?page=2', '?pagination=cursor', '?page=9', '?expand=doctors&fields=full_name'):
+            url = reverse('patient_list_create') + query
+            self.assertEqual(await self.aget(PatientListAsyncView, url), await self.sync_get(url))
+
+    async def test_patient_detail(self):
+        url = reverse('patient_detail', args=[self.patient.pk])
+        self.assertEqual(await self.aget(PatientRetrieveAsyncView, url, pk=self.patient.pk), await self.sync_get(url))
+        expanded = url + '?expand=doctors'
+        self.assertEqual(
+            await self.aget(PatientRetrieveAsyncView, expanded, pk=self.patient.pk), await self.sync_get(expanded)
+        )
+        other = await User.objects.acreate(username='other')
+        self.user = other
+        status_code, _ = await self.aget(PatientRetrieveAsyncView, url, pk=self.patient.pk)
+        self.assertEqual(status_code, 404)
+
+    async def test_doctor_list_and_detail(self):
+        url = reverse('doctor_list') + '?ordering=name'
+        self.assertEqual(await self.aget(DoctorListAsyncView, url), await self.sync_get(url))
+        doctor = await PatientDoctorMapping.objects.values_list('doctor', flat=True).afirst()
+        url = reverse('doctor_detail', args=[doctor])
+        self.assertEqual(await self.aget(DoctorRetrieveAsyncView, url, pk=doctor), await self.sync_get(url))
+
+    async def test_patient_doctors(self):
+        url = reverse('patient_doctors', args=[self.patient.pk])
+        status_code, data = await self.aget(PatientDoctorsAsyncView, url, patient_id=self.patient.pk)
+        self.assertEqual((status_code, data), await self.sync_get(url))
+        self.assertEqual(len(data['doctors']), 3)
+
+    async def test_authentication_is_required(self):
+        status_code, _ = await self.aget(PatientListAsyncView, reverse('patient_list_create'), user=False)
+        self.assertEqual(status_code, 401)
+
+    @override_settings(ASYNC_READ_VIEWS=True)
+    def test_read_view_routes_writes_to_sync_view(self):
+        view = read_view(lambda request: 'sync', None)
+        request = APIRequestFactory().post('/')
+        self.assertEqual(async_to_sync(view)(request), 'sync')
+
+
+class GunicornSizingTests(SimpleTestCase):
+    def test_defaults_scale_with_cpus(self):
+        self.assertEqual(gunicorn_config.plan('sync', 4), (9, 1, 1000))
+        self.assertEqual(gunicorn_config.plan('gthread', 4), (5, 4, 1000))
+        self.assertEqual(gunicorn_config.plan('uvicorn', 4), (5, 1, 1000))
+
+    def test_connection_budget_caps_workers_and_threads(self):
+        self.assertEqual(gunicorn_config.plan('sync', 8, db_connections=10), (10, 1, 1000))
+        self.assertEqual(gunicorn_config.plan('gthread', 8, db_connections=20), (5, 4, 1000))
+        self.assertEqual(gunicorn_config.plan('gthread', 8, db_connections=2), (1, 2, 1000))
+        self.assertEqual(gunicorn_config.plan('uvicorn', 3, db_connections=40), (4, 1, 10))
+
+    def test_explicit_workers_are_kept(self):
+        workers, threads, _ = gunicorn_config.plan('gthread', 8, db_connections=20, workers=10, threads=8)
+        self.assertEqual((workers, threads), (10, 2))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.rolled_back = False
+        self.info = type('Info', (), {'transaction_status': 0})()
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = 0
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, size=2, timeout=0.05):
+        self.opened = []
+
+        def connect():
+            self.opened.append(FakeConnection())
+            return self.opened[-1]
+        return ConnectionPool('test', connect, size, timeout)
+
+    def test_released_connections_are_reused(self):
+        pool = self.make_pool()
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        connection.info.transaction_status = 2
+        pool.release(connection)
+        self.assertTrue(connection.rolled_back)
+        self.assertIs(pool.acquire(), connection)
+
+    def test_discarded_and_stale_connections_are_closed(self):
+        pool = self.make_pool()
+        broken = pool.acquire()
+        pool.release(broken, discard=True)
+        self.assertTrue(broken.closed)
+
+        pool.max_idle = 0
+        stale = pool.acquire()
+        pool.release(stale)
+        self.assertIsNot(pool.acquire(), stale)
+        self.assertTrue(stale.closed)
+
+    def test_checkout_times_out_when_pool_is_exhausted(self):
+        pool = self.make_pool(size=1)
+        connection = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+
+    def test_pool_timeout_is_answered_with_503(self):
+        request = APIRequestFactory().get('/api/patients/')
+        response = ErrorHandlingMiddleware(lambda request: None).process_exception(request, PoolTimeout('busy'))
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+    router = routers.ReplicaRouter()
+
+    def in_request(self, method):
+        token = routers.start_request(method)
+        self.addCleanup(routers.end_request, token)
+
+    def test_safe_requests_read_from_replica(self):
+        self.in_request('GET')
+        self.assertEqual(self.router.db_for_read(Patient), 'replica1')
+        self.assertEqual(self.router.db_for_write(Patient), 'default')
+
+    def test_request_sticks_to_primary_after_write(self):
+        self.in_request('GET')
+        self.router.db_for_write(Patient)
+        self.assertEqual(self.router.db_for_read(Patient), 'default')
+        key = ('read', 'default', 'after_write')
+        self.assertGreater(routers.routes.values[key], 0)
+
+    def test_unsafe_requests_and_other_code_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Patient), 'default')
+        self.in_request('POST')
+        self.assertEqual(self.router.db_for_read(Patient), 'default')
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'patients'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'patients'))
+
+
+# The primary stands in for the replica, so routing is observed through the counters
+@override_settings(DATABASE_REPLICAS=['default'], DATABASE_ROUTERS=['healthcare_backend.db.routers.ReplicaRouter'])
+class ReplicaRoutingRequestTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+
+    def count(self, reason):
+        return routers.routes.values.get(('read', 'default', reason), 0)
+
+    def test_list_reads_are_routed_to_replica(self):
+        create_patient(self.user, 1)
+        before = self.count('safe_method')
+        response = self.client.get(reverse('patient_list_create'))
+        self.assertEqual(response.data['count'], 1)
+        self.assertGreater(self.count('safe_method'), before)
+
+    def test_create_response_is_read_from_primary(self):
+        doctor = create_doctor(self.user, 1)
+        patient = create_patient(self.user, 1)
+        before = self.count('safe_method')
+        response = self.client.post(
+            reverse('mapping_list_create'), {'patient': patient.pk, 'doctor': doctor.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.count('safe_method'), before)
+
+
+class TunedSQLiteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+        self.wrapper = self.open(PRAGMAS={'journal_mode': 'WAL', 'synchronous': 'NORMAL'}, TRANSACTION_MODE='IMMEDIATE')
+
+    def open(self, **options):
+        settings_dict = {
+            key: value for key, value in connection.settings_dict.items() if key not in ('PRAGMAS', 'TRANSACTION_MODE')
+        }
+        wrapper = SQLiteWrapper(dict(settings_dict, NAME=self.path, **options), alias='tuned')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pragmas_are_applied(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        self.wrapper._start_transaction_under_autocommit()
+        self.addCleanup(self.wrapper.connection.rollback)
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            other.execute('INSERT INTO item VALUES (1)')
+
+    def test_transactions_are_deferred_by_default(self):
+        wrapper = self.open()
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        wrapper._start_transaction_under_autocommit()
+        self.addCleanup(wrapper.connection.rollback)
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        other.execute('INSERT INTO item VALUES (1)')
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'delete')
+
+
+def log_record(name='authentication.views', level=logging.INFO, message='hello', **extra):
+    record = logging.LogRecord(name, level, __file__, 1, message, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+class LoggingPipelineTests(SimpleTestCase):
+    def test_redact_masks_sensitive_values(self):
+        message = "data: {'username': 'ann', 'password': 'hunter2', 'password_confirm': 'hunter2'}"
+        self.assertEqual(
+            logs.redact(message),
+            "data: {'username': 'ann', 'password': [REDACTED], 'password_confirm': [REDACTED]}",
+        )
+        self.assertEqual(logs.redact('Authorization: Bearer abc.def'), 'Authorization: [REDACTED]')
+        self.assertEqual(logs.redact({'refresh': 'x', 'user': 'ann'}), {'refresh': '[REDACTED]', 'user': 'ann'})
+
+    def test_json_formatter_includes_extra_fields(self):
+        record = log_record(message='created', user_id=7, token='secret-token')
+        entry = json.loads(logs.JSONFormatter().format(record))
+        self.assertEqual(entry['message'], 'created')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['user_id'], 7)
+        self.assertEqual(entry['token'], '[REDACTED]')
+
+    def test_json_formatter_without_orjson(self):
+        record = log_record(message='créé', user_id=7, seen_at=date(2024, 1, 2))
+        expected = logs.JSONFormatter().format(record)
+        with mock.patch.object(logs, 'orjson', None):
+            self.assertEqual(logs.JSONFormatter().format(record), expected)
+
+    def test_sampling_keeps_share_of_records_below_warning(self):
+        sampler = logs.SamplingFilter(rates={'authentication': 0.25})
+        kept = [sampler.filter(log_record()) for _ in range(100)]
+        self.assertEqual(sum(kept), 25)
+        self.assertTrue(sampler.filter(log_record(level=logging.WARNING)))
+        self.assertTrue(all(sampler.filter(log_record(name='patients.views')) for _ in range(10)))
+
+    def test_rate_limit_reports_dropped_records(self):
+        sampler = logs.SamplingFilter(limits={'root': 3})
+        kept = [sampler.filter(log_record()) for _ in range(10)]
+        self.assertEqual(sum(kept), 3)
+        sampler._windows['root'][0] -= 1
+        record = log_record()
+        self.assertTrue(sampler.filter(record))
+        self.assertEqual(record.dropped, 7)
+
+    @override_settings(LOG_ASYNC=False, LOG_SAMPLE_RATES={'sampled': 0.5}, LOG_RATE_LIMITS={})
+    def test_synchronous_logging_is_sampled(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        self.addCleanup(logs.configure, settings.LOGGING)
+        logs.configure({
+            'version': 1,
+            'disable_existing_loggers': False,
+            'handlers': {'capture': {'()': lambda: handler}},
+            'root': {'handlers': ['capture'], 'level': 'INFO'},
+        })
+        logger = logging.getLogger('sampled')
+        for _ in range(10):
+            logger.info('routine')
+        logger.warning('kept')
+        self.assertEqual([record.getMessage() for record in records], ['routine'] * 5 + ['kept'])
+
+    def test_per_process_file_names(self):
+        handler = logs.ProcessRotatingFileHandler('/tmp/app.log', per_process=True)
+        self.assertEqual(handler.baseFilename, f'/tmp/app.{os.getpid()}.log')
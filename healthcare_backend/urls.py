@@ -14,12 +14,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
+from django.http import HttpResponse
 from django.urls import path, include
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from authentication.urls import api_urlpatterns
+from . import metrics
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -38,24 +43,58 @@ def api_root(request):
             },
             'patients': {
                 'list_create': '/api/patients/',
+                'import': '/api/patients/import/',
+                'search': '/api/patients/search/?q=<name|email|phone>',
                 'detail': '/api/patients/<id>/',
+                'detail_with_doctors': '/api/patients/<id>/?expand=doctors',
             },
             'doctors': {
                 'list': '/api/doctors/',
                 'create': '/api/doctors/create/',
+                'bulk_upsert': '/api/doctors/bulk/',
+                'cache_stats': '/api/doctors/cache/stats/',
                 'detail': '/api/doctors/<id>/',
                 'update': '/api/doctors/<id>/update/',
                 'delete': '/api/doctors/<id>/delete/',
             },
             'mappings': {
                 'list_create': '/api/mappings/',
+                'batch_create': '/api/mappings/batch/',
                 'delete': '/api/mappings/<id>/',
                 'update': '/api/mappings/<id>/update/',
                 'patient_doctors': '/api/mappings/patient/<patient_id>/',
+            },
+            'stats': {
+                'dashboard': '/api/stats/',
+            },
+            'exports': {
+                'stream': '/api/exports/<patients|doctors|mappings>/?file_format=<ndjson|csv>&gzip=<true|false>',
+                'start': '/api/exports/<patients|doctors|mappings>/',
+                'jobs': '/api/exports/jobs/',
+                'job': '/api/exports/jobs/<id>/',
+                'download': '/api/exports/jobs/<id>/download/',
+            },
+            'monitoring': {
+                'metrics': '/metrics',
             }
         }
     })
 
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires ``Bearer <METRICS_TOKEN>`` when a
+    token is set, otherwise a client address in ``METRICS_ALLOWED_IPS``,
+    unless ``METRICS_PUBLIC`` is on.
+    """
+    if settings.METRICS_TOKEN and not settings.METRICS_PUBLIC:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not constant_time_compare(request.headers.get('Authorization', ''), expected):
+            return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    elif not settings.METRICS_PUBLIC and request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    return HttpResponse(metrics.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
@@ -67,4 +106,9 @@ urlpatterns = [
     path('api/patients/', include('patients.urls')),
     path('api/doctors/', include('doctors.urls')),
     path('api/mappings/', include('mappings.urls')),
+    path('api/stats/', include('stats.urls')),
+    path('api/exports/', include('exports.urls')),
+    
+    # Monitoring
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,16 @@
+"""
+gunicorn worker classes, selected through ``gunicorn_config``.
+"""
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    uvicorn worker that answers 503 once ``worker_connections`` requests are
+    in flight. Async views hold a database connection per request, so this
+    is what keeps a worker inside its share of the connection budget.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.limit_concurrency = self.cfg.worker_connections
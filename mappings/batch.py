@@ -0,0 +1,77 @@
+from doctors.models import Doctor
+from patients.models import Patient
+from stats import counters
+from .models import PatientDoctorMapping
+
+
+def assign_pairs(user, pairs, status='ACTIVE', notes=''):
+    """
+    Assign many ``(patient_id, doctor_id)`` pairs with set-based queries.
+
+    Ownership, doctor existence and already-assigned pairs are each checked
+    with one query for the whole request, the new mappings are inserted with
+    ``bulk_create(ignore_conflicts=True)`` so a concurrent assignment of the
+    same pair cannot fail the batch, and one more query reads back the ids.
+    Returns one outcome per input pair, in order.
+    """
+    patient_ids = {patient for patient, _ in pairs}
+    doctor_ids = {doctor for _, doctor in pairs}
+    owned_patients = set(
+        Patient.objects.owned_by(user).filter(id__in=patient_ids).values_list('id', flat=True)
+    )
+    doctors = set(Doctor.objects.filter(id__in=doctor_ids).values_list('id', flat=True))
+
+    def assigned():
+        return {
+            (patient, doctor): pk
+            for pk, patient, doctor in PatientDoctorMapping.objects.filter(
+                patient_id__in=owned_patients, doctor_id__in=doctors
+            ).order_by().values_list('id', 'patient_id', 'doctor_id')
+        }
+
+    existing = assigned() if owned_patients and doctors else {}
+
+    new_pairs = []
+    seen = set()
+    for pair in pairs:
+        if pair in seen or pair in existing:
+            continue
+        patient, doctor = pair
+        if patient in owned_patients and doctor in doctors:
+            new_pairs.append(pair)
+        seen.add(pair)
+
+    if new_pairs:
+        PatientDoctorMapping.objects.bulk_create(
+            [
+                PatientDoctorMapping(
+                    patient_id=patient, doctor_id=doctor, created_by=user, status=status, notes=notes
+                )
+                for patient, doctor in new_pairs
+            ],
+            ignore_conflicts=True,
+        )
+    current = assigned() if new_pairs else existing
+    # bulk_create bypasses the model signals that keep the stats counters
+    inserted = [pair for pair in new_pairs if pair in current]
+    counters.apply(user.id, counters.tally(
+        key for _, doctor in inserted for key in counters.mapping_keys(status, doctor)
+    ))
+
+    results = []
+    reported = set()
+    for pair in pairs:
+        patient, doctor = pair
+        result = {'patient': patient, 'doctor': doctor}
+        if patient not in owned_patients:
+            result['status'] = 'patient_not_found'
+        elif doctor not in doctors:
+            result['status'] = 'doctor_not_found'
+        elif pair in reported:
+            result['status'] = 'duplicate'
+        else:
+            result['status'] = 'exists' if pair in existing else 'created'
+            result['id'] = current.get(pair)
+            reported.add(pair)
+        results.append(result)
+    return results
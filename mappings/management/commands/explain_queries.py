@@ -0,0 +1,95 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from doctors.views import DoctorListView, DoctorRetrieveView, DoctorUpdateView
+from healthcare_backend.pagination import CreatedAtKeysetPagination
+from mappings.models import PatientDoctorMapping
+from mappings.views import MappingListCreateView, MappingUpdateView
+from patients.views import PatientListCreateView, PatientRetrieveUpdateDestroyView
+
+SEQUENTIAL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # "SCAN <table>" without "USING ... INDEX" is a full table scan in SQLite
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX)'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the query behind each list/detail endpoint and report sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username whose data scopes the queries (default: first user)')
+        parser.add_argument(
+            '--disable-seqscan', action='store_true',
+            help='PostgreSQL only: SET enable_seqscan = off to check an index can serve each query',
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan for every query')
+        parser.add_argument('--fail-on-seqscan', action='store_true', help='Exit non-zero if any query scans a table')
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'EXPLAIN parsing is not supported for {connection.vendor}')
+
+        user = self.get_user(options['user'])
+        flagged = 0
+        with transaction.atomic():
+            if options['disable_seqscan'] and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in self.endpoint_queries(user):
+                plan = queryset.explain()
+                scans = sorted(set(pattern.findall(plan)))
+                if scans:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f'{name}: sequential scan on {", ".join(scans)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{name}: index only'))
+                if options['verbose_plans'] or scans:
+                    self.stdout.write('    ' + plan.replace('\n', '\n    '))
+
+        if flagged and options['fail_on_seqscan']:
+            raise CommandError(f'{flagged} endpoint queries use sequential scans')
+
+    def get_user(self, username):
+        users = User.objects.order_by('pk')
+        user = users.filter(username=username).first() if username else users.first()
+        if user is None:
+            raise CommandError('No user found to scope the queries; create one or pass --user')
+        return user
+
+    def endpoint_queries(self, user):
+        """Yield ``(name, queryset)`` for each endpoint, built through the views themselves"""
+        now = timezone.now()
+        page_size = CreatedAtKeysetPagination.page_size
+        seek = CreatedAtKeysetPagination.seek
+
+        patients = self.view_queryset(PatientListCreateView, user)
+        yield 'patient_list_create', patients[:page_size]
+        yield 'patient_list_create (cursor)', seek(patients, now, 0)[:page_size + 1]
+        yield 'patient_detail', self.view_queryset(PatientRetrieveUpdateDestroyView, user).filter(pk=1)
+
+        doctors = self.view_queryset(DoctorListView, user)
+        yield 'doctor_list', doctors[:page_size]
+        yield 'doctor_list (cursor)', seek(doctors, now, 0)[:page_size + 1]
+        yield 'doctor_detail', self.view_queryset(DoctorRetrieveView, user).filter(pk=1)
+        yield 'doctor_update', self.view_queryset(DoctorUpdateView, user).filter(pk=1)
+
+        mappings = self.view_queryset(MappingListCreateView, user)
+        yield 'mapping_list_create', mappings[:page_size]
+        yield 'mapping_list_create (cursor)', seek(mappings, now, 0)[:page_size + 1]
+        yield 'mapping_update', self.view_queryset(MappingUpdateView, user).filter(pk=1)
+        yield 'patient_doctors', PatientDoctorMapping.objects.filter(patient=1, created_by=user).for_patient()
+
+    def view_queryset(self, view_class, user):
+        request = Request(APIRequestFactory().get('/'))
+        request.user = user
+        view = view_class(request=request, format_kwarg=None, kwargs={}, args=())
+        return view.get_queryset()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mappings', '0002_mapping_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['patient', 'created_by', '-created_at'], name='mapping_patient_owner_idx'),
+        ),
+    ]
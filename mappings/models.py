@@ -4,6 +4,33 @@ from patients.models import Patient
 from doctors.models import Doctor
 
 
+class PatientDoctorMappingQuerySet(models.QuerySet):
+    def owned_by(self, user):
+        """Mappings created by ``user``"""
+        return self.filter(created_by=user)
+
+    def for_serializer(self):
+        """Joins read by ``PatientDoctorMappingSerializer`` (patient, doctor and creator names)"""
+        return self.select_related('patient', 'doctor', 'created_by').only(
+            'id', 'patient', 'doctor', 'created_by', 'assigned_date', 'status', 'notes',
+            'created_at', 'updated_at',
+            'patient__first_name', 'patient__last_name',
+            'doctor__first_name', 'doctor__last_name', 'doctor__specialization',
+            'created_by__username',
+        )
+
+    def for_patient(self):
+        """
+        Joins read by ``PatientMappingsSerializer`` (the assigned doctor's contact
+        details); ``patient`` lets ``prefetch_related`` match mappings to patients
+        """
+        return self.select_related('doctor').only(
+            'id', 'patient', 'doctor', 'assigned_date', 'status', 'notes', 'created_at',
+            'doctor__first_name', 'doctor__last_name', 'doctor__specialization',
+            'doctor__clinic_name', 'doctor__phone_number',
+        )
+
+
 class PatientDoctorMapping(models.Model):
     STATUS_CHOICES = [
         ('ACTIVE', 'Active'),
@@ -24,9 +51,17 @@ class PatientDoctorMapping(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PatientDoctorMappingQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Owner-scoped list ordering, also the seek key for keyset pagination
+            models.Index(fields=['created_by', '-created_at', '-id'], name='mapping_owner_created_idx'),
+            # A patient's doctors, scoped to the owner (patient_doctors_view)
+            models.Index(fields=['patient', 'created_by', '-created_at'], name='mapping_patient_owner_idx'),
+        ]
         unique_together = ['patient', 'doctor']  # Prevent duplicate assignments
         
     def __str__(self):
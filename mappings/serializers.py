@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from healthcare_backend.rows import RowSerializer
 from .models import PatientDoctorMapping
 from patients.models import Patient
 from doctors.models import Doctor
@@ -27,7 +28,7 @@ class PatientDoctorMappingSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         
         # Ensure patient belongs to the current user
-        if patient and patient.created_by != request.user:
+        if patient and patient.created_by_id != request.user.id:
             raise serializers.ValidationError("You can only assign your own patients to doctors.")
         
         # Check if mapping already exists (for create operation)
@@ -39,6 +40,19 @@ class PatientDoctorMappingSerializer(serializers.ModelSerializer):
         return attrs
 
 
+# Compiled PatientDoctorMappingSerializer for the list endpoint; names mirror the models' full_name
+mapping_rows = RowSerializer(PatientDoctorMappingSerializer, computed={
+    'patient_name': (
+        ('patient__first_name', 'patient__last_name'),
+        lambda row: f"{row['patient__first_name']} {row['patient__last_name']}",
+    ),
+    'doctor_name': (
+        ('doctor__first_name', 'doctor__last_name'),
+        lambda row: f"Dr. {row['doctor__first_name']} {row['doctor__last_name']}",
+    ),
+})
+
+
 class PatientDoctorMappingCreateSerializer(PatientDoctorMappingSerializer):
     class Meta(PatientDoctorMappingSerializer.Meta):
         fields = ['patient', 'doctor', 'status', 'notes']
@@ -46,7 +60,7 @@ class PatientDoctorMappingCreateSerializer(PatientDoctorMappingSerializer):
     def validate_patient(self, value):
         """Ensure the patient belongs to the current user"""
         request = self.context.get('request')
-        if value.created_by != request.user:
+        if value.created_by_id != request.user.id:
             raise serializers.ValidationError("You can only assign your own patients.")
         return value
 
@@ -64,3 +78,52 @@ class PatientMappingsSerializer(serializers.ModelSerializer):
             'id', 'doctor', 'doctor_name', 'doctor_specialization', 
             'doctor_clinic', 'doctor_phone', 'assigned_date', 'status', 'notes'
         ]
+
+
+# Compiled PatientMappingsSerializer for ?expand=doctors on the patient list; rows carry the patient id
+patient_mapping_rows = RowSerializer(PatientMappingsSerializer, computed={
+    'doctor_name': (
+        ('doctor__first_name', 'doctor__last_name'),
+        lambda row: f"Dr. {row['doctor__first_name']} {row['doctor__last_name']}",
+    ),
+}, extra_columns=['patient'])
+
+
+class MappingBatchSerializer(serializers.Serializer):
+    """Input for batch assignment: explicit pairs, or every patient x every doctor"""
+    MAX_PAIRS = 5000
+
+    pairs = serializers.ListField(
+        child=serializers.DictField(child=serializers.IntegerField(min_value=1)), required=False,
+        max_length=MAX_PAIRS,
+    )
+    patients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=MAX_PAIRS
+    )
+    doctors = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=MAX_PAIRS
+    )
+    status = serializers.ChoiceField(choices=PatientDoctorMapping.STATUS_CHOICES, default='ACTIVE')
+    notes = serializers.CharField(allow_blank=True, default='')
+
+    def validate_pairs(self, value):
+        for pair in value:
+            if set(pair) != {'patient', 'doctor'}:
+                raise serializers.ValidationError("Each pair needs exactly 'patient' and 'doctor'.")
+        return [(pair['patient'], pair['doctor']) for pair in value]
+
+    def validate(self, attrs):
+        has_pairs = 'pairs' in attrs
+        has_sets = 'patients' in attrs or 'doctors' in attrs
+        if has_pairs == has_sets:
+            raise serializers.ValidationError("Send either 'pairs' or both 'patients' and 'doctors'.")
+        if has_sets:
+            if not attrs.get('patients') or not attrs.get('doctors'):
+                raise serializers.ValidationError("Both 'patients' and 'doctors' are required.")
+            # Check the size before building the cross product
+            if len(attrs['patients']) * len(attrs['doctors']) > self.MAX_PAIRS:
+                raise serializers.ValidationError(f'At most {self.MAX_PAIRS} pairs can be assigned per request.')
+            attrs['pairs'] = [(patient, doctor) for patient in attrs['patients'] for doctor in attrs['doctors']]
+        if not attrs['pairs']:
+            raise serializers.ValidationError('At least one pair is required.')
+        return attrs
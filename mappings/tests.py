@@ -1,3 +1,129 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from doctors.tests import create_doctor
+from patients.tests import create_patient
+from .models import PatientDoctorMapping
+from .serializers import MappingBatchSerializer, PatientDoctorMappingSerializer
+
+
+class MappingQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patient = create_patient(self.user, 0)
+        for index in range(25):
+            patient = self.patient if index < 5 else create_patient(self.user, index)
+            PatientDoctorMapping.objects.create(
+                patient=patient, doctor=create_doctor(self.user, index), created_by=self.user
+            )
+
+    def test_list_query_count_is_constant(self):
+        # COUNT(*) for the paginator plus one SELECT joining patient, doctor and creator
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('mapping_list_create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertTrue(response.data['results'][0]['doctor_name'].startswith('Dr. '))
+
+    def test_patient_doctors_query_count_is_constant(self):
+        # The patient ownership lookup plus one SELECT joining the doctors
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('patient_doctors', args=[self.patient.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['doctors']), 5)
+        self.assertEqual(response.data['doctors'][0]['doctor_clinic'], 'Heart Care Clinic')
+
+    def test_create_does_not_reload_patient_owner(self):
+        doctor = create_doctor(self.user, 99)
+        patient = create_patient(self.user, 99)
+        response = self.client.post(
+            reverse('mapping_list_create'), {'patient': patient.pk, 'doctor': doctor.pk}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['mapping']['created_by_username'], 'clinician')
+
+
+class MappingBatchCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patients = [create_patient(self.user, index) for index in range(3)]
+        self.doctors = [create_doctor(self.user, index) for index in range(2)]
+        other = User.objects.create_user(username='other', password='pass12345')
+        self.foreign_patient = create_patient(other, 9)
+        PatientDoctorMapping.objects.create(
+            patient=self.patients[0], doctor=self.doctors[0], created_by=self.user
+        )
+
+    def test_cross_product_uses_constant_queries(self):
+        # Patient ownership, doctor existence, existing pairs, one INSERT, the id read-back
+        # and one upsert of the stats counters
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('mapping_batch_create'), {
+                'patients': [patient.pk for patient in self.patients],
+                'doctors': [doctor.pk for doctor in self.doctors],
+                'status': 'ACTIVE',
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['created'], response.data['existing']), (5, 1))
+        self.assertEqual(PatientDoctorMapping.objects.filter(created_by=self.user).count(), 6)
+        self.assertTrue(all(result['id'] for result in response.data['results']))
+
+    def test_pair_outcomes(self):
+        pairs = [
+            {'patient': self.patients[1].pk, 'doctor': self.doctors[0].pk},
+            {'patient': self.patients[1].pk, 'doctor': self.doctors[0].pk},
+            {'patient': self.foreign_patient.pk, 'doctor': self.doctors[0].pk},
+            {'patient': self.patients[1].pk, 'doctor': 999999},
+        ]
+        response = self.client.post(reverse('mapping_batch_create'), {'pairs': pairs}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'duplicate', 'patient_not_found', 'doctor_not_found'],
+        )
+
+    def test_requires_one_input_mode(self):
+        response = self.client.post(reverse('mapping_batch_create'), {'patients': [1]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_oversized_batches_are_rejected(self):
+        limit = MappingBatchSerializer.MAX_PAIRS
+        for payload in (
+            {'patients': list(range(1, 101)), 'doctors': list(range(1, limit // 100 + 2))},
+            {'patients': [1] * (limit + 1), 'doctors': [1]},
+            {'pairs': [{'patient': 1, 'doctor': 1}] * (limit + 1)},
+        ):
+            serializer = MappingBatchSerializer(data=payload)
+            self.assertFalse(serializer.is_valid())
+            self.assertIn(f'{limit}', str(serializer.errors))
+
+
+class MappingRowSerializerTests(APITestCase):
+    def test_list_matches_model_serializer_output(self):
+        user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(user)
+        patient = create_patient(user, 1)
+        for index in range(3):
+            PatientDoctorMapping.objects.create(
+                patient=patient, doctor=create_doctor(user, index), created_by=user,
+                status='COMPLETED' if index else 'ACTIVE', notes='' if index else 'Follow up',
+            )
+
+        response = self.client.get(reverse('mapping_list_create'))
+        expected = PatientDoctorMappingSerializer(PatientDoctorMapping.objects.owned_by(user), many=True).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+    def test_list_projection(self):
+        user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(user)
+        mapping = PatientDoctorMapping.objects.create(
+            patient=create_patient(user, 1), doctor=create_doctor(user, 1), created_by=user
+        )
+        response = self.client.get(reverse('mapping_list_create'), {'fields': 'id,doctor_name,status'})
+        self.assertEqual(
+            response.data['results'], [{'id': mapping.pk, 'doctor_name': 'Dr. Doctor1 Johnson', 'status': 'ACTIVE'}]
+        )
@@ -1,9 +1,15 @@
 from django.urls import path
+from healthcare_backend.async_views import read_view
 from . import views
 
 urlpatterns = [
     path('', views.MappingListCreateView.as_view(), name='mapping_list_create'),
+    path('batch/', views.MappingBatchCreateView.as_view(), name='mapping_batch_create'),
     path('<int:pk>/', views.MappingDeleteView.as_view(), name='mapping_delete'),
     path('<int:pk>/update/', views.MappingUpdateView.as_view(), name='mapping_update'),
-    path('patient/<int:patient_id>/', views.patient_doctors_view, name='patient_doctors'),
+    path(
+        'patient/<int:patient_id>/',
+        read_view(views.patient_doctors_view, views.PatientDoctorsAsyncView.as_view()),
+        name='patient_doctors',
+    ),
 ]
@@ -2,19 +2,28 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from healthcare_backend.async_views import AsyncAPIView
+from healthcare_backend.pagination import CreatedAtKeysetPagination
+from healthcare_backend.rows import RowListMixin
 from .models import PatientDoctorMapping
 from patients.models import Patient
+from .batch import assign_pairs
 from .serializers import (
     PatientDoctorMappingSerializer, 
     PatientDoctorMappingCreateSerializer,
-    PatientMappingsSerializer
+    PatientMappingsSerializer,
+    MappingBatchSerializer,
+    mapping_rows
 )
 
 
-class MappingListCreateView(generics.ListCreateAPIView):
+class MappingListCreateView(RowListMixin, generics.ListCreateAPIView):
     """List all mappings or create a new patient-doctor mapping"""
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    row_serializer = mapping_rows
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -23,7 +32,7 @@ class MappingListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Return mappings created by the authenticated user"""
-        return PatientDoctorMapping.objects.filter(created_by=self.request.user)
+        return self.get_row_serializer().values(PatientDoctorMapping.objects.owned_by(self.request.user))
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={'request': request})
@@ -36,13 +45,35 @@ class MappingListCreateView(generics.ListCreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class MappingBatchCreateView(generics.GenericAPIView):
+    """Assign many patients to doctors in one request"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = MappingBatchSerializer
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        results = assign_pairs(request.user, data['pairs'], status=data['status'], notes=data['notes'])
+        statuses = [result['status'] for result in results]
+        return Response({
+            'message': f"Assigned {statuses.count('created')} patient-doctor pairs",
+            'created': statuses.count('created'),
+            'existing': statuses.count('exists'),
+            'failed': len(results) - statuses.count('created') - statuses.count('exists'),
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+
 class MappingDeleteView(generics.DestroyAPIView):
     """Remove a doctor from a patient"""
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         """Return mappings created by the authenticated user"""
-        return PatientDoctorMapping.objects.filter(created_by=self.request.user)
+        return PatientDoctorMapping.objects.owned_by(self.request.user).for_serializer()
     
     def get_object(self):
         """Get mapping by ID, ensuring it belongs to the authenticated user"""
@@ -66,7 +97,7 @@ def patient_doctors_view(request, patient_id):
     """Get all doctors assigned to a specific patient"""
     # Ensure the patient belongs to the current user
     patient = get_object_or_404(
-        Patient.objects.filter(created_by=request.user), 
+        Patient.objects.owned_by(request.user).only('id', 'first_name', 'last_name', 'email'),
         pk=patient_id
     )
     
@@ -74,7 +105,7 @@ def patient_doctors_view(request, patient_id):
     mappings = PatientDoctorMapping.objects.filter(
         patient=patient,
         created_by=request.user
-    )
+    ).for_patient()
     
     serializer = PatientMappingsSerializer(mappings, many=True)
     return Response({
@@ -87,6 +118,34 @@ def patient_doctors_view(request, patient_id):
     }, status=status.HTTP_200_OK)
 
 
+class PatientDoctorsAsyncView(AsyncAPIView):
+    """``patient_doctors_view`` through the async ORM"""
+    permission_classes = [IsAuthenticated]
+    
+    async def get(self, request, patient_id):
+        try:
+            patient = await Patient.objects.owned_by(request.user).only(
+                'id', 'first_name', 'last_name', 'email'
+            ).aget(pk=patient_id)
+        except Patient.DoesNotExist:
+            raise Http404
+        
+        mappings = PatientDoctorMapping.objects.filter(
+            patient=patient,
+            created_by=request.user
+        ).for_patient()
+        
+        serializer = PatientMappingsSerializer([mapping async for mapping in mappings], many=True)
+        return Response({
+            'patient': {
+                'id': patient.id,
+                'name': patient.full_name,
+                'email': patient.email
+            },
+            'doctors': serializer.data
+        }, status=status.HTTP_200_OK)
+
+
 class MappingUpdateView(generics.UpdateAPIView):
     """Update mapping status or notes"""
     serializer_class = PatientDoctorMappingSerializer
@@ -94,7 +153,7 @@ class MappingUpdateView(generics.UpdateAPIView):
     
     def get_queryset(self):
         """Return mappings created by the authenticated user"""
-        return PatientDoctorMapping.objects.filter(created_by=self.request.user)
+        return PatientDoctorMapping.objects.owned_by(self.request.user).for_serializer()
     
     def get_object(self):
         """Get mapping by ID, ensuring it belongs to the authenticated user"""
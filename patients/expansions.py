@@ -0,0 +1,89 @@
+"""
+``?expand=doctors`` on the patient endpoints.
+
+Each patient comes with the doctors assigned to it (the entries of
+``GET /api/mappings/patient/<id>/``) under ``doctors``, so a chart needs
+one request instead of two. The detail endpoints prefetch the mappings,
+with their doctors joined, in one extra query. The list endpoints
+serialize ``.values()`` rows, so they read the mappings of the whole page
+in one query instead.
+"""
+from collections import defaultdict
+
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+from healthcare_backend.projection import READ_METHODS, parse_names
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import PatientMappingsSerializer, patient_mapping_rows
+
+EXPAND_PARAM = 'expand'
+EXPANSIONS = ('doctors',)
+
+
+def requested_expansions(request):
+    if request.method not in READ_METHODS:
+        return set()
+    names = parse_names(request.query_params, EXPAND_PARAM)
+    unknown = sorted(names.difference(EXPANSIONS))
+    if unknown:
+        raise ValidationError({EXPAND_PARAM: [
+            f"Unknown expansion(s): {', '.join(unknown)}. Choose from: {', '.join(EXPANSIONS)}."
+        ]})
+    return names
+
+
+def embed_doctors(rows, results, mapping_rows):
+    """Add ``doctors`` to each of ``results``, serialized from the matching ``rows``"""
+    by_patient = defaultdict(list)
+    for mapping, data in zip(mapping_rows, patient_mapping_rows.serialize(mapping_rows)):
+        by_patient[mapping['patient']].append(data)
+    for row, result in zip(rows, results):
+        result['doctors'] = by_patient.get(row['id'], [])
+    return results
+
+
+class PatientExpansionMixin:
+    """
+    ``?expand=doctors`` for the patient views: detail views get their
+    queryset through ``expand_instances()``, row list views through
+    ``serialize_rows()``/``aserialize_rows()``.
+    """
+
+    def get_expansions(self):
+        if not hasattr(self, '_expansions'):
+            self._expansions = requested_expansions(self.request)
+        return self._expansions
+
+    def doctor_mappings(self):
+        return PatientDoctorMapping.objects.filter(created_by=self.request.user)
+
+    def expand_instances(self, queryset):
+        if 'doctors' not in self.get_expansions():
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch('doctor_mappings', queryset=self.doctor_mappings().for_patient(), to_attr='expanded_mappings')
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if 'doctors' in self.get_expansions():
+            serializer.fields['doctors'] = PatientMappingsSerializer(
+                source='expanded_mappings', many=True, read_only=True
+            )
+        return serializer
+
+    def page_mappings(self, rows):
+        return patient_mapping_rows.values(self.doctor_mappings().filter(patient_id__in=[row['id'] for row in rows]))
+
+    def serialize_rows(self, rows):
+        results = super().serialize_rows(rows)
+        if 'doctors' not in self.get_expansions() or not rows:
+            return results
+        return embed_doctors(rows, results, list(self.page_mappings(rows)))
+
+    async def aserialize_rows(self, rows):
+        results = await super().aserialize_rows(rows)
+        if 'doctors' not in self.get_expansions() or not rows:
+            return results
+        return embed_doctors(rows, results, [mapping async for mapping in self.page_mappings(rows)])
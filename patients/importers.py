@@ -0,0 +1,176 @@
+import codecs
+import csv
+import json
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from healthcare_backend.batching import chunked
+from stats import counters
+from .models import Patient
+from .serializers import PatientImportSerializer
+
+FORMATS = ('csv', 'ndjson')
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ImportStreamError(ValueError):
+    """The upload cannot be read from ``line`` on; rows before it are still imported"""
+
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+
+def iter_lines(stream):
+    """Decode a binary stream line by line (a file, an upload or the request itself)"""
+    return codecs.iterdecode(iter(stream.readline, b''), 'utf-8-sig')
+
+
+def iter_csv_rows(lines):
+    reader = csv.DictReader(lines)
+    try:
+        for row in reader:
+            # Blank cells become missing keys so optional fields fall back to their defaults
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ('', None)}
+    except UnicodeDecodeError:
+        # Raised while reading the next line, before the reader counts it
+        raise ImportStreamError(reader.reader.line_num + 1, 'The upload must be UTF-8 encoded')
+    except csv.Error as exc:
+        # DictReader only copies the count after a row is read; the csv reader has counted this line
+        raise ImportStreamError(reader.reader.line_num, f'Malformed CSV: {exc}')
+
+
+def iter_ndjson_rows(lines):
+    line_number = 0
+    try:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            yield line_number, row if isinstance(row, dict) else None
+    except UnicodeDecodeError:
+        raise ImportStreamError(line_number + 1, 'The upload must be UTF-8 encoded')
+
+
+def iter_rows(stream, file_format):
+    if file_format not in FORMATS:
+        raise ImportFormatError(f"Unsupported format '{file_format}'. Use one of: {', '.join(FORMATS)}.")
+    lines = iter_lines(stream)
+    return iter_csv_rows(lines) if file_format == 'csv' else iter_ndjson_rows(lines)
+
+
+class PatientImporter:
+    """
+    Validate and insert patient rows for ``user`` in fixed-size batches.
+
+    Each batch is validated row by row with one ``PatientImportSerializer``
+    instance (building serializer fields per row would dominate the cost),
+    checked for duplicate emails with a single ``email__in`` query and
+    inserted with one ``bulk_create`` inside its own transaction, so a
+    failed import keeps the batches that already committed. If the batch
+    hits the email constraint anyway (a concurrent writer), its rows are
+    inserted one savepoint at a time and the conflicting ones reported.
+    Rows are numbered by their line in the upload.
+    """
+
+    def __init__(self, user, batch_size=BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.serializer = PatientImportSerializer()
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.stopped = None
+
+    def run(self, rows):
+        for batch in chunked(self.read(rows), self.batch_size):
+            self.import_batch(batch)
+        return self.summary()
+
+    def read(self, rows):
+        """``rows`` up to a line that cannot be read, which ends the import after the rows before it"""
+        try:
+            yield from rows
+        except ImportStreamError as exc:
+            self.stopped = {'line': exc.line, 'error': str(exc)}
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'stopped': self.stopped,
+        }
+
+    def reject(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def import_batch(self, batch):
+        valid = []
+        for row_number, data in batch:
+            if data is None:
+                self.reject(row_number, {'non_field_errors': ['Row is not a JSON object.']})
+                continue
+            try:
+                valid.append((row_number, self.serializer.run_validation(data)))
+            except ValidationError as exc:
+                self.reject(row_number, as_serializer_error(exc))
+
+        try:
+            with transaction.atomic():
+                patients, duplicates = self.insert(valid)
+        except IntegrityError:
+            # A concurrent writer took one of the emails; re-check row by row
+            self.insert_each(valid)
+            return
+        for row_number in duplicates:
+            self.reject(row_number, {'email': ['A patient with this email already exists.']})
+        self.created += len(patients)
+
+    def insert_each(self, valid):
+        """Insert rows one savepoint at a time, rejecting the ones the database still refuses"""
+        for item in valid:
+            try:
+                with transaction.atomic():
+                    patients, duplicates = self.insert([item])
+            except IntegrityError:
+                duplicates, patients = [item[0]], []
+            for row_number in duplicates:
+                self.reject(row_number, {'email': ['A patient with this email already exists.']})
+            self.created += len(patients)
+
+    def insert(self, valid):
+        patients, duplicates = self.deduplicate(valid)
+        Patient.objects.bulk_create(patients, batch_size=self.batch_size)
+        # bulk_create bypasses the model signals that keep the stats counters
+        counters.apply(self.user.id, counters.tally(counters.patient_keys() * len(patients)))
+        return patients, duplicates
+
+    def deduplicate(self, valid):
+        """Split rows into new patients and the row numbers whose email is already taken"""
+        emails = {data['email'] for _, data in valid}
+        taken = set(Patient.objects.filter(email__in=emails).values_list('email', flat=True))
+        patients, duplicates = [], []
+        for row_number, data in valid:
+            if data['email'] in taken:
+                duplicates.append(row_number)
+                continue
+            taken.add(data['email'])
+            patient = Patient(created_by=self.user, **data)
+            patient.normalize_search_fields()
+            patients.append(patient)
+        return patients, duplicates
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='patient',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='patient_owner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:38
+
+from django.db import migrations, models
+
+from patients.models import normalize_name, normalize_phone
+
+
+SEARCH_FIELDS = ['search_first_name', 'search_last_name', 'search_email', 'search_phone']
+
+
+def backfill_search_columns(apps, schema_editor):
+    Patient = apps.get_model('patients', 'Patient')
+    batch = []
+    for patient in Patient.objects.only('first_name', 'last_name', 'email', 'phone_number').iterator(chunk_size=2000):
+        patient.search_first_name = normalize_name(patient.first_name)
+        patient.search_last_name = normalize_name(patient.last_name)
+        patient.search_email = patient.email.strip().lower()
+        patient.search_phone = normalize_phone(patient.phone_number)
+        batch.append(patient)
+        if len(batch) >= 2000:
+            Patient.objects.bulk_update(batch, SEARCH_FIELDS)
+            batch = []
+    if batch:
+        Patient.objects.bulk_update(batch, SEARCH_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_patient_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='search_email',
+            field=models.CharField(default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='search_first_name',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='search_last_name',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='search_phone',
+            field=models.CharField(default='', editable=False, max_length=15),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'search_last_name', 'search_first_name'], name='patient_search_last_idx', opclasses=['int8_ops', 'varchar_pattern_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'search_first_name'], name='patient_search_first_idx', opclasses=['int8_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'search_email'], name='patient_search_email_idx', opclasses=['int8_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'search_phone'], name='patient_search_phone_idx', opclasses=['int8_ops', 'varchar_pattern_ops']),
+        ),
+    ]
@@ -1,7 +1,36 @@
+import re
+import unicodedata
+
 from django.db import models
 from django.contrib.auth.models import User
 
 
+def normalize_name(value):
+    """Lowercase ASCII letters and digits only, e.g. 'O'Brien-Núñez' -> 'obriennunez'"""
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]', '', value.lower())
+
+
+def normalize_phone(value):
+    return re.sub(r'\D', '', value or '')
+
+
+class PatientQuerySet(models.QuerySet):
+    def owned_by(self, user):
+        """Patients created by ``user``"""
+        return self.filter(created_by=user)
+
+    def for_serializer(self):
+        """Columns read by ``PatientSerializer``, with the creator joined for ``created_by_username``"""
+        return self.select_related('created_by').only(
+            *(
+                field.name for field in self.model._meta.concrete_fields
+                if field.name not in self.model.SEARCH_FIELDS
+            ),
+            'created_by__username',
+        )
+
+
 class Patient(models.Model):
     GENDER_CHOICES = [
         ('M', 'Male'),
@@ -31,12 +60,48 @@ class Patient(models.Model):
     allergies = models.TextField(blank=True)
     medical_history = models.TextField(blank=True)
     
+    # Normalized lookup columns for patients.search, kept in sync by save()
+    search_first_name = models.CharField(max_length=100, editable=False, default='')
+    search_last_name = models.CharField(max_length=100, editable=False, default='')
+    search_email = models.CharField(max_length=254, editable=False, default='')
+    search_phone = models.CharField(max_length=15, editable=False, default='')
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    SEARCH_FIELDS = ('search_first_name', 'search_last_name', 'search_email', 'search_phone')
+
+    objects = PatientQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Owner-scoped list ordering, also the seek key for keyset pagination
+            models.Index(fields=['created_by', '-created_at', '-id'], name='patient_owner_created_idx'),
+            # Owner-scoped prefix lookups for patients.search; the pattern opclass lets
+            # PostgreSQL serve LIKE 'abc%' from the index and is ignored elsewhere
+            models.Index(
+                fields=['created_by', 'search_last_name', 'search_first_name'],
+                opclasses=['int8_ops', 'varchar_pattern_ops', 'varchar_pattern_ops'],
+                name='patient_search_last_idx',
+            ),
+            models.Index(
+                fields=['created_by', 'search_first_name'],
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+                name='patient_search_first_idx',
+            ),
+            models.Index(
+                fields=['created_by', 'search_email'],
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+                name='patient_search_email_idx',
+            ),
+            models.Index(
+                fields=['created_by', 'search_phone'],
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+                name='patient_search_phone_idx',
+            ),
+        ]
         
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -44,3 +109,17 @@ class Patient(models.Model):
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
+
+    def normalize_search_fields(self):
+        """Refresh the indexed lookup columns used by patients.search"""
+        self.search_first_name = normalize_name(self.first_name)
+        self.search_last_name = normalize_name(self.last_name)
+        self.search_email = (self.email or '').strip().lower()
+        self.search_phone = normalize_phone(self.phone_number)
+
+    def save(self, *args, **kwargs):
+        self.normalize_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.SEARCH_FIELDS}
+        super().save(*args, **kwargs)
@@ -0,0 +1,130 @@
+from difflib import SequenceMatcher
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from .models import normalize_name, normalize_phone
+
+MAX_LIMIT = 50
+DEFAULT_LIMIT = 20
+# Fuzzy matching ranks at most this many candidates that share a short prefix
+FUZZY_PREFIX_LENGTH = 2
+FUZZY_CANDIDATES = 200
+FUZZY_THRESHOLD = 0.7
+
+
+def prefix_filter(field, prefix):
+    """
+    Index-friendly ``field LIKE 'prefix%'``.
+
+    PostgreSQL serves ``startswith`` from the ``varchar_pattern_ops`` indexes;
+    SQLite cannot use an index for Django's ``LIKE ... ESCAPE`` so the prefix
+    becomes a ``>= prefix AND < next-prefix`` range instead. The search
+    columns only hold normalized values, so both forms are equivalent.
+    """
+    if connection.vendor == 'postgresql':
+        return Q(**{f'{field}__startswith': prefix})
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+class PatientSearch:
+    """
+    Prefix and fuzzy lookup of a user's patients by name, email or phone.
+
+    The query is classified by shape: anything with ``@`` is an email prefix,
+    mostly-digit input is a phone prefix, and the rest is one or two name
+    prefixes (``"jan smi"`` matches Jane Smith). With ``fuzzy`` enabled, name
+    queries without prefix matches fall back to ranking a bounded set of
+    candidates by similarity, so typos like ``"smyth"`` still find Smith.
+    """
+
+    def __init__(self, query_params):
+        self.query = (query_params.get('q') or '').strip()
+        self.fuzzy = query_params.get('fuzzy', '').lower() in ('1', 'true', 'yes')
+        errors = {}
+        if not self.query:
+            errors['q'] = ['This parameter is required.']
+        try:
+            self.limit = int(query_params.get('limit', DEFAULT_LIMIT))
+            if not 1 <= self.limit <= MAX_LIMIT:
+                raise ValueError
+        except ValueError:
+            errors['limit'] = [f'Must be an integer between 1 and {MAX_LIMIT}.']
+        if errors:
+            raise ValidationError(errors)
+
+    def results(self, queryset):
+        if '@' in self.query:
+            return list(self.prefix(queryset, 'search_email', self.query.lower()))
+
+        digits = normalize_phone(self.query)
+        if len(digits) >= 3 and len(digits) * 2 >= len(self.query.replace(' ', '')):
+            return list(self.prefix(queryset, 'search_phone', digits))
+
+        tokens = [normalize_name(token) for token in self.query.split()]
+        tokens = [token for token in tokens if token][:2]
+        if not tokens:
+            return []
+        patients = self.name_prefix(queryset, tokens)
+        if not patients and self.fuzzy:
+            patients = self.fuzzy_match(queryset, tokens)
+        return patients
+
+    def prefix(self, queryset, field, value):
+        return queryset.filter(prefix_filter(field, value)).order_by(field, 'id')[:self.limit]
+
+    def name_prefix(self, queryset, tokens):
+        if len(tokens) == 1:
+            branches = [
+                (prefix_filter('search_last_name', tokens[0]), 'search_last_name'),
+                (prefix_filter('search_first_name', tokens[0]), 'search_first_name'),
+            ]
+        else:
+            first, second = tokens
+            branches = [
+                (prefix_filter('search_first_name', first) & prefix_filter('search_last_name', second),
+                 'search_first_name'),
+                (prefix_filter('search_last_name', first) & prefix_filter('search_first_name', second),
+                 'search_last_name'),
+            ]
+        patients = self.union(queryset, branches, self.limit)
+        patients.sort(key=lambda patient: (patient.search_last_name, patient.search_first_name, patient.pk))
+        return patients[:self.limit]
+
+    def fuzzy_match(self, queryset, tokens):
+        branches = []
+        for token in tokens:
+            stem = token[:FUZZY_PREFIX_LENGTH]
+            branches += [
+                (prefix_filter('search_last_name', stem), 'search_last_name'),
+                (prefix_filter('search_first_name', stem), 'search_first_name'),
+            ]
+
+        scored = []
+        for patient in self.union(queryset, branches, FUZZY_CANDIDATES):
+            names = (patient.search_first_name, patient.search_last_name)
+            score = sum(
+                max(SequenceMatcher(None, token, name).ratio() for name in names) for token in tokens
+            ) / len(tokens)
+            if score >= FUZZY_THRESHOLD:
+                scored.append((-score, patient.search_last_name, patient.pk, patient))
+        scored.sort(key=lambda item: item[:3])
+        return [patient for *_, patient in scored[:self.limit]]
+
+    @staticmethod
+    def union(queryset, branches, limit):
+        """
+        Run each ``(condition, indexed_field)`` branch as its own bounded
+        query, in index order, and merge the results.
+
+        A single ``OR`` across differently indexed columns makes the planner
+        fall back to scanning every patient the user owns; one range scan per
+        branch keeps the cost proportional to ``limit``.
+        """
+        seen = {}
+        for condition, field in branches:
+            for patient in queryset.filter(condition).order_by(field, 'id')[:limit]:
+                seen.setdefault(patient.pk, patient)
+        return list(seen.values())
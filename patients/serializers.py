@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from healthcare_backend.rows import RowSerializer
 from .models import Patient
 
 
@@ -29,6 +30,12 @@ class PatientSerializer(serializers.ModelSerializer):
         return value
 
 
+# Compiled PatientSerializer for the list endpoint; full_name mirrors Patient.full_name
+patient_rows = RowSerializer(PatientSerializer, computed={
+    'full_name': (('first_name', 'last_name'), lambda row: f"{row['first_name']} {row['last_name']}"),
+})
+
+
 class PatientCreateSerializer(PatientSerializer):
     class Meta(PatientSerializer.Meta):
         fields = [
@@ -36,3 +43,28 @@ class PatientCreateSerializer(PatientSerializer):
             'date_of_birth', 'gender', 'address', 'city', 'state', 'zip_code',
             'blood_type', 'allergies', 'medical_history'
         ]
+
+
+class PatientImportSerializer(PatientCreateSerializer):
+    """
+    Row validation for bulk imports.
+
+    Email uniqueness is checked once per batch by ``patients.importers``
+    instead of per row, so the model's unique validator and
+    ``validate_email`` are disabled here.
+    """
+    class Meta(PatientCreateSerializer.Meta):
+        extra_kwargs = {'email': {'validators': []}}
+
+    def validate_email(self, value):
+        return value
+
+
+class PatientSummarySerializer(serializers.ModelSerializer):
+    """Compact patient representation for search results and pickers"""
+    full_name = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Patient
+        fields = ['id', 'first_name', 'last_name', 'full_name', 'email', 'phone_number', 'date_of_birth']
+        read_only_fields = fields
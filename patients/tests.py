@@ -1,3 +1,304 @@
-from django.test import TestCase
+import csv
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from doctors.tests import create_doctor
+from mappings.models import PatientDoctorMapping
+from .models import Patient
+from .serializers import PatientSerializer
+
+
+def create_patient(user, index, **extra):
+    fields = {
+        'created_by': user,
+        'first_name': f'Patient{index}',
+        'last_name': 'Smith',
+        'email': f'patient{index}@example.com',
+        'phone_number': f'+1555000{index:04d}',
+        'date_of_birth': date(1990, 1, 15),
+        'gender': 'F',
+        'address': '123 Main St',
+        'city': 'New York',
+        'state': 'NY',
+        'zip_code': '10001',
+    }
+    fields.update(extra)
+    return Patient.objects.create(**fields)
+
+
+class PatientQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        for index in range(25):
+            create_patient(self.user, index)
+
+    def test_list_query_count_is_constant(self):
+        # COUNT(*) for the paginator plus one SELECT joining the creator
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('patient_list_create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['created_by_username'], 'clinician')
+
+    def test_detail_query_count(self):
+        patient = Patient.objects.first()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('patient_detail', args=[patient.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class PatientKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        for index in range(45):
+            create_patient(self.user, index)
+
+    def test_cursor_walk_visits_every_row_once(self):
+        seen = []
+        response = self.client.get(reverse('patient_list_create'), {'pagination': 'cursor'})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        while True:
+            seen.extend(row['id'] for row in response.data['results'])
+            if response.data['next'] is None:
+                break
+            last = response
+            response = self.client.get(response.data['next'])
+
+        expected = list(Patient.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual(previous.data['results'], last.data['results'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('patient_list_create'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PatientSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        create_patient(self.user, 1, first_name='Jane', last_name='Smith', phone_number='+1 (555) 010-2030')
+        create_patient(self.user, 2, first_name='John', last_name="O'Brien", email='JOHN.OB@Example.com')
+        create_patient(self.user, 3, first_name='Smita', last_name='Patel')
+        other = User.objects.create_user(username='other', password='pass12345')
+        create_patient(other, 4, first_name='Jane', last_name='Smithers')
+
+    def search(self, **params):
+        response = self.client.get(reverse('patient_search'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['full_name'] for row in response.data['results']]
+
+    def test_name_prefix(self):
+        self.assertEqual(self.search(q='smi'), ['Smita Patel', 'Jane Smith'])
+        self.assertEqual(self.search(q='jan smi'), ['Jane Smith'])
+        self.assertEqual(self.search(q='obrien'), ["John O'Brien"])
+
+    def test_email_and_phone_prefix(self):
+        self.assertEqual(self.search(q='john.ob@'), ["John O'Brien"])
+        self.assertEqual(self.search(q='1555 010'), ['Jane Smith'])
+
+    def test_fuzzy_match(self):
+        self.assertEqual(self.search(q='smyth'), [])
+        self.assertEqual(self.search(q='smyth', fuzzy='true'), ['Jane Smith'])
+
+    def test_search_columns_follow_updates(self):
+        patient = Patient.objects.get(first_name='Smita')
+        response = self.client.patch(reverse('patient_detail', args=[patient.pk]), {'last_name': 'Kumar'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search(q='kum'), ['Smita Kumar'])
+
+    def test_query_is_required(self):
+        response = self.client.get(reverse('patient_search'))
+        self.assertEqual(response.status_code, 400)
+
+
+class PatientImportTests(APITestCase):
+    CSV = (
+        'first_name,last_name,email,phone_number,date_of_birth,gender,address,city,state,zip_code,blood_type\n'
+        'Ann,Lee,ann@example.com,555-0100,1980-02-03,F,1 Elm St,Austin,TX,73301,\n'
+        'Bo,Chan,bo@example.com,555-0101,not-a-date,M,2 Elm St,Austin,TX,73301,A+\n'
+        'Cy,Dunn,ann@example.com,555-0102,1975-05-06,M,3 Elm St,Austin,TX,73301,\n'
+        'Di,Eze,existing@example.com,555-0103,1990-07-08,F,4 Elm St,Austin,TX,73301,B-\n'
+    )
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        create_patient(self.user, 0, email='existing@example.com')
+
+    def test_csv_body_reports_per_row_errors(self):
+        response = self.client.generic('POST', reverse('patient_import'), self.CSV, content_type='text/csv')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 3)
+        self.assertEqual(
+            sorted((error['row'], *error['errors']) for error in response.data['errors']),
+            [(3, 'date_of_birth'), (4, 'email'), (5, 'email')],
+        )
+        patient = Patient.objects.get(email='ann@example.com')
+        self.assertEqual((patient.created_by, patient.search_last_name), (self.user, 'lee'))
+
+    def test_ndjson_upload(self):
+        lines = [
+            '{"first_name": "Ed", "last_name": "Fox", "email": "ed@example.com", "phone_number": "1",'
+            ' "date_of_birth": "2001-01-01", "gender": "M", "address": "x", "city": "y", "state": "z",'
+            ' "zip_code": "1"}',
+            '',
+            '[1, 2]',
+        ]
+        upload = SimpleUploadedFile('patients.ndjson', '\n'.join(lines).encode())
+        response = self.client.post(reverse('patient_import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 3)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.generic('POST', reverse('patient_import'), 'a,b\n', content_type='text/plain')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unreadable_line_stops_import_after_committed_rows(self):
+        body = self.CSV.encode() + b'Ed,Fox,ed@example.com,555-0104,1991-01-01,M,\xff St,Austin,TX,73301,\n'
+        response = self.client.generic('POST', reverse('patient_import'), body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 3))
+        self.assertEqual(response.data['stopped'], {'line': 6, 'error': 'The upload must be UTF-8 encoded'})
+        self.assertIn('stopped at line 6', response.data['error'])
+        self.assertTrue(Patient.objects.filter(email='ann@example.com').exists())
+
+    def test_malformed_csv_stops_import(self):
+        limit = csv.field_size_limit(200)
+        self.addCleanup(csv.field_size_limit, limit)
+        body = self.CSV + f'Ed,Fox,ed@example.com,555-0104,1991-01-01,M,{"x" * 300},Austin,TX,73301,\n'
+        response = self.client.generic('POST', reverse('patient_import'), body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['stopped']['line'], 6)
+        self.assertIn('Malformed CSV', response.data['stopped']['error'])
+
+    def test_conflicts_at_insert_are_reported_per_row(self):
+        bulk_create = Patient.objects.bulk_create
+
+        def racing_bulk_create(patients, **kwargs):
+            # As if another request inserted ann@example.com after the duplicate check
+            if any(patient.email == 'ann@example.com' for patient in patients):
+                raise IntegrityError('UNIQUE constraint failed: patients_patient.email')
+            return bulk_create(patients, **kwargs)
+
+        body = self.CSV + 'Ed,Fox,ed@example.com,555-0104,1991-01-01,M,5 Elm St,Austin,TX,73301,\n'
+        with mock.patch.object(Patient.objects, 'bulk_create', side_effect=racing_bulk_create):
+            response = self.client.generic('POST', reverse('patient_import'), body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 4))
+        self.assertIn({'row': 2, 'errors': {'email': ['A patient with this email already exists.']}},
+                      response.data['errors'])
+        self.assertTrue(Patient.objects.filter(email='ed@example.com').exists())
+        self.assertFalse(Patient.objects.filter(email='ann@example.com').exists())
+
+
+class PatientRowSerializerTests(APITestCase):
+    def test_list_matches_model_serializer_output(self):
+        user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(user)
+        create_patient(user, 1, blood_type='AB-', allergies='Penicillin')
+        create_patient(user, 2, first_name='Zoë', medical_history='Asthma\nSeasonal')
+        create_patient(user, 3)
+
+        response = self.client.get(reverse('patient_list_create'))
+        expected = PatientSerializer(Patient.objects.owned_by(user), many=True).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+
+class PatientProjectionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patients = [create_patient(self.user, index, medical_history='Long history') for index in range(3)]
+
+    def test_list_fields_trim_results_and_columns(self):
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get(reverse('patient_list_create'), {'fields': 'id,full_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0], {'id': self.patients[2].pk, 'full_name': 'Patient2 Smith'})
+        self.assertNotIn('medical_history', queries.captured_queries[1]['sql'])
+
+        # The keyset cursor still has the columns it is built from
+        response = self.client.get(reverse('patient_list_create'), {'fields': 'full_name', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results'][0]), ['full_name'])
+
+    def test_detail_exclude_defers_columns(self):
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(
+                reverse('patient_detail', args=[self.patients[0].pk]),
+                {'exclude': 'address,allergies,medical_history,created_by_username'},
+            )
+        self.assertEqual(response.status_code, 200)
+        expected = PatientSerializer(self.patients[0]).data
+        for name in ('address', 'allergies', 'medical_history', 'created_by_username'):
+            expected.pop(name)
+        self.assertEqual(response.data, expected)
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('medical_history', sql)
+        self.assertNotIn('auth_user', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('patient_list_create'), {'fields': 'id,ssn'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ssn', response.data['fields'][0])
+        response = self.client.get(reverse('patient_detail', args=[self.patients[0].pk]), {'exclude': 'id'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('id', response.data)
+
+
+class PatientExpandTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patients = [create_patient(self.user, index) for index in range(4)]
+        for index in range(3):
+            doctor = create_doctor(self.user, index)
+            for patient in self.patients[:index + 1]:
+                PatientDoctorMapping.objects.create(patient=patient, doctor=doctor, created_by=self.user)
+
+    def test_detail_embeds_the_patients_doctors(self):
+        patient = self.patients[0]
+        # The patient, then its mappings with the doctors joined
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('patient_detail', args=[patient.pk]), {'expand': 'doctors'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], patient.email)
+        charted = self.client.get(reverse('patient_doctors', args=[patient.pk]))
+        self.assertEqual(response.data['doctors'], charted.data['doctors'])
+        self.assertEqual(len(response.data['doctors']), 3)
+
+    def test_list_embeds_doctors_per_page(self):
+        # COUNT(*), the page, and the mappings of every patient on it
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('patient_list_create'), {'expand': 'doctors', 'fields': 'email'})
+        self.assertEqual(response.status_code, 200)
+        for result in response.data['results']:
+            patient = Patient.objects.get(email=result['email'])
+            charted = self.client.get(reverse('patient_doctors', args=[patient.pk]))
+            self.assertEqual(
+                JSONRenderer().render(result['doctors']), JSONRenderer().render(charted.data['doctors'])
+            )
+        self.assertEqual(
+            [len(result['doctors']) for result in response.data['results']], [0, 1, 2, 3]
+        )
+
+    def test_unknown_expansion_is_rejected(self):
+        response = self.client.get(reverse('patient_list_create'), {'expand': 'nurses'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nurses', response.data['expand'][0])
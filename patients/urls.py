@@ -1,8 +1,19 @@
 from django.urls import path
+from healthcare_backend.async_views import read_view
 from . import views
 
 # API-only URLs for patients
 urlpatterns = [
-    path('', views.PatientListCreateView.as_view(), name='patient_list_create'),
-    path('<int:pk>/', views.PatientRetrieveUpdateDestroyView.as_view(), name='patient_detail'),
+    path(
+        '',
+        read_view(views.PatientListCreateView.as_view(), views.PatientListAsyncView.as_view()),
+        name='patient_list_create',
+    ),
+    path('import/', views.PatientImportView.as_view(), name='patient_import'),
+    path('search/', views.PatientSearchView.as_view(), name='patient_search'),
+    path(
+        '<int:pk>/',
+        read_view(views.PatientRetrieveUpdateDestroyView.as_view(), views.PatientRetrieveAsyncView.as_view()),
+        name='patient_detail',
+    ),
 ]
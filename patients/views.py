@@ -1,13 +1,23 @@
 from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from healthcare_backend.async_views import AsyncGenericAPIView, AsyncRetrieveAPIView
+from healthcare_backend.pagination import CreatedAtKeysetPagination
+from healthcare_backend.projection import ProjectionMixin
+from healthcare_backend.rows import AsyncRowListMixin, RowListMixin
 from .models import Patient
-from .serializers import PatientSerializer, PatientCreateSerializer
+from .expansions import PatientExpansionMixin
+from .importers import ImportFormatError, PatientImporter, iter_rows
+from .search import PatientSearch
+from .serializers import PatientSerializer, PatientCreateSerializer, PatientSummarySerializer, patient_rows
 
 
-class PatientListCreateView(generics.ListCreateAPIView):
+class PatientListCreateView(PatientExpansionMixin, RowListMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    row_serializer = patient_rows
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -16,7 +26,7 @@ class PatientListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Return patients created by the authenticated user"""
-        return Patient.objects.filter(created_by=self.request.user)
+        return self.get_row_serializer().values(Patient.objects.owned_by(self.request.user))
     
     def perform_create(self, serializer):
         """Set the created_by field to the current user"""
@@ -33,14 +43,93 @@ class PatientListCreateView(generics.ListCreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PatientRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class PatientListAsyncView(PatientExpansionMixin, AsyncRowListMixin, AsyncGenericAPIView):
+    """``GET`` of ``PatientListCreateView`` through the async ORM"""
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    row_serializer = patient_rows
+    
+    def get_queryset(self):
+        """Return patients created by the authenticated user"""
+        return self.get_row_serializer().values(Patient.objects.owned_by(self.request.user))
+
+
+class PatientImportView(generics.GenericAPIView):
+    """
+    Bulk-create patients from a CSV or NDJSON upload.
+
+    Send the file as multipart ``file`` or as the raw request body with a
+    ``text/csv`` or ``application/x-ndjson`` content type. The upload is
+    read as a stream and imported in batches; the response summarizes the
+    rows created and the errors for the rows that were skipped. A line that
+    cannot be read at all (invalid UTF-8, malformed CSV) ends the import
+    with 400; the summary still counts the rows imported before it.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    
+    CONTENT_TYPES = {
+        'text/csv': 'csv',
+        'application/x-ndjson': 'ndjson',
+        'application/jsonl': 'ndjson',
+    }
+    
+    def post(self, request, *args, **kwargs):
+        upload = None
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({'error': 'Upload a file in the "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+            stream = upload.file
+        else:
+            stream = request.stream
+            if stream is None:
+                return Response({'error': 'The request body is empty'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            rows = iter_rows(stream, self.get_format(request, upload))
+            summary = PatientImporter(request.user).run(rows)
+        except ImportFormatError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        stopped = summary['stopped']
+        if stopped:
+            # The batches before the unreadable line are committed; say how far it got
+            return Response({
+                'error': f"Import stopped at line {stopped['line']}: {stopped['error']}. "
+                         f"{summary['created']} patients were imported before it.",
+                **summary
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f"Imported {summary['created']} patients",
+            **summary
+        }, status=status.HTTP_200_OK)
+    
+    def get_format(self, request, upload):
+        """Explicit ?file_format=, then the file extension, then the content type"""
+        file_format = request.query_params.get('file_format')
+        if file_format:
+            return file_format.lower()
+        if upload is not None:
+            extension = upload.name.rsplit('.', 1)[-1].lower()
+            if extension in ('csv', 'ndjson', 'jsonl'):
+                return 'csv' if extension == 'csv' else 'ndjson'
+            content_type = upload.content_type
+        else:
+            content_type = request.content_type
+        return self.CONTENT_TYPES.get(content_type.split(';')[0].strip(), '')
+
+
+class PatientRetrieveUpdateDestroyView(PatientExpansionMixin, ProjectionMixin, generics.RetrieveUpdateDestroyAPIView):
     
     permission_classes = [IsAuthenticated]
     serializer_class = PatientSerializer
+    row_serializer = patient_rows
     
     def get_queryset(self):
         """Return patients created by the authenticated user"""
-        return Patient.objects.filter(created_by=self.request.user)
+        return self.expand_instances(self.project_instances(Patient.objects.owned_by(self.request.user)))
     
     def get_object(self):
         """Get patient by ID, ensuring it belongs to the authenticated user"""
@@ -66,4 +155,37 @@ class PatientRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
         return Response({
             'message': 'Patient deleted successfully'
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+
+class PatientRetrieveAsyncView(PatientExpansionMixin, ProjectionMixin, AsyncRetrieveAPIView):
+    """``GET`` of ``PatientRetrieveUpdateDestroyView`` through the async ORM"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = PatientSerializer
+    row_serializer = patient_rows
+    
+    def get_queryset(self):
+        """Return patients created by the authenticated user"""
+        return self.expand_instances(self.project_instances(Patient.objects.owned_by(self.request.user)))
+
+
+class PatientSearchView(generics.GenericAPIView):
+    """Look up the user's patients by name, email or phone number prefix"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = PatientSummarySerializer
+    
+    def get_queryset(self):
+        """Return patients created by the authenticated user"""
+        return Patient.objects.owned_by(self.request.user).only(
+            'id', 'first_name', 'last_name', 'email', 'phone_number', 'date_of_birth',
+            'search_first_name', 'search_last_name',
+        )
+    
+    def get(self, request, *args, **kwargs):
+        search = PatientSearch(request.query_params)
+        patients = search.results(self.get_queryset())
+        serializer = self.get_serializer(patients, many=True)
+        return Response({
+            'count': len(serializer.data),
+            'results': serializer.data
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import StatCounter
+
+
+@admin.register(StatCounter)
+class StatCounterAdmin(admin.ModelAdmin):
+    list_display = ['user', 'metric', 'key', 'value']
+    list_filter = ['metric']
+    search_fields = ['user__username', 'key']
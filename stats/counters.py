@@ -0,0 +1,149 @@
+"""
+Per-user counters behind ``GET /api/stats/``.
+
+Every ``StatCounter`` row is one number for one user: their patients,
+their doctors per specialization and per city, their mappings per status
+and per doctor. Writes keep the rows current as they happen, through the
+model signals in ``stats.signals`` and through explicit ``apply`` calls
+from the bulk paths, which bypass signals. Reading the stats is then a
+single indexed query instead of ``GROUP BY`` scans of every table.
+
+``rebuild`` recomputes the counters from the tables (``rebuild_stats``),
+repairing any drift left by a crash between a write and its counter
+update or by concurrent updates of the same row.
+"""
+import collections
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F
+
+from .models import StatCounter
+
+
+def patient_keys():
+    return ((StatCounter.PATIENTS, ''),)
+
+
+def doctor_keys(specialization, city):
+    return (
+        (StatCounter.DOCTORS_BY_SPECIALIZATION, specialization),
+        (StatCounter.DOCTORS_BY_CITY, city),
+    )
+
+
+def mapping_keys(status, doctor_id):
+    return (
+        (StatCounter.MAPPINGS_BY_STATUS, status),
+        (StatCounter.PATIENTS_PER_DOCTOR, str(doctor_id)),
+    )
+
+
+def tally(keys, sign=1):
+    """Count ``(metric, key)`` pairs into ``{(metric, key): delta}``"""
+    changes = collections.Counter()
+    for key in keys:
+        changes[key] += sign
+    return changes
+
+
+def apply(user_id, changes):
+    """Add each ``{(metric, key): delta}`` of ``changes`` to ``user_id``'s counters"""
+    # Sorted so concurrent writers lock the rows in the same order
+    increments = sorted((metric, key, delta) for (metric, key), delta in changes.items() if delta > 0)
+    for (metric, key), delta in changes.items():
+        if delta < 0:
+            # Never inserts: a missing row means the counters already drifted (or the
+            # user is being deleted); rebuild() repairs it
+            StatCounter.objects.filter(user_id=user_id, metric=metric, key=key).update(value=F('value') + delta)
+    if not increments:
+        return
+    connection = connections[router.db_for_write(StatCounter)]
+    if connection.features.supports_update_conflicts_with_target:
+        _upsert(connection, user_id, increments)
+    else:
+        for metric, key, delta in increments:
+            _add(user_id, metric, key, delta)
+
+
+def _upsert(connection, user_id, increments):
+    # INSERT ... ON CONFLICT DO UPDATE adds to existing rows in one statement;
+    # bulk_create(update_conflicts=True) can only overwrite them
+    quote = connection.ops.quote_name
+    table = quote(StatCounter._meta.db_table)
+    value = quote('value')
+    sql = (
+        f"INSERT INTO {table} ({quote('user_id')}, {quote('metric')}, {quote('key')}, {value}) "
+        f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(increments))} "
+        f"ON CONFLICT ({quote('user_id')}, {quote('metric')}, {quote('key')}) "
+        f"DO UPDATE SET {value} = {table}.{value} + EXCLUDED.{value}"
+    )
+    params = [param for metric, key, delta in increments for param in (user_id, metric, key, delta)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _add(user_id, metric, key, delta):
+    counters = StatCounter.objects.filter(user_id=user_id, metric=metric, key=key)
+    if counters.update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(user_id=user_id, metric=metric, key=key, value=delta)
+    except IntegrityError:
+        # Created by a concurrent writer since the UPDATE
+        counters.update(value=F('value') + delta)
+
+
+def forget_doctor(doctor_id):
+    """Drop every user's ``patients_per_doctor`` counter for a deleted doctor"""
+    StatCounter.objects.filter(metric=StatCounter.PATIENTS_PER_DOCTOR, key=str(doctor_id)).delete()
+
+
+def count(user_ids=None):
+    """``{(user_id, metric, key): value}`` computed from the tables with GROUP BY"""
+    from doctors.models import Doctor
+    from mappings.models import PatientDoctorMapping
+    from patients.models import Patient
+
+    groups = (
+        (Patient, StatCounter.PATIENTS, None),
+        (Doctor, StatCounter.DOCTORS_BY_SPECIALIZATION, 'specialization'),
+        (Doctor, StatCounter.DOCTORS_BY_CITY, 'city'),
+        (PatientDoctorMapping, StatCounter.MAPPINGS_BY_STATUS, 'status'),
+        (PatientDoctorMapping, StatCounter.PATIENTS_PER_DOCTOR, 'doctor_id'),
+    )
+    totals = {}
+    for model, metric, field in groups:
+        queryset = model.objects.order_by()
+        if user_ids is not None:
+            queryset = queryset.filter(created_by_id__in=user_ids)
+        columns = ['created_by_id'] + ([field] if field else [])
+        for row in queryset.values(*columns).annotate(total=Count('id')):
+            key = str(row[field]) if field else ''
+            totals[row['created_by_id'], metric, key] = row['total']
+    return totals
+
+
+def rebuild(user_ids=None):
+    """
+    Replace the counters of ``user_ids`` (all users by default) with values
+    recomputed from the tables. Returns the number of counters that were wrong.
+    """
+    with transaction.atomic():
+        stored = StatCounter.objects.all()
+        if user_ids is not None:
+            stored = stored.filter(user_id__in=user_ids)
+        previous = {
+            (user_id, metric, key): value
+            for user_id, metric, key, value in stored.values_list('user_id', 'metric', 'key', 'value')
+        }
+        expected = count(user_ids)
+        stored.delete()
+        StatCounter.objects.bulk_create(
+            StatCounter(user_id=user_id, metric=metric, key=key, value=value)
+            for (user_id, metric, key), value in expected.items()
+        )
+    return sum(
+        1 for counter in previous.keys() | expected.keys()
+        if previous.get(counter, 0) != expected.get(counter, 0)
+    )
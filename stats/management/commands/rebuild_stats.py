@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from stats import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard counters behind /api/stats/ from the patient, doctor and mapping tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help='Only rebuild this username (repeatable)')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['user']:
+            users = dict(User.objects.filter(username__in=options['user']).values_list('username', 'id'))
+            missing = sorted(set(options['user']) - users.keys())
+            if missing:
+                raise CommandError(f'Unknown user: {", ".join(missing)}')
+            user_ids = list(users.values())
+
+        corrected = counters.rebuild(user_ids)
+        scope = 'all users' if user_ids is None else f'{len(user_ids)} user(s)'
+        message = f'Rebuilt stats counters for {scope}; {corrected} counter(s) were out of date'
+        self.stdout.write(self.style.WARNING(message) if corrected else self.style.SUCCESS(message))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('patients', 'Patients'), ('doctors_by_specialization', 'Doctors by specialization'), ('doctors_by_city', 'Doctors by city'), ('mappings_by_status', 'Mappings by status'), ('patients_per_doctor', 'Patients per doctor')], max_length=32)),
+                ('key', models.CharField(blank=True, max_length=100)),
+                ('value', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stat_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'metric', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Count
+
+# (app label, model, metric, grouped field); mirrors stats.counters.count()
+GROUPS = (
+    ('patients', 'Patient', 'patients', None),
+    ('doctors', 'Doctor', 'doctors_by_specialization', 'specialization'),
+    ('doctors', 'Doctor', 'doctors_by_city', 'city'),
+    ('mappings', 'PatientDoctorMapping', 'mappings_by_status', 'status'),
+    ('mappings', 'PatientDoctorMapping', 'patients_per_doctor', 'doctor_id'),
+)
+
+
+def seed_counters(apps, schema_editor):
+    StatCounter = apps.get_model('stats', 'StatCounter')
+    counters = []
+    for app_label, model_name, metric, field in GROUPS:
+        queryset = apps.get_model(app_label, model_name).objects.order_by()
+        columns = ['created_by_id'] + ([field] if field else [])
+        for row in queryset.values(*columns).annotate(total=Count('id')):
+            counters.append(StatCounter(
+                user_id=row['created_by_id'], metric=metric, key=str(row[field]) if field else '', value=row['total'],
+            ))
+    StatCounter.objects.bulk_create(counters, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0001_initial'),
+        ('patients', '0003_patient_search_columns'),
+        ('doctors', '0004_directory_search_indexes'),
+        ('mappings', '0003_owner_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class StatCounter(models.Model):
+    """One aggregate for one user, kept current by ``stats.counters``"""
+    PATIENTS = 'patients'
+    DOCTORS_BY_SPECIALIZATION = 'doctors_by_specialization'
+    DOCTORS_BY_CITY = 'doctors_by_city'
+    MAPPINGS_BY_STATUS = 'mappings_by_status'
+    PATIENTS_PER_DOCTOR = 'patients_per_doctor'
+    METRIC_CHOICES = [
+        (PATIENTS, 'Patients'),
+        (DOCTORS_BY_SPECIALIZATION, 'Doctors by specialization'),
+        (DOCTORS_BY_CITY, 'Doctors by city'),
+        (MAPPINGS_BY_STATUS, 'Mappings by status'),
+        (PATIENTS_PER_DOCTOR, 'Patients per doctor'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stat_counters')
+    metric = models.CharField(max_length=32, choices=METRIC_CHOICES)
+    # Specialization, city, status or doctor id; empty for plain totals
+    key = models.CharField(max_length=100, blank=True)
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'metric', 'key']
+
+    def __str__(self):
+        return f"{self.user_id} {self.metric}[{self.key}] = {self.value}"
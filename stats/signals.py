@@ -0,0 +1,79 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+from . import counters
+
+# Model -> (fields its counter keys are built from, key function)
+TRACKED = {
+    Patient: ((), counters.patient_keys),
+    Doctor: (('specialization', 'city'), counters.doctor_keys),
+    PatientDoctorMapping: (('status', 'doctor'), counters.mapping_keys),
+}
+
+
+def tracked_columns(model):
+    """Attribute names of the owner and the tracked fields, owner first"""
+    fields, _ = TRACKED[model]
+    return [model._meta.get_field(name).attname for name in ('created_by', *fields)]
+
+
+def snapshot(instance):
+    return tuple(getattr(instance, column) for column in tracked_columns(type(instance)))
+
+
+def move(model, previous, current):
+    """Count an instance out of its ``previous`` snapshot and into its ``current`` one"""
+    if previous == current:
+        return
+    _, keys = TRACKED[model]
+    if previous and current and previous[0] == current[0]:
+        changes = counters.tally(keys(*previous[1:]), -1)
+        changes.update(counters.tally(keys(*current[1:])))
+        counters.apply(current[0], changes)
+        return
+    if previous:
+        counters.apply(previous[0], counters.tally(keys(*previous[1:]), -1))
+    if current:
+        counters.apply(current[0], counters.tally(keys(*current[1:])))
+
+
+def remember_previous(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Read the stored values an update is about to replace"""
+    instance._stats_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    fields, _ = TRACKED[sender]
+    if update_fields is not None:
+        names = set()
+        for field in ('created_by', *fields):
+            names.update((field, sender._meta.get_field(field).attname))
+        if not names & set(update_fields):
+            return
+    instance._stats_previous = sender._base_manager.filter(pk=instance.pk).values_list(
+        *tracked_columns(sender)
+    ).first()
+
+
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        move(sender, None, snapshot(instance))
+        return
+    previous = instance.__dict__.pop('_stats_previous', None)
+    if previous is not None:
+        move(sender, previous, snapshot(instance))
+
+
+def count_deleted(sender, instance, **kwargs):
+    move(sender, snapshot(instance), None)
+    if sender is Doctor:
+        counters.forget_doctor(instance.pk)
+
+
+for model in TRACKED:
+    pre_save.connect(remember_previous, sender=model, dispatch_uid=f'stats_pre_save_{model._meta.label}')
+    post_save.connect(count_saved, sender=model, dispatch_uid=f'stats_post_save_{model._meta.label}')
+    post_delete.connect(count_deleted, sender=model, dispatch_uid=f'stats_post_delete_{model._meta.label}')
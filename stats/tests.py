@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from doctors.models import Doctor
+from doctors.tests import create_doctor
+from mappings.models import PatientDoctorMapping
+from patients.tests import create_patient
+from . import counters
+from .models import StatCounter
+
+
+class StatCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clinician', password='pass12345')
+        self.other = User.objects.create_user(username='other', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.patients = [create_patient(self.user, index) for index in range(3)]
+        self.doctors = [
+            create_doctor(self.user, 1),
+            create_doctor(self.user, 2, specialization='NEUROLOGY', city='Salem'),
+        ]
+        create_patient(self.other, 9)
+        create_doctor(self.other, 9)
+        for patient in self.patients:
+            PatientDoctorMapping.objects.create(patient=patient, doctor=self.doctors[0], created_by=self.user)
+        PatientDoctorMapping.objects.create(
+            patient=self.patients[0], doctor=self.doctors[1], created_by=self.user, status='COMPLETED'
+        )
+
+    def assertCountersMatchTables(self):
+        stored = {
+            (user_id, metric, key): value
+            for user_id, metric, key, value in StatCounter.objects.filter(value__gt=0).values_list(
+                'user_id', 'metric', 'key', 'value'
+            )
+        }
+        self.assertEqual(stored, counters.count())
+
+    def test_stats_served_from_counters(self):
+        # The counters, then the names of the doctors in patients_per_doctor
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['patients'], response.data['doctors'], response.data['mappings']), (3, 2, 4))
+        self.assertEqual(response.data['doctors_by_specialization'], {'CARDIOLOGY': 1, 'NEUROLOGY': 1})
+        self.assertEqual(response.data['doctors_by_city'], {'Boston': 1, 'Salem': 1})
+        self.assertEqual(response.data['mappings_by_status'], {'ACTIVE': 3, 'INACTIVE': 0, 'COMPLETED': 1})
+        self.assertEqual(
+            [(row['doctor'], row['patients']) for row in response.data['patients_per_doctor']],
+            [(self.doctors[0].pk, 3), (self.doctors[1].pk, 1)],
+        )
+        self.assertCountersMatchTables()
+
+    def test_updates_move_counts_between_keys(self):
+        mapping = PatientDoctorMapping.objects.get(doctor=self.doctors[1])
+        response = self.client.patch(reverse('mapping_update', args=[mapping.pk]), {'status': 'INACTIVE'})
+        self.assertEqual(response.status_code, 200, response.data)
+        response = self.client.patch(reverse('doctor_update', args=[self.doctors[0].pk]), {'city': 'Salem'})
+        self.assertEqual(response.status_code, 200, response.data)
+
+        response = self.client.get(reverse('stats'))
+        self.assertEqual(response.data['mappings_by_status'], {'ACTIVE': 3, 'INACTIVE': 1, 'COMPLETED': 0})
+        self.assertEqual(response.data['doctors_by_city'], {'Salem': 2})
+        self.assertCountersMatchTables()
+
+    def test_deletes_and_cascades(self):
+        response = self.client.delete(reverse('doctor_delete', args=[self.doctors[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.patients[0].delete()
+
+        response = self.client.get(reverse('stats'))
+        self.assertEqual((response.data['patients'], response.data['doctors'], response.data['mappings']), (2, 1, 0))
+        self.assertEqual(response.data['patients_per_doctor'], [])
+        self.assertFalse(StatCounter.objects.filter(key=str(self.doctors[0].pk)).exists())
+        self.assertCountersMatchTables()
+
+    def test_bulk_paths_update_counters(self):
+        csv = (
+            'first_name,last_name,email,phone_number,date_of_birth,gender,address,city,state,zip_code\n'
+            'Ann,Lee,ann@example.com,555-0100,1980-02-03,F,1 Elm St,Austin,TX,73301\n'
+        )
+        response = self.client.generic('POST', reverse('patient_import'), csv, content_type='text/csv')
+        self.assertEqual(response.data['created'], 1)
+
+        record = {
+            'first_name': 'Bulk', 'last_name': 'Doe', 'email': 'bulk@hospital.com', 'phone_number': '+1000',
+            'specialization': 'GENERAL', 'license_number': 'BULK1', 'years_of_experience': 5,
+            'qualification': 'MD', 'clinic_name': 'Clinic', 'clinic_address': '1 Road', 'city': 'Austin',
+            'state': 'TX', 'zip_code': '73301', 'consultation_fee': '99.50',
+        }
+        moved = dict(record, email=self.doctors[1].email, license_number=self.doctors[1].license_number)
+        response = self.client.post(reverse('doctor_bulk_upsert'), [record, moved], format='json')
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+
+        response = self.client.post(reverse('mapping_batch_create'), {
+            'patients': [patient.pk for patient in self.patients],
+            'doctors': [doctor.pk for doctor in self.doctors],
+            'status': 'INACTIVE',
+        }, format='json')
+        self.assertEqual(response.data['created'], 2)
+
+        response = self.client.get(reverse('stats'))
+        self.assertEqual(response.data['patients'], 4)
+        self.assertEqual(response.data['doctors_by_specialization'], {'GENERAL': 2, 'CARDIOLOGY': 1})
+        self.assertEqual(response.data['mappings_by_status'], {'ACTIVE': 3, 'INACTIVE': 2, 'COMPLETED': 1})
+        self.assertCountersMatchTables()
+
+    def test_rebuild_repairs_drift(self):
+        StatCounter.objects.filter(user=self.user, metric=StatCounter.PATIENTS).update(value=40)
+        StatCounter.objects.filter(user=self.user, metric=StatCounter.DOCTORS_BY_CITY, key='Salem').delete()
+        Doctor.objects.filter(pk=self.doctors[0].pk).update(city='Austin')  # bypasses the signals
+
+        out = StringIO()
+        call_command('rebuild_stats', '--user', 'clinician', stdout=out)
+        self.assertIn('4 counter(s) were out of date', out.getvalue())
+        self.assertCountersMatchTables()
+
+        out = StringIO()
+        call_command('rebuild_stats', stdout=out)
+        self.assertIn('0 counter(s) were out of date', out.getvalue())
@@ -0,0 +1,57 @@
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from .models import StatCounter
+
+
+class StatsView(generics.GenericAPIView):
+    """
+    Dashboard aggregates for the authenticated user's records, read from
+    the counters in ``stats.counters`` (one query, plus one for the names
+    of the doctors in ``patients_per_doctor``).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        metrics = {metric: {} for metric, _ in StatCounter.METRIC_CHOICES}
+        counters = StatCounter.objects.filter(user=request.user, value__gt=0).values_list('metric', 'key', 'value')
+        for metric, key, value in counters:
+            metrics[metric][key] = value
+
+        mappings_by_status = {choice: 0 for choice, _ in PatientDoctorMapping.STATUS_CHOICES}
+        mappings_by_status.update(metrics[StatCounter.MAPPINGS_BY_STATUS])
+        return Response({
+            'patients': metrics[StatCounter.PATIENTS].get('', 0),
+            'doctors': sum(metrics[StatCounter.DOCTORS_BY_SPECIALIZATION].values()),
+            'mappings': sum(mappings_by_status.values()),
+            'doctors_by_specialization': self.ranked(metrics[StatCounter.DOCTORS_BY_SPECIALIZATION]),
+            'doctors_by_city': self.ranked(metrics[StatCounter.DOCTORS_BY_CITY]),
+            'mappings_by_status': mappings_by_status,
+            'patients_per_doctor': self.patients_per_doctor(metrics[StatCounter.PATIENTS_PER_DOCTOR]),
+        }, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def ranked(counts):
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    @staticmethod
+    def patients_per_doctor(counts):
+        if not counts:
+            return []
+        doctors = Doctor.objects.filter(pk__in=[int(key) for key in counts]).only(
+            'id', 'first_name', 'last_name', 'specialization'
+        )
+        rows = [
+            {
+                'doctor': doctor.pk,
+                'doctor_name': doctor.full_name,
+                'specialization': doctor.specialization,
+                'patients': counts[str(doctor.pk)],
+            }
+            for doctor in doctors
+        ]
+        rows.sort(key=lambda row: (-row['patients'], row['doctor']))
+        return rows